@@ -1,15 +1,21 @@
 # --- Network Constants ---
 PORT = 5555 # Port for the server to listen on
 HEADER_SIZE = 10 # Fixed size for message length header
-MAX_CLIENTS = 3 # Maximum number of clients the server will accept (including host)
+MAX_CLIENTS = 64 # Maximum number of clients the server will accept (including host)
+SNAPSHOT_HISTORY = 32 # Snapshots kept (server and client) as delta baselines; a client acking an older one gets a full snapshot
+AOI_ENTER_RADIUS = 1000 # Enemies this close to a client's player enter its snapshots (the 1370x720 view reaches ~775)
+AOI_LEAVE_RADIUS = 1250 # ...and leave them (with a despawn message) only beyond this, so edge enemies do not flicker
+OUTBOUND_QUEUE_LIMIT = 256 # Messages a client may have waiting; past this (reliable ones piling up) it is disconnected as too slow
 
 # Network Variables
 is_host = False
 is_dedicated_host = False # <<< ADD THIS FLAG
 client_socket = None # Socket for clients connecting to the server
-server_socket = None # Socket for the server listening for clients
-clients = {} # Server: Dictionary to store connected client sockets and addresses {client_socket: address}
-client_threads = [] # Server: List to hold client handling threads
+network_server = None # Server: net_server.ServerCore, the non-blocking network layer polled by the game loop
+clients = {} # Server: Dictionary to store connected clients and addresses {client_connection: address}
+client_acks = {} # Server: {client_connection: last snapshot sequence the client acknowledged}
+client_player_ids = {} # Server: {client_connection: player_id of the client's player}
+client_interests = {} # Server: {client_connection: InterestArea, the enemies the client's snapshots carry}
 player_id_counter = 0 # Server: Simple way to assign unique IDs
 network_players = {} # All instances: Dictionary to store player data {player_id: player_object_or_data}
 my_player_id = None # Client/Host: This instance's unique ID
@@ -0,0 +1,86 @@
+# --- START OF FILE bench_broadphase_cache.py ---
+"""
+Benchmark: per-tick broad-phase with and without BroadPhaseCache.
+
+Simulates 600 Sword_Orcs over the synthetic overworld collider set: most idle near
+their spawn, some wander slowly, a few chase at full speed. Each tick builds the same
+sweep query ranges CombatManager.update() does and fetches candidates either straight
+from StaticCollisionIndex.query_batch() or through the cache. A collider is moved every
+few ticks to exercise invalidation. Candidates are checked against the uncached result.
+
+Run from the repository root:
+    python benchmarks/bench_broadphase_cache.py
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from world_structures.world_constants import WORLD_WIDTH, WORLD_HEIGHT
+from world_structures.collision_index import StaticCollisionIndex
+from world_structures.broadphase_cache import BroadPhaseCache
+from world_structures import kinematics
+from bench_collision_index import make_overworld_colliders
+
+NUM_ORCS = 600
+TICKS = 300
+DT = 1 / 60
+SPEED = 3
+SEED = 1337
+# (share of population, per-tick move chance) for idle, wandering and chasing orcs
+BEHAVIOURS = [(0.70, 0.0), (0.25, 0.1), (0.05, 1.0)]
+CHANGE_EVERY = 10 # Ticks between collider moves (doors, destructibles)
+
+class Mover:
+    def __init__(self, x, y, move_chance):
+        self.rect = pygame.Rect(0, 0, 20, 20); self.rect.center = (x, y)
+        self.move_chance = move_chance; self.speed = SPEED
+
+def make_movers():
+    movers = []
+    for share, move_chance in BEHAVIOURS:
+        for _ in range(int(NUM_ORCS * share)):
+            movers.append(Mover(random.randint(0, WORLD_WIDTH), random.randint(0, WORLD_HEIGHT), move_chance))
+    return movers
+
+def run(use_cache, check=False):
+    random.seed(SEED)
+    index = StaticCollisionIndex(pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT))
+    index.build(make_overworld_colliders())
+    movers = make_movers(); cache = BroadPhaseCache(index) if use_cache else None
+    hits = misses = invalidations = 0; query_time = 0.0; mismatches = 0
+    for tick in range(TICKS):
+        if tick % CHANGE_EVERY == 0:
+            rect = index.rects[random.randrange(index.static_count)]
+            if rect is not None: index.update(rect, rect.move(random.randint(-8, 8), random.randint(-8, 8)))
+        for m in movers:
+            if m.move_chance and random.random() < m.move_chance: m.rect.move_ip(random.randint(-SPEED, SPEED), random.randint(-SPEED, SPEED))
+        query_ranges = [kinematics.sweep_query_rect(m.rect, m.speed, DT) for m in movers]
+        start = time.perf_counter()
+        if cache is not None:
+            candidate_lists = cache.query_batch(movers, query_ranges)
+            h, m_, i = cache.take_counters(); hits += h; misses += m_; invalidations += i
+        else:
+            offsets, indices = index.query_batch(query_ranges)
+            candidate_lists = [index.batch_candidates(offsets, indices, k) for k in range(len(movers))]
+        query_time += time.perf_counter() - start
+        if check:
+            for query_range, candidates in zip(query_ranges, candidate_lists):
+                needed = {tuple(r) for r in index.query(query_range)}
+                if not needed <= {tuple(r) for r in candidates}: mismatches += 1
+    return query_time, hits, misses, invalidations, mismatches
+
+if __name__ == "__main__":
+    _, _, _, _, mismatches = run(True, check=True)
+    assert mismatches == 0, f"Cache returned {mismatches} incomplete candidate lists"
+    plain_time, _, _, _, _ = run(False)
+    cache_time, hits, misses, invalidations, _ = run(True)
+    print(f"--- {NUM_ORCS} orcs, {TICKS} ticks ---")
+    print(f"  Uncached: {plain_time * 1000 / TICKS:7.3f} ms/tick ({NUM_ORCS} index queries/tick)")
+    print(f"  Cached:   {cache_time * 1000 / TICKS:7.3f} ms/tick ({misses / TICKS:.1f} index queries/tick, "
+          f"{hits / TICKS:.1f} saved/tick, {invalidations} invalidations, {plain_time / max(cache_time, 1e-9):.1f}x)")
+
+# --- END OF FILE bench_broadphase_cache.py ---
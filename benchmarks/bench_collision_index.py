@@ -0,0 +1,123 @@
+# --- START OF FILE bench_collision_index.py ---
+"""
+Benchmark: QuadtreeNode vs StaticCollisionIndex for world colliders.
+
+Builds both structures from a synthetic overworld-sized collider set (tree trunks,
+stamped wall squares, buildings) and from a dungeon wall grid, then times the
+per-tick query pattern used by players, enemies and NPCs.
+
+Run from the repository root:
+    python benchmarks/bench_collision_index.py
+"""
+import os
+import sys
+import math
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from world_structures.world_constants import (
+    WORLD_WIDTH, WORLD_HEIGHT, QT_NODE_CAPACITY, COLLISION_CELL_SIZE, KINGDOM_WALL_THICKNESS,
+    KINGDOM_CENTER_X, KINGDOM_CENTER_Y, KINGDOM_RADIUS, DUNGEON_TILE_SIZE
+)
+from world_structures.quadtree import QuadtreeNode
+from world_structures.collision_index import StaticCollisionIndex
+
+NUM_QUERIES = 600 # One per Sword_Orc per tick
+QUERY_SIZE = 20 + 2 * 3 + 32 # Enemy rect inflated by speed * 2 + 32
+TICKS = 30
+REPEATS = 5 # Best-of-N to filter scheduler noise
+
+def make_overworld_colliders(num_trees=6000):
+    rects = []
+    for _ in range(num_trees):
+        w = random.randint(8, 14); h = random.randint(15, 25)
+        rects.append(pygame.Rect(random.randint(0, WORLD_WIDTH - w), random.randint(0, WORLD_HEIGHT - h), w, h))
+    step = KINGDOM_WALL_THICKNESS * 0.8; circumference = 2 * math.pi * KINGDOM_RADIUS
+    for i in range(int(circumference / step)):
+        angle = i * step / KINGDOM_RADIUS
+        rect = pygame.Rect(0, 0, KINGDOM_WALL_THICKNESS, KINGDOM_WALL_THICKNESS)
+        rect.center = (int(KINGDOM_CENTER_X + KINGDOM_RADIUS * math.cos(angle)), int(KINGDOM_CENTER_Y + KINGDOM_RADIUS * math.sin(angle)))
+        rects.append(rect)
+    for _ in range(45):
+        rects.append(pygame.Rect(KINGDOM_CENTER_X + random.randint(-2500, 2500), KINGDOM_CENTER_Y + random.randint(-2500, 2500), 60, 55))
+    return rects
+
+def make_dungeon_colliders(grid_w=150, grid_h=150, floor_ratio=0.35):
+    rects = []
+    for y in range(grid_h):
+        for x in range(grid_w):
+            if random.random() > floor_ratio:
+                rects.append(pygame.Rect(x * DUNGEON_TILE_SIZE, y * DUNGEON_TILE_SIZE, DUNGEON_TILE_SIZE, DUNGEON_TILE_SIZE))
+    return rects
+
+def make_queries(world_w, world_h, count):
+    queries = []
+    for _ in range(count):
+        rect = pygame.Rect(0, 0, QUERY_SIZE, QUERY_SIZE)
+        rect.center = (random.randint(0, world_w), random.randint(0, world_h))
+        queries.append(rect)
+    return queries
+
+def time_per_tick(structure, queries):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            for q in queries: structure.query(q)
+        best = min(best, (time.perf_counter() - start) / TICKS)
+    return best
+
+def time_batch_per_tick(index, queries):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            offsets, indices = index.query_batch(queries)
+            for k in range(len(queries)): index.batch_candidates(offsets, indices, k)
+        best = min(best, (time.perf_counter() - start) / TICKS)
+    return best
+
+def bench(label, boundary, colliders, queries):
+    start = time.perf_counter()
+    quadtree = QuadtreeNode(boundary, QT_NODE_CAPACITY)
+    for rect in colliders: quadtree.insert(rect)
+    qt_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = StaticCollisionIndex(boundary, COLLISION_CELL_SIZE)
+    index.build(colliders)
+    idx_build = time.perf_counter() - start
+
+    # Sanity check against brute force. The quadtree keeps a spanning item only in the first
+    # child it touches, so it can miss colliders; the index must never miss one.
+    qt_misses = 0
+    for q in queries:
+        expected = sorted(tuple(r) for r in colliders if r.colliderect(q))
+        assert expected == sorted(map(tuple, index.query(q))), f"Index mismatch for {q}"
+        if expected != sorted(map(tuple, quadtree.query(q))): qt_misses += 1
+    offsets, indices = index.query_batch(queries)
+    for k, q in enumerate(queries):
+        assert sorted(map(tuple, index.batch_candidates(offsets, indices, k))) == sorted(map(tuple, index.query(q))), f"Batch mismatch for {q}"
+
+    qt_tick = time_per_tick(quadtree, queries)
+    idx_tick = time_per_tick(index, queries)
+    batch_tick = time_batch_per_tick(index, queries)
+
+    print(f"--- {label}: {len(colliders)} colliders, {len(queries)} queries/tick ---")
+    print(f"  Build:      Quadtree {qt_build * 1000:8.2f} ms | Index {idx_build * 1000:8.2f} ms")
+    print(f"  Query/tick: Quadtree {qt_tick * 1000:8.3f} ms | Index {idx_tick * 1000:8.3f} ms ({qt_tick / max(idx_tick, 1e-9):.1f}x)")
+    print(f"  Batched:    Index {batch_tick * 1000:8.3f} ms (one query_batch per tick, {qt_tick / max(batch_tick, 1e-9):.1f}x vs quadtree)")
+    print(f"  Queries where the quadtree missed a collider: {qt_misses}/{len(queries)}")
+
+if __name__ == "__main__":
+    random.seed(1337)
+    overworld = make_overworld_colliders()
+    bench("Overworld", pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT), overworld, make_queries(WORLD_WIDTH, WORLD_HEIGHT, NUM_QUERIES))
+    dungeon = make_dungeon_colliders()
+    dungeon_size = 150 * DUNGEON_TILE_SIZE
+    bench("Dungeon", pygame.Rect(0, 0, dungeon_size, dungeon_size), dungeon, make_queries(dungeon_size, dungeon_size, NUM_QUERIES // 2))
+
+# --- END OF FILE bench_collision_index.py ---
@@ -0,0 +1,64 @@
+# --- START OF FILE bench_crowd_separation.py ---
+"""
+Benchmark: crowd separation with an all-pairs NumPy pass vs the uniform-grid separation_push().
+
+Places enemies in clusters around chased players (the way a big chase converges) plus a
+thin scatter, and times one separation pass over the whole population. The all-pairs
+version broadcasts distances in row blocks (so memory stays bounded) and is the O(n^2)
+baseline; both use the same push formula, and the largest difference is reported.
+
+Run from the repository root:
+    python benchmarks/bench_crowd_separation.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from world_structures.crowd import separation_push
+from enemies.stat_constants import ENEMY_SEPARATION_RADIUS
+
+POPULATIONS = [600, 10000]
+REPEATS = 5
+SEED = 1337
+BLOCK = 512
+
+def make_crowd(count):
+    rng = np.random.default_rng(SEED)
+    clustered = count * 3 // 4
+    centres = rng.uniform(2000, 18000, (3, 2))
+    picks = rng.integers(0, 3, clustered)
+    x = np.concatenate([centres[picks, 0] + rng.normal(0, 120, clustered), rng.uniform(0, 20000, count - clustered)])
+    y = np.concatenate([centres[picks, 1] + rng.normal(0, 120, clustered), rng.uniform(0, 20000, count - clustered)])
+    return x, y
+
+def pairwise_push(x, y, radius):
+    n = len(x); push_x = np.zeros(n); push_y = np.zeros(n)
+    for start in range(0, n, BLOCK):
+        dx = x[start:start + BLOCK, None] - x[None, :]; dy = y[start:start + BLOCK, None] - y[None, :]
+        dist = np.sqrt(dx * dx + dy * dy)
+        near = (dist < radius) & (dist > 0)
+        scale = np.where(near, (1.0 - dist / radius) / np.where(near, dist, 1.0), 0.0)
+        push_x[start:start + BLOCK] = (dx * scale).sum(axis=1); push_y[start:start + BLOCK] = (dy * scale).sum(axis=1)
+    length = np.sqrt(push_x * push_x + push_y * push_y); over = length > 1.0
+    push_x[over] /= length[over]; push_y[over] /= length[over]
+    return push_x, push_y
+
+def timed(func, *args):
+    start = time.perf_counter()
+    for _ in range(REPEATS): result = func(*args)
+    return (time.perf_counter() - start) / REPEATS, result
+
+if __name__ == "__main__":
+    for count in POPULATIONS:
+        x, y = make_crowd(count)
+        pair_time, (pair_x, pair_y) = timed(pairwise_push, x, y, ENEMY_SEPARATION_RADIUS)
+        grid_time, (grid_x, grid_y) = timed(separation_push, x, y, ENEMY_SEPARATION_RADIUS)
+        error = max(np.abs(pair_x - grid_x).max(), np.abs(pair_y - grid_y).max())
+        print(f"--- {count} enemies, {REPEATS} passes ---")
+        print(f"  All pairs: {pair_time * 1000:8.2f} ms/pass")
+        print(f"  Grid:      {grid_time * 1000:8.2f} ms/pass ({pair_time / max(grid_time, 1e-9):.1f}x, max difference {error:.1e})")
+
+# --- END OF FILE bench_crowd_separation.py ---
@@ -0,0 +1,78 @@
+# --- START OF FILE bench_enemy_backends.py ---
+"""
+Benchmark: per-object Enemy.update() vs the EnemyArrays structure-of-arrays backend.
+
+Spreads Sword_Orc-like enemies over the 20000x20000 world with three players walking
+through it, and times one server tick of enemy simulation (collision against an empty
+collider list, so only the AI / animation / movement cost is measured). For the arrays
+backend the vectorized step() and the per-mover collision pass are reported separately.
+
+Run from the repository root:
+    python benchmarks/bench_enemy_backends.py
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from enemies.enemy_base import Enemy
+from enemies.enemy_arrays import EnemyArrays
+from enemies.stat_constants import *
+
+POPULATIONS = [600, 10000]
+TICKS = 120
+DT = 1 / 60
+SEED = 1337
+
+class BenchPlayer:
+    def __init__(self, player_id, x, y):
+        self.player_id = player_id; self.x = x; self.y = y; self.is_dead = False
+
+def make_enemies(count):
+    random.seed(SEED)
+    return [Enemy(random.uniform(0, WORLD_WIDTH), random.uniform(0, WORLD_HEIGHT), SWORD_ORC_BASE_HEALTH, SWORD_ORC_BASE_SPEED,
+                  SWORD_ORC_ATTACK_POWER, SWORD_ORC_ATTACK_RANGE, SWORD_ORC_ATTACK_COOLDOWN, SWORD_ORC_DETECTION_RADIUS,
+                  SWORD_ORC_BASE_DEFENSE, SWORD_ORC_BASE_AGILITY, [None] * 4, [None] * 6, [None] * 5, [None] * 3, [None] * 7,
+                  (40, 40), name="Sword_Orc", attack_hit_frame_index=3) for _ in range(count)]
+
+def make_players():
+    random.seed(SEED + 1)
+    return {i: BenchPlayer(i, random.uniform(0, WORLD_WIDTH), random.uniform(0, WORLD_HEIGHT)) for i in range(3)}
+
+def walk(players):
+    for player in players.values(): player.x += 2; player.y += 1
+
+def run_objects(count):
+    enemies = make_enemies(count); players = make_players()
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        walk(players)
+        for enemy in enemies: enemy.update(players, DT, [], None, None, None)
+    return (time.perf_counter() - start) / TICKS
+
+def run_arrays(count):
+    store = EnemyArrays(); players = make_players()
+    for enemy in make_enemies(count): store.add(enemy)
+    step_time = move_time = 0.0; movers = 0
+    for _ in range(TICKS):
+        walk(players)
+        start = time.perf_counter()
+        _, mover_slots, step_x, step_y, _ = store.step(players, DT)
+        mid = time.perf_counter()
+        for slot, move_x, move_y in zip(mover_slots, step_x.tolist(), step_y.tolist()): store.views[slot].move_and_collide(move_x, move_y, [])
+        step_time += mid - start; move_time += time.perf_counter() - mid; movers += len(mover_slots)
+    return step_time / TICKS, move_time / TICKS, movers / TICKS
+
+if __name__ == "__main__":
+    for count in POPULATIONS:
+        object_time = run_objects(count)
+        step_time, move_time, movers = run_arrays(count)
+        print(f"--- {count} enemies, {TICKS} ticks ---")
+        print(f"  Objects: {object_time * 1000:8.2f} ms/tick")
+        print(f"  Arrays:  {(step_time + move_time) * 1000:8.2f} ms/tick (step {step_time * 1000:.2f} ms, "
+              f"{movers:.0f} movers {move_time * 1000:.2f} ms, {object_time / max(step_time + move_time, 1e-9):.1f}x)")
+
+# --- END OF FILE bench_enemy_backends.py ---
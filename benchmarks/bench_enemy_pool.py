@@ -0,0 +1,67 @@
+# --- START OF FILE bench_enemy_pool.py ---
+"""
+Benchmark: mass death and respawn with a plain list vs EnemyPool.
+
+Spawns a population of Sword_Orc-like enemies, then kills half of them in one tick
+and respawns the same number, the way a big fight followed by a spawn wave would.
+The list version removes with list.remove() and constructs new Enemy objects; the
+pool version swap-removes and resets retired enemies in place.
+
+Run from the repository root:
+    python benchmarks/bench_enemy_pool.py
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from enemies.enemy_base import Enemy
+from enemies.enemy_pool import EnemyPool
+from enemies.stat_constants import *
+
+POPULATIONS = [600, 10000]
+ROUNDS = 5
+SEED = 1337
+
+class BenchOrc(Enemy):
+    def __init__(self, x, y):
+        super().__init__(x, y, SWORD_ORC_BASE_HEALTH, SWORD_ORC_BASE_SPEED, SWORD_ORC_ATTACK_POWER, SWORD_ORC_ATTACK_RANGE,
+                         SWORD_ORC_ATTACK_COOLDOWN, SWORD_ORC_DETECTION_RADIUS, SWORD_ORC_BASE_DEFENSE, SWORD_ORC_BASE_AGILITY,
+                         [None] * 4, [None] * 6, [None] * 5, [None] * 3, [None] * 7, (40, 40), name="Sword_Orc", attack_hit_frame_index=3)
+
+def spawn_point():
+    return random.uniform(0, WORLD_WIDTH), random.uniform(0, WORLD_HEIGHT)
+
+def run_list(count):
+    random.seed(SEED); enemies = [BenchOrc(*spawn_point()) for _ in range(count)]; elapsed = 0.0
+    for _ in range(ROUNDS):
+        dead = random.sample(enemies, count // 2)
+        start = time.perf_counter()
+        for enemy in dead: enemies.remove(enemy)
+        for _ in range(len(dead)): enemies.append(BenchOrc(*spawn_point()))
+        elapsed += time.perf_counter() - start
+    return elapsed / ROUNDS
+
+def run_pool(count):
+    random.seed(SEED); pool = EnemyPool(max_free=count)
+    for _ in range(count): pool.add(BenchOrc(*spawn_point()))
+    elapsed = 0.0
+    for _ in range(ROUNDS):
+        dead = random.sample(pool.active, count // 2)
+        start = time.perf_counter()
+        for enemy in dead: pool.remove(enemy); pool.release(enemy)
+        for _ in range(len(dead)): pool.add(pool.acquire(BenchOrc, *spawn_point()))
+        elapsed += time.perf_counter() - start
+    return elapsed / ROUNDS
+
+if __name__ == "__main__":
+    for count in POPULATIONS:
+        list_time = run_list(count); pool_time = run_pool(count)
+        print(f"--- {count} enemies, {count // 2} die and respawn per round ---")
+        print(f"  List: {list_time * 1000:8.2f} ms/round")
+        print(f"  Pool: {pool_time * 1000:8.2f} ms/round ({list_time / max(pool_time, 1e-9):.1f}x)")
+
+# --- END OF FILE bench_enemy_pool.py ---
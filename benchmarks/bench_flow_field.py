@@ -0,0 +1,87 @@
+# --- START OF FILE bench_flow_field.py ---
+"""
+Benchmark: FlowFieldService chase routes on dungeons from DungeonGenerator.
+
+Generates full-size dungeons and builds the tile grid the game uses. Three players stand
+on random floor tiles and chasers are placed on floor tiles that the player's field reaches
+(within FLOW_FIELD_MAX_STEPS). Every chaser walks to its player by following next_waypoint()
+(steering straight once next to it). Reported per dungeon: how many chasers arrive, their path
+length against the shortest tile path (the field's own BFS depth, so 1.00 means exact), and the
+time per lookup with the shared fields against one breadth-first search per chaser.
+
+Run from the repository root:
+    python benchmarks/bench_flow_field.py
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dungeon_gen import DungeonGenerator
+from world_structures.tile_collider import TileCollisionGrid
+from world_structures.flow_field import FlowFieldService
+from world_structures.world_constants import DUNGEON_GRID_WIDTH, DUNGEON_GRID_HEIGHT, DUNGEON_TILE_SIZE, TILE_WALL, FLOW_FIELD_MAX_STEPS
+
+SEEDS = [1, 2, 3]
+PLAYERS = 3
+CHASERS = 300
+SEED_OFFSET = 1337
+
+def make_dungeon(seed):
+    random.seed(seed) # After the imports: world_constants seeds random when imported
+    grid, rooms = DungeonGenerator(DUNGEON_GRID_WIDTH, DUNGEON_GRID_HEIGHT).generate_dungeon()
+    tile_grid = TileCollisionGrid(DUNGEON_TILE_SIZE); tile_grid.build(grid, TILE_WALL)
+    return tile_grid
+
+def centre(tile_grid, tile):
+    ts = tile_grid.tile_size
+    return ((tile % tile_grid.width) + 0.5) * ts, ((tile // tile_grid.width) + 0.5) * ts
+
+def depth(service, goal, tile):
+    """BFS steps from tile to goal along the field (the shortest 8-way path without corner clipping)."""
+    field = service._field(goal); steps = 0
+    while tile != goal: tile = field[tile]; steps += 1
+    return steps
+
+def walk(service, tile_grid, start, goal):
+    """Tile steps a chaser following next_waypoint() takes to reach goal's tile or a neighbour of it, or None if it stalls."""
+    ts = tile_grid.tile_size; width = tile_grid.width
+    x, y = centre(tile_grid, start); gx, gy = centre(tile_grid, goal)
+    for steps in range(4 * FLOW_FIELD_MAX_STEPS):
+        if max(abs(int(x // ts) - goal % width), abs(int(y // ts) - goal // width)) <= 1: return steps + (int(x // ts) + int(y // ts) * width != goal)
+        waypoint = service.next_waypoint(gx, gy, x, y)
+        if waypoint is None or tile_grid.is_solid_at(*waypoint): return None
+        x, y = waypoint
+    return None
+
+def run(seed):
+    tile_grid = make_dungeon(seed); rng = random.Random(seed + SEED_OFFSET)
+    floor = [tile for tile in range(len(tile_grid.solid)) if not tile_grid.solid[tile]]
+    service = FlowFieldService(tile_grid)
+    players = rng.sample(floor, PLAYERS); chasers = []
+    while len(chasers) < CHASERS:
+        goal = players[len(chasers) % PLAYERS]; tile = rng.choice(floor)
+        if tile != goal and service._field(goal)[tile] >= 0: chasers.append((tile, goal))
+    arrived = 0; ratio_sum = 0.0
+    for tile, goal in chasers:
+        steps = walk(service, tile_grid, tile, goal)
+        if steps is None: continue
+        arrived += 1; ratio_sum += steps / max(1, depth(service, goal, tile))
+    service.fields.clear(); start_time = time.perf_counter()
+    for tile, goal in chasers: service.next_waypoint(*centre(tile_grid, goal), *centre(tile_grid, tile))
+    shared_time = (time.perf_counter() - start_time) / CHASERS
+    start_time = time.perf_counter()
+    for tile, goal in chasers: service._build(goal) # What each chaser would pay searching on its own
+    own_time = (time.perf_counter() - start_time) / CHASERS
+    return len(floor), arrived, ratio_sum / max(1, arrived), shared_time, own_time
+
+if __name__ == "__main__":
+    for seed in SEEDS:
+        floor, arrived, ratio, shared_time, own_time = run(seed)
+        print(f"--- Dungeon seed {seed}: {DUNGEON_GRID_WIDTH}x{DUNGEON_GRID_HEIGHT} tiles, {floor} floor, {PLAYERS} players, {CHASERS} chasers ---")
+        print(f"  Chasers: {arrived}/{CHASERS} reach their player, {ratio:.2f}x the shortest tile path on average")
+        print(f"  Per chaser: shared fields {shared_time * 1e6:8.1f} us   own BFS {own_time * 1e6:8.1f} us ({own_time / max(shared_time, 1e-9):.0f}x)")
+
+# --- END OF FILE bench_flow_field.py ---
@@ -0,0 +1,80 @@
+# --- START OF FILE bench_interest_area.py ---
+"""
+Benchmark: whole-world snapshots vs snapshots cut to each client's area of interest.
+
+Enemies are spread at a fixed density over worlds of growing size, so the population grows
+with the map while a player's surroundings stay equally crowded. A fraction of the enemies
+moves each tick and the client's player walks across the map. Each tick SnapshotHistory
+records the state and the client (acking every tick) gets encode_for(ack) for the whole
+world, and encode_for(ack, area) plus any despawn message with its InterestArea. Reported:
+bytes per tick and server time per client for both.
+
+Run from the repository root:
+    python benchmarks/bench_interest_area.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import net_codec
+import net_interest
+
+WORLD_SIZES = [5000, 10000, 20000, 40000]
+DENSITY = 25 / 1000 ** 2 # Enemies per square pixel (25 per 1000x1000)
+ACTIVE_FRACTION = 0.1
+PLAYER_SPEED = 6.0 # Pixels per tick
+TICKS = 60
+SEED = 1337
+
+def make_columns(count, size, rng):
+    return {
+        'id': np.arange(count), 'type': ['Sword_Orc'] * count,
+        'x': rng.uniform(0, size, count), 'y': rng.uniform(0, size, count),
+        'health': np.full(count, 75, dtype=np.int32), 'max_health': [75] * count,
+        'facing_right': np.ones(count, dtype=bool), 'anim': np.zeros(count, dtype=np.int8),
+        'anim_frame': np.zeros(count, dtype=np.int32), 'anim_finished': np.zeros(count, dtype=bool),
+        'is_dead': np.zeros(count, dtype=bool), 'is_invulnerable': np.zeros(count, dtype=bool), 'is_attacking': np.zeros(count, dtype=bool),
+        'dialogue_text': [None] * count, 'dialogue_timer': np.zeros(count),
+    }
+
+def step(columns, rng):
+    count = len(columns['id'])
+    active = rng.random(count) < ACTIVE_FRACTION
+    columns['x'][active] += rng.uniform(-2, 2, int(active.sum())); columns['y'][active] += rng.uniform(-2, 2, int(active.sum()))
+    columns['anim'][active] = 1; columns['anim_frame'][active] = (columns['anim_frame'][active] + 1) % 6
+
+def run(size):
+    rng = np.random.default_rng(SEED)
+    count = int(DENSITY * size * size)
+    columns = make_columns(count, size, rng)
+    history = net_codec.SnapshotHistory(); area = net_interest.InterestArea()
+    world_receiver = net_codec.SnapshotReceiver(); area_receiver = net_codec.SnapshotReceiver()
+    world_bytes = area_bytes = 0; world_time = area_time = 0.0
+    x = y = size / 2
+    for _ in range(TICKS):
+        step(columns, rng); x += PLAYER_SPEED
+        history.push({}, columns)
+        start = time.perf_counter()
+        world = history.encode_for(world_receiver.ack)
+        mid = time.perf_counter()
+        left = history.update_interest(area, (x, y))
+        payloads = ([net_codec.encode_message({'type': 'despawn', 'enemies': left})] if left else []) + [history.encode_for(area_receiver.ack, area)]
+        end = time.perf_counter()
+        world_receiver.receive(net_codec.decode_message(world))
+        if left: area_receiver.forget(left)
+        area_receiver.receive(net_codec.decode_message(payloads[-1]))
+        world_time += mid - start; area_time += end - mid
+        world_bytes += len(world); area_bytes += sum(len(payload) for payload in payloads)
+    return count, len(area), world_bytes / TICKS, area_bytes / TICKS, world_time / TICKS, area_time / TICKS
+
+if __name__ == "__main__":
+    print(f"--- {DENSITY * 1000 ** 2:.0f} enemies per 1000x1000, {ACTIVE_FRACTION * 100:.0f}% active, {TICKS} ticks ---")
+    for size in WORLD_SIZES:
+        count, visible, world_bytes, area_bytes, world_time, area_time = run(size)
+        print(f"  {size:5d}x{size:<5d} {count:6d} enemies ({visible:3d} in area): world {world_bytes:8.0f} B/tick   area {area_bytes:6.0f} B/tick"
+              f" ({world_bytes / max(area_bytes, 1):6.1f}x smaller)   encode world {world_time * 1000:6.2f} ms / area {area_time * 1000:6.2f} ms")
+
+# --- END OF FILE bench_interest_area.py ---
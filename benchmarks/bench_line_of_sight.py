@@ -0,0 +1,85 @@
+# --- START OF FILE bench_line_of_sight.py ---
+"""
+Benchmark: enemy perception with a per-pair collider scan vs LineOfSightService.
+
+Scatters tree-sized colliders over the 20000x20000 world and packs enemies around three
+players walking through it, so every enemy has a player inside its detection radius.
+Each tick, every (enemy, player) pair inside the radius is tested for line of sight:
+the scan version queries the collision index for the segment's bounding box and clips
+the segment against every returned Rect; the service version raycasts the occupancy
+grid with per-cell-pair memoization. The one-off grid rasterization is reported separately.
+Disagreements with the scan are reported by kind: false-visible (the grid lets a blocked
+line through) and false-blocked (the grid hides a player the scan sees).
+
+Run from the repository root:
+    python benchmarks/bench_line_of_sight.py
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from world_structures.collision_index import StaticCollisionIndex
+from world_structures.line_of_sight import LineOfSightService
+from world_structures.world_constants import *
+from enemies.stat_constants import SWORD_ORC_DETECTION_RADIUS
+
+POPULATIONS = [600, 10000]
+COLLIDERS = 40000
+TICKS = 60
+SEED = 1337
+
+def make_index():
+    random.seed(SEED)
+    index = StaticCollisionIndex(pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT))
+    index.build([pygame.Rect(random.uniform(0, WORLD_WIDTH), random.uniform(0, WORLD_HEIGHT), 40, 40) for _ in range(COLLIDERS)])
+    return index
+
+def make_scene(count):
+    random.seed(SEED + 1)
+    players = [[random.uniform(2000, WORLD_WIDTH - 2000), random.uniform(2000, WORLD_HEIGHT - 2000)] for _ in range(3)]
+    enemies = []
+    for k in range(count):
+        px, py = players[k % 3]
+        enemies.append((px + random.uniform(-SWORD_ORC_DETECTION_RADIUS, SWORD_ORC_DETECTION_RADIUS), py + random.uniform(-SWORD_ORC_DETECTION_RADIUS, SWORD_ORC_DETECTION_RADIUS)))
+    return enemies, players
+
+def pairs_in_range(enemies, players):
+    radius_sq = SWORD_ORC_DETECTION_RADIUS ** 2
+    return [(ex, ey, px, py) for ex, ey in enemies for px, py in players if (px - ex) ** 2 + (py - ey) ** 2 < radius_sq]
+
+def scan_visible(index, x0, y0, x1, y1):
+    box = pygame.Rect(min(x0, x1), min(y0, y1), abs(x1 - x0) + 1, abs(y1 - y0) + 1)
+    return not any(rect.clipline(x0, y0, x1, y1) for rect in index.query(box))
+
+def run(count, index, service):
+    enemies, players = make_scene(count)
+    scan_time = service_time = 0.0; pairs_total = 0; false_visible = false_blocked = 0
+    for _ in range(TICKS):
+        for player in players: player[0] += 2; player[1] += 1
+        pairs = pairs_in_range(enemies, players); pairs_total += len(pairs)
+        start = time.perf_counter()
+        scanned = [scan_visible(index, *pair) for pair in pairs]
+        mid = time.perf_counter()
+        service.begin_tick()
+        cast = [service.visible(*pair) for pair in pairs]
+        service_time += time.perf_counter() - mid; scan_time += mid - start
+        false_visible += sum(b and not a for a, b in zip(scanned, cast)); false_blocked += sum(a and not b for a, b in zip(scanned, cast))
+    pairs_total = max(1, pairs_total)
+    return scan_time / TICKS, service_time / TICKS, pairs_total / TICKS, false_visible / pairs_total, false_blocked / pairs_total, service.take_counters()
+
+if __name__ == "__main__":
+    index = make_index()
+    start = time.perf_counter(); service = LineOfSightService(index); build_time = time.perf_counter() - start
+    print(f"Occupancy grid {service.width}x{service.height} rasterized from {COLLIDERS} colliders in {build_time * 1000:.1f} ms")
+    for count in POPULATIONS:
+        scan_time, service_time, pairs, false_visible, false_blocked, (hits, casts) = run(count, index, service)
+        print(f"--- {count} enemies, {pairs:.0f} pairs in range per tick, {TICKS} ticks ---")
+        print(f"  Collider scan: {scan_time * 1000:8.2f} ms/tick")
+        print(f"  Grid raycast:  {service_time * 1000:8.2f} ms/tick ({scan_time / max(service_time, 1e-9):.1f}x, {hits} cache hits / {casts} rays)")
+        print(f"  Against the scan: {false_visible * 100:.1f}% false-visible, {false_blocked * 100:.1f}% false-blocked")
+
+# --- END OF FILE bench_line_of_sight.py ---
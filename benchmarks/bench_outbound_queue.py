@@ -0,0 +1,92 @@
+# --- START OF FILE bench_outbound_queue.py ---
+"""
+Benchmark: server tick cost and backlog with one stalled client, over loopback sockets.
+
+A ServerCore serves CLIENTS connections; one of them never reads (a frozen or badly
+throttled client) and the rest drain their socket every tick. Each tick the server queues a
+full snapshot for everyone, plus a reliable despawn message every DESPAWN_EVERY ticks, then
+flushes. Reported: server time per tick, the stalled client's queue depth and bytes, the
+snapshots dropped for it, and how many snapshots the healthy clients received. With
+sendall() the stalled socket would have blocked the tick once its buffers filled.
+
+Run from the repository root:
+    python benchmarks/bench_outbound_queue.py
+"""
+import os
+import sys
+import socket
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import net_codec
+import net_server
+from NETconfig import HEADER_SIZE
+
+CLIENTS = 16
+ENEMIES = 600
+TICKS = 300
+DESPAWN_EVERY = 10
+SEED = 1337
+
+def make_snapshot():
+    rng = np.random.default_rng(SEED)
+    columns = {
+        'id': np.arange(ENEMIES), 'type': ['Sword_Orc'] * ENEMIES, 'x': rng.uniform(0, 20000, ENEMIES), 'y': rng.uniform(0, 20000, ENEMIES),
+        'health': np.full(ENEMIES, 75, dtype=np.int32), 'max_health': [75] * ENEMIES, 'facing_right': np.ones(ENEMIES, dtype=bool),
+        'anim': np.zeros(ENEMIES, dtype=np.int8), 'anim_frame': np.zeros(ENEMIES, dtype=np.int32), 'anim_finished': np.zeros(ENEMIES, dtype=bool),
+        'is_dead': np.zeros(ENEMIES, dtype=bool), 'is_invulnerable': np.zeros(ENEMIES, dtype=bool), 'is_attacking': np.zeros(ENEMIES, dtype=bool),
+        'dialogue_text': [None] * ENEMIES, 'dialogue_timer': np.zeros(ENEMIES),
+    }
+    return net_codec.encode_message({'type': 'game_state_update', 'players': {}, 'enemy_columns': columns})
+
+def drain(sock, pending):
+    """Reads what is there; returns the number of complete snapshot messages it finished."""
+    try:
+        while True:
+            chunk = sock.recv(1 << 20)
+            if not chunk: break
+            pending += chunk
+    except BlockingIOError:
+        pass
+    snapshots = 0
+    while len(pending) >= HEADER_SIZE:
+        end = HEADER_SIZE + int(pending[:HEADER_SIZE].decode('utf-8').strip())
+        if len(pending) < end: break
+        if pending[HEADER_SIZE] in net_codec.SNAPSHOT_MESSAGES: snapshots += 1
+        del pending[:end]
+    return snapshots
+
+if __name__ == "__main__":
+    server = net_server.ServerCore(port=0, max_connections=CLIENTS); server.start()
+    port = server.listener.getsockname()[1]
+    sockets = []
+    for k in range(CLIENTS):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if k == 0: sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096) # The stalled client
+        sock.connect(('127.0.0.1', port)); sock.setblocking(False); sockets.append(sock)
+    conns = []
+    while len(conns) < CLIENTS:
+        server.poll(0.01); conns += [conn for kind, conn, _ in server.events() if kind == 'connect']
+    conns.sort(key=lambda conn: conn.addr[1]); sockets.sort(key=lambda sock: sock.getsockname()[1]) # Pair them up by port
+    snapshot = make_snapshot(); despawn = net_codec.encode_message({'type': 'despawn', 'enemies': [1, 2, 3]})
+    pendings = [bytearray() for _ in sockets]; received = [0] * CLIENTS; tick_times = []; dropped = 0
+    for tick in range(TICKS):
+        start = time.perf_counter()
+        server.poll()
+        for conn in conns:
+            if tick % DESPAWN_EVERY == 0: server.send(conn, despawn)
+            server.send(conn, snapshot)
+        server.flush()
+        tick_times.append(time.perf_counter() - start)
+        dropped += server.take_counters()[conns[0]][2]
+        for k in range(1, CLIENTS): received[k] += drain(sockets[k], pendings[k])
+    depth, queued_bytes, _, _ = conns[0].take_counters()
+    print(f"--- {CLIENTS} clients (1 stalled), {len(snapshot)} B snapshots, {TICKS} ticks ---")
+    print(f"  Server tick: avg {np.mean(tick_times) * 1000:6.2f} ms   max {np.max(tick_times) * 1000:6.2f} ms")
+    print(f"  Stalled client: queue depth {depth} ({queued_bytes} B), {dropped} stale snapshots dropped, connected: {not conns[0].closed}")
+    print(f"  Healthy clients: {min(received[1:])}-{max(received[1:])} of {TICKS} snapshots received")
+    server.shutdown()
+
+# --- END OF FILE bench_outbound_queue.py ---
@@ -0,0 +1,92 @@
+# --- START OF FILE bench_poisson_disk.py ---
+"""
+Benchmark: QuadtreeNode vs PoissonDiskGrid as the Poisson disk sampling backend.
+
+Runs the tree-placement sampling loop (k candidates per active point, spacing check
+against placed points) over square forests of increasing size, once with the old
+point-in-QuadtreeNode proximity check and once with the Bridson background grid.
+Polygon and wall tests are left out so only the sampling backend is timed.
+
+Run from the repository root:
+    python benchmarks/bench_poisson_disk.py
+"""
+import os
+import sys
+import math
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from world_structures.world_constants import MIN_TREE_SPACING, PDS_CANDIDATES, QT_NODE_CAPACITY
+from world_structures.quadtree import QuadtreeNode
+from world_structures.poisson_grid import PoissonDiskGrid
+
+# (forest side in pixels, min spacing)
+CASES = [(3000, MIN_TREE_SPACING), (6000, MIN_TREE_SPACING), (12000, MIN_TREE_SPACING), (6000, MIN_TREE_SPACING // 2)]
+SEED = 1337
+
+def sample_quadtree(bounds, min_spacing, k):
+    """The previous sampler: points stored as tuples in a QuadtreeNode, proximity via rect queries."""
+    min_spacing_sq = min_spacing * min_spacing
+    pds_quadtree = QuadtreeNode(bounds, QT_NODE_CAPACITY)
+    start = (bounds.centerx, bounds.centery); placed = [start]; active = [start]; pds_quadtree.insert(start)
+    while active:
+        active_idx = random.randrange(len(active)); ax, ay = active[active_idx]; found = False
+        for _ in range(k):
+            angle = random.uniform(0, 2 * math.pi); radius = random.uniform(min_spacing, 2 * min_spacing)
+            cand_x = int(ax + radius * math.cos(angle)); cand_y = int(ay + radius * math.sin(angle))
+            if not bounds.collidepoint(cand_x, cand_y): continue
+            search_radius = min_spacing * 1.01
+            query_rect = pygame.Rect(cand_x - search_radius, cand_y - search_radius, 2 * search_radius, 2 * search_radius)
+            if any((cand_x - nx) ** 2 + (cand_y - ny) ** 2 < min_spacing_sq for nx, ny in pds_quadtree.query(query_rect)): continue
+            placed.append((cand_x, cand_y)); active.append((cand_x, cand_y)); pds_quadtree.insert((cand_x, cand_y)); found = True; break
+        if not found: active.pop(active_idx)
+    return placed
+
+def sample_grid(bounds, min_spacing, k):
+    """The current sampler: Bridson background grid with swap-remove on the active list."""
+    pds_grid = PoissonDiskGrid(bounds, min_spacing)
+    start = (bounds.centerx, bounds.centery); placed = [start]; active = [start]; pds_grid.add(*start)
+    while active:
+        active_idx = random.randrange(len(active)); ax, ay = active[active_idx]; found = False
+        for _ in range(k):
+            angle = random.uniform(0, 2 * math.pi); radius = random.uniform(min_spacing, 2 * min_spacing)
+            cand_x = int(ax + radius * math.cos(angle)); cand_y = int(ay + radius * math.sin(angle))
+            if not bounds.collidepoint(cand_x, cand_y): continue
+            if not pds_grid.fits(cand_x, cand_y): continue
+            placed.append((cand_x, cand_y)); active.append((cand_x, cand_y)); pds_grid.add(cand_x, cand_y); found = True; break
+        if not found: active[active_idx] = active[-1]; active.pop()
+    return placed
+
+def min_pair_distance_ok(points, min_spacing):
+    """Checks the spacing guarantee with a plain hash grid (independent of both backends)."""
+    cells = {}
+    for x, y in points: cells.setdefault((x // min_spacing, y // min_spacing), []).append((x, y))
+    for (cx, cy), bucket in cells.items():
+        for x, y in bucket:
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    for ox, oy in cells.get((cx + dx, cy + dy), ()):
+                        if (ox, oy) != (x, y) and (ox - x) ** 2 + (oy - y) ** 2 < min_spacing * min_spacing: return False
+    return True
+
+def run(sampler, bounds, min_spacing):
+    random.seed(SEED)
+    start = time.perf_counter()
+    points = sampler(bounds, min_spacing, PDS_CANDIDATES)
+    return points, time.perf_counter() - start
+
+if __name__ == "__main__":
+    for side, min_spacing in CASES:
+        bounds = pygame.Rect(0, 0, side, side)
+        qt_points, qt_time = run(sample_quadtree, bounds, min_spacing)
+        grid_points, grid_time = run(sample_grid, bounds, min_spacing)
+        assert min_pair_distance_ok(grid_points, min_spacing), "Grid sampler violated min spacing"
+        qt_ok = min_pair_distance_ok(qt_points, min_spacing)
+        print(f"--- Forest {side}x{side}, spacing {min_spacing} ---")
+        print(f"  Quadtree: {len(qt_points):6d} points in {qt_time * 1000:9.1f} ms ({qt_time * 1e6 / max(1, len(qt_points)):6.1f} us/point){'' if qt_ok else '  [spacing violated]'}")
+        print(f"  Grid:     {len(grid_points):6d} points in {grid_time * 1000:9.1f} ms ({grid_time * 1e6 / max(1, len(grid_points)):6.1f} us/point, {qt_time / max(grid_time, 1e-9):.1f}x)")
+
+# --- END OF FILE bench_poisson_disk.py ---
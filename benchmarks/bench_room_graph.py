@@ -0,0 +1,100 @@
+# --- START OF FILE bench_room_graph.py ---
+"""
+Benchmark: RoomGraph routes on dungeons from DungeonGenerator.
+
+Generates full-size dungeons, builds the tile grid the game uses and the room / portal
+graph on top of it, then walks a mover from one room centre to another by following
+next_waypoint() (steering straight once it shares a region with the goal). Reported per
+dungeon: regions, rooms and portals, build time, how many routes reach the goal, how long
+they are compared with the shortest tile path (8-way BFS), and the cost of a route lookup
+without and with the route cache.
+
+Run from the repository root:
+    python benchmarks/bench_room_graph.py
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dungeon_gen import DungeonGenerator
+from world_structures.tile_collider import TileCollisionGrid
+from world_structures.room_graph import RoomGraph
+from world_structures.world_constants import DUNGEON_GRID_WIDTH, DUNGEON_GRID_HEIGHT, DUNGEON_TILE_SIZE, TILE_WALL
+
+SEEDS = [1, 2, 3]
+ROUTES = 200
+MAX_STEPS = 5000
+
+def make_dungeon(seed):
+    random.seed(seed) # After the imports: world_constants seeds random when imported
+    grid, rooms = DungeonGenerator(DUNGEON_GRID_WIDTH, DUNGEON_GRID_HEIGHT).generate_dungeon()
+    tile_grid = TileCollisionGrid(DUNGEON_TILE_SIZE); tile_grid.build(grid, TILE_WALL)
+    return tile_grid, rooms
+
+def shortest_steps(tile_grid, start, goal):
+    """8-way BFS tile steps (no corner clipping), the length any route is measured against."""
+    width = tile_grid.width; height = tile_grid.height; solid = tile_grid.solid
+    seen = {start}; frontier = [start]; steps = 0
+    while frontier:
+        if goal in seen: return steps
+        steps += 1; reached = []
+        for tile in frontier:
+            tx = tile % width; ty = tile // width
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    nx = tx + dx; ny = ty + dy
+                    if (dx or dy) and 0 <= nx < width and 0 <= ny < height:
+                        neighbour = ny * width + nx
+                        if neighbour in seen or solid[neighbour]: continue
+                        if dx and dy and (solid[ty * width + nx] or solid[ny * width + tx]): continue
+                        seen.add(neighbour); reached.append(neighbour)
+        frontier = reached
+    return None
+
+def walk(graph, tile_grid, start, goal):
+    """Tile steps following the graph from start to goal's region (plus the straight part inside it), or None if it stalls."""
+    ts = tile_grid.tile_size; width = tile_grid.width
+    x = (start % width + 0.5) * ts; y = (start // width + 0.5) * ts
+    gx = (goal % width + 0.5) * ts; gy = (goal // width + 0.5) * ts
+    for steps in range(MAX_STEPS):
+        if graph.region_at(x, y) == graph.region_at(gx, gy): # Rooms are open: steer straight the rest of the way
+            return steps + max(abs(int(x // ts) - goal % width), abs(int(y // ts) - goal // width))
+        waypoint = graph.next_waypoint(gx, gy, x, y)
+        if waypoint is None or tile_grid.is_solid_at(*waypoint): return None
+        x, y = waypoint
+    return None
+
+def run(seed):
+    tile_grid, rooms = make_dungeon(seed)
+    start_time = time.perf_counter(); graph = RoomGraph(tile_grid, rooms); build_time = time.perf_counter() - start_time
+    width = tile_grid.width
+    rng = random.Random(seed)
+    pairs = [rng.sample(rooms, 2) for _ in range(ROUTES)]
+    reached = 0; ratio_sum = 0.0
+    for room_a, room_b in pairs:
+        start = room_a.centery * width + room_a.centerx; goal = room_b.centery * width + room_b.centerx
+        steps = walk(graph, tile_grid, start, goal)
+        if steps is None: continue
+        reached += 1; ratio_sum += steps / max(1, shortest_steps(tile_grid, start, goal))
+    regions = [(graph.region_at((a.centerx + 0.5) * DUNGEON_TILE_SIZE, (a.centery + 0.5) * DUNGEON_TILE_SIZE),
+                graph.region_at((b.centerx + 0.5) * DUNGEON_TILE_SIZE, (b.centery + 0.5) * DUNGEON_TILE_SIZE)) for a, b in pairs]
+    search_time = cached_time = 0.0
+    for start_region, goal_region in regions: # Each pair searched once, then looked up again while still cached
+        graph.clear(); start_time = time.perf_counter(); graph.route(start_region, goal_region)
+        mid = time.perf_counter(); graph.route(start_region, goal_region); end = time.perf_counter()
+        search_time += mid - start_time; cached_time += end - mid
+    search_time /= ROUTES; cached_time /= ROUTES
+    return graph, build_time, reached, ratio_sum / max(1, reached), search_time, cached_time
+
+if __name__ == "__main__":
+    for seed in SEEDS:
+        graph, build_time, reached, ratio, search_time, cached_time = run(seed)
+        print(f"--- Dungeon seed {seed}: {DUNGEON_GRID_WIDTH}x{DUNGEON_GRID_HEIGHT} tiles ---")
+        print(f"  Graph: {len(graph)} regions ({graph.room_count} rooms), {len(graph.portals)} portals, built in {build_time * 1000:.1f} ms")
+        print(f"  Routes: {reached}/{ROUTES} reach the goal room, {ratio:.2f}x the shortest tile path on average")
+        print(f"  Route lookup: search {search_time * 1e6:8.1f} us   cached {cached_time * 1e6:6.2f} us")
+
+# --- END OF FILE bench_room_graph.py ---
@@ -0,0 +1,100 @@
+# --- START OF FILE bench_snapshot_codec.py ---
+"""
+Benchmark: game_state_update as pickled dicts vs the net_codec binary snapshot.
+
+Builds a snapshot of 3 players and a population of enemies, once as the per-entity
+get_network_state() dicts that used to be pickled and once as the columns the arrays
+backend hands to the codec. The server side is timed the way broadcast_data() pays for it:
+pickle ran once per connected client, the codec encodes once for everyone. The client side
+is timed twice: decoding alone, and decoding plus applying the snapshot to the client's
+Enemy objects (apply_network_state() per unpickled dict vs the decoded columns applied row by
+row the way CombatManager.apply_enemy_network_state() does). Bytes per snapshot are reported too.
+
+Run from the repository root:
+    python benchmarks/bench_snapshot_codec.py
+"""
+import os
+import sys
+import pickle
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import net_codec
+from enemies.enemy_base import Enemy, NETWORK_STATE_KEYS
+from enemies.enemy_arrays import ANIM_NAMES
+
+POPULATIONS = [600, 10000]
+CLIENTS = 8
+REPEATS = 50
+SEED = 1337
+
+def make_snapshot(count):
+    rng = np.random.default_rng(SEED)
+    columns = {
+        'id': list(range(count)), 'type': ['Sword_Orc'] * count,
+        'x': rng.uniform(0, 20000, count), 'y': rng.uniform(0, 20000, count),
+        'health': rng.integers(1, 76, count).astype(np.int32), 'max_health': [75] * count,
+        'facing_right': rng.random(count) < 0.5, 'anim': rng.integers(0, len(ANIM_NAMES), count).astype(np.int8),
+        'anim_frame': rng.integers(0, 6, count).astype(np.int32), 'anim_finished': rng.random(count) < 0.1,
+        'is_dead': np.zeros(count, dtype=bool), 'is_invulnerable': rng.random(count) < 0.05, 'is_attacking': rng.random(count) < 0.1,
+        'dialogue_text': [("Meat?" if k % 50 == 0 else None) for k in range(count)], 'dialogue_timer': rng.uniform(0, 3, count),
+    }
+    players = {pid: {'id': pid, 'x': 10000.0 + pid, 'y': 10000.0, 'health': 87.5, 'max_health': 100, 'facing_right': True,
+                     'anim_type': 'walk', 'anim_frame': 2, 'anim_finished': False, 'is_dead': False, 'is_invulnerable': False,
+                     'defense': 0.05, 'agility': 0.08, 'is_attacking': False} for pid in range(3)}
+    return players, columns
+
+def network_states(columns):
+    """The per-enemy dicts EnemyArrays.network_states() builds from the same columns."""
+    count = len(columns['id']); lists = {key: (value.tolist() if isinstance(value, np.ndarray) else value) for key, value in columns.items()}
+    return {lists['id'][k]: {
+        'id': lists['id'][k], 'type': lists['type'][k], 'x': lists['x'][k], 'y': lists['y'][k], 'health': lists['health'][k],
+        'max_health': lists['max_health'][k], 'facing_right': lists['facing_right'][k], 'anim_type': ANIM_NAMES[lists['anim'][k]],
+        'anim_frame': lists['anim_frame'][k], 'anim_finished': lists['anim_finished'][k], 'is_dead': lists['is_dead'][k],
+        'is_invulnerable': lists['is_invulnerable'][k], 'is_attacking': lists['is_attacking'][k],
+        'dialogue_text': lists['dialogue_text'][k], 'dialogue_timer': lists['dialogue_timer'][k]} for k in range(count)}
+
+def make_client_enemies(count):
+    return {enemy_id: Enemy(0, 0, 75, 2.5, 22, 35, 1.5, 250, 0.1, 0.05, [None] * 4, [None] * 6, [None] * 5, [None] * 3, [None] * 7,
+                            (40, 40), name="Sword_Orc") for enemy_id in range(count)}
+
+def pickle_client(pickled, client_enemies):
+    for enemy_id, state in pickle.loads(pickled)['enemies'].items(): client_enemies[enemy_id].apply_network_state(state)
+
+def codec_client(encoded, client_enemies):
+    columns = net_codec.decode_message(encoded)['enemy_columns']
+    rows = zip(*(columns[key] for key in NETWORK_STATE_KEYS))
+    for enemy_id, values in zip(columns['id'], rows): client_enemies[enemy_id].apply_network_values(*values)
+
+def timed(func):
+    start = time.perf_counter()
+    for _ in range(REPEATS): result = func()
+    return (time.perf_counter() - start) / REPEATS, result
+
+def pickle_server(players, columns):
+    message = {'type': 'game_state_update', 'players': players, 'enemies': network_states(columns)}
+    return [pickle.dumps(message) for _ in range(CLIENTS)][0]
+
+def codec_server(players, columns):
+    return net_codec.encode_message({'type': 'game_state_update', 'players': players, 'enemy_columns': columns})
+
+if __name__ == "__main__":
+    for count in POPULATIONS:
+        players, columns = make_snapshot(count)
+        pickle_time, pickled = timed(lambda: pickle_server(players, columns))
+        codec_time, encoded = timed(lambda: codec_server(players, columns))
+        unpickle_time, _ = timed(lambda: pickle.loads(pickled))
+        decode_time, decoded = timed(lambda: net_codec.decode_message(encoded))
+        assert decoded['enemy_columns']['id'] == columns['id']
+        client_enemies = make_client_enemies(count)
+        pickle_apply_time, _ = timed(lambda: pickle_client(pickled, client_enemies))
+        codec_apply_time, _ = timed(lambda: codec_client(encoded, client_enemies))
+        print(f"--- {count} enemies, {CLIENTS} clients, {REPEATS} snapshots ---")
+        print(f"  Bytes:  pickle {len(pickled):8d}   codec {len(encoded):8d} ({len(pickled) / len(encoded):.1f}x smaller)")
+        print(f"  Server: pickle {pickle_time * 1000:8.2f} ms   codec {codec_time * 1000:8.2f} ms ({pickle_time / max(codec_time, 1e-9):.1f}x)")
+        print(f"  Client decode:         pickle {unpickle_time * 1000:8.2f} ms   codec {decode_time * 1000:8.2f} ms ({unpickle_time / max(decode_time, 1e-9):.1f}x)")
+        print(f"  Client decode + apply: pickle {pickle_apply_time * 1000:8.2f} ms   codec {codec_apply_time * 1000:8.2f} ms ({pickle_apply_time / max(codec_apply_time, 1e-9):.1f}x)")
+
+# --- END OF FILE bench_snapshot_codec.py ---
@@ -0,0 +1,73 @@
+# --- START OF FILE bench_snapshot_delta.py ---
+"""
+Benchmark: full binary snapshots vs deltas against the client's acknowledged baseline.
+
+Simulates a population where only a fraction of the enemies does anything in a tick (the
+rest idle, as most orcs away from the players do): active ones move, and some change
+animation frame or health. Each tick SnapshotHistory records the state and one client,
+acking every tick, gets encode_for(ack), which SnapshotReceiver applies. Reported: bytes per
+tick and server encode / client apply time for the full snapshot and for the delta.
+
+Run from the repository root:
+    python benchmarks/bench_snapshot_delta.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import net_codec
+
+POPULATIONS = [600, 10000]
+ACTIVE_FRACTIONS = [0.02, 0.1, 0.5]
+TICKS = 60
+SEED = 1337
+
+def make_columns(count, rng):
+    return {
+        'id': np.arange(count), 'type': ['Sword_Orc'] * count,
+        'x': rng.uniform(0, 20000, count), 'y': rng.uniform(0, 20000, count),
+        'health': np.full(count, 75, dtype=np.int32), 'max_health': [75] * count,
+        'facing_right': np.ones(count, dtype=bool), 'anim': np.zeros(count, dtype=np.int8),
+        'anim_frame': np.zeros(count, dtype=np.int32), 'anim_finished': np.zeros(count, dtype=bool),
+        'is_dead': np.zeros(count, dtype=bool), 'is_invulnerable': np.zeros(count, dtype=bool), 'is_attacking': np.zeros(count, dtype=bool),
+        'dialogue_text': [None] * count, 'dialogue_timer': np.zeros(count),
+    }
+
+def step(columns, active_fraction, rng):
+    count = len(columns['id'])
+    active = rng.random(count) < active_fraction
+    columns['x'][active] += rng.uniform(-2, 2, int(active.sum())); columns['y'][active] += rng.uniform(-2, 2, int(active.sum()))
+    columns['anim'][active] = 1; columns['anim_frame'][active] = (columns['anim_frame'][active] + 1) % 6
+    hit = active & (rng.random(count) < 0.05); columns['health'][hit] -= 1
+
+def run(count, active_fraction):
+    rng = np.random.default_rng(SEED)
+    columns = make_columns(count, rng)
+    history = net_codec.SnapshotHistory(); receiver = net_codec.SnapshotReceiver()
+    full_bytes = delta_bytes = 0; full_time = delta_time = apply_time = 0.0
+    for _ in range(TICKS):
+        step(columns, active_fraction, rng)
+        history.push({}, columns)
+        start = time.perf_counter()
+        full = history._full()
+        mid = time.perf_counter()
+        payload = history.encode_for(receiver.ack)
+        end = time.perf_counter()
+        receiver.receive(net_codec.decode_message(payload))
+        apply_time += time.perf_counter() - end
+        full_time += mid - start; delta_time += end - mid
+        full_bytes += len(full); delta_bytes += len(payload)
+    return full_bytes / TICKS, delta_bytes / TICKS, full_time / TICKS, delta_time / TICKS, apply_time / TICKS
+
+if __name__ == "__main__":
+    for count in POPULATIONS:
+        print(f"--- {count} enemies, {TICKS} ticks ---")
+        for fraction in ACTIVE_FRACTIONS:
+            full_bytes, delta_bytes, full_time, delta_time, apply_time = run(count, fraction)
+            print(f"  {fraction * 100:4.0f}% active: full {full_bytes:9.0f} B/tick   delta {delta_bytes:9.0f} B/tick ({full_bytes / max(delta_bytes, 1):5.1f}x smaller)"
+                  f"   encode full {full_time * 1000:6.2f} ms / delta {delta_time * 1000:6.2f} ms   client decode+apply {apply_time * 1000:6.2f} ms")
+
+# --- END OF FILE bench_snapshot_delta.py ---
@@ -0,0 +1,89 @@
+# --- START OF FILE bench_think_scheduler.py ---
+"""
+Benchmark: time-sliced enemy thinking (ThinkScheduler) on the EnemyArrays backend.
+
+Packs Sword_Orc-like enemies around three walking players, so every one of them is in the
+active tier, and runs the same part loop as CombatManager._update_arrays(): one step() per
+think chunk while the budget lasts, then one for everyone else. A few enemies are removed
+every REMOVE_EVERY ticks, which moves tail slots around. For each think budget it reports
+the step time per tick, thinks per tick, the deferred backlog, and the longest an enemy
+waited between thinks. It then checks two things. Without a budget every enemy thinks
+exactly every ENEMY_THINK_BUCKETS ticks, removals or not. A tiny budget cuts each tick
+down to one chunk and defers the rest, yet still reaches every enemy.
+
+Run from the repository root:
+    python benchmarks/bench_think_scheduler.py
+"""
+import os
+import sys
+import math
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from enemies.enemy_base import Enemy
+from enemies.enemy_arrays import EnemyArrays
+from enemies.think_scheduler import ThinkScheduler
+from enemies.stat_constants import *
+
+POPULATION = 10000
+AREA = 4000 # Side of the square the enemies and players share
+TICKS = 240
+WARMUP_TICKS = 2 * ENEMY_THINK_BUCKETS # Waits before this are not checked (nobody has a previous think yet)
+REMOVE_EVERY = 10; REMOVE_COUNT = 25
+BUDGETS_MS = [0.0, ENEMY_THINK_BUDGET_MS, 0.01] # 0 = unlimited; the last one is too small for any full chunk
+DT = 1 / 60
+SEED = 1337
+
+class BenchPlayer:
+    def __init__(self, player_id, x, y):
+        self.player_id = player_id; self.x = x; self.y = y; self.is_dead = False
+
+def make_store():
+    random.seed(SEED)
+    store = EnemyArrays()
+    for _ in range(POPULATION):
+        store.add(Enemy(random.uniform(0, AREA), random.uniform(0, AREA), SWORD_ORC_BASE_HEALTH, SWORD_ORC_BASE_SPEED,
+                        SWORD_ORC_ATTACK_POWER, SWORD_ORC_ATTACK_RANGE, SWORD_ORC_ATTACK_COOLDOWN, SWORD_ORC_DETECTION_RADIUS,
+                        SWORD_ORC_BASE_DEFENSE, SWORD_ORC_BASE_AGILITY, [None] * 4, [None] * 6, [None] * 5, [None] * 3, [None] * 7,
+                        (40, 40), name="Sword_Orc", attack_hit_frame_index=3))
+    return store
+
+def run(budget_ms):
+    store = make_store(); scheduler = ThinkScheduler(budget_ms=budget_ms); rng = random.Random(SEED + 1)
+    players = {i: BenchPlayer(i, AREA * (i + 1) / 4, AREA / 2) for i in range(3)}
+    last_think = {}; waits = []; thinks = deferred = 0; step_time = 0.0
+    for tick in range(TICKS):
+        if tick and tick % REMOVE_EVERY == 0: # Deaths: tail enemies move into the freed slots
+            removed = rng.sample(store.views, REMOVE_COUNT)
+            for view in removed: scheduler.forget(view); last_think.pop(view.id, None)
+            store.remove_many(removed)
+        for player in players.values(): player.x = (player.x + 2) % AREA
+        start = time.perf_counter(); scheduler.begin_tick()
+        slots = store.all_slots(); ids = store.id[slots]
+        for part, think in scheduler.think_slices(ids):
+            if think is None:
+                for enemy_id in ids[part].tolist():
+                    if tick >= WARMUP_TICKS: waits.append(tick - last_think.get(enemy_id, -1))
+                    last_think[enemy_id] = tick
+            store.step(players, DT, slots[part], think)
+        scheduler.end_tick(); step_time += time.perf_counter() - start
+        thinks += scheduler.thought; deferred += scheduler.deferred_count
+    return step_time / TICKS, thinks / TICKS, deferred / TICKS, len(scheduler.deferred), waits, last_think, store
+
+if __name__ == "__main__":
+    print(f"--- {POPULATION} active enemies, {ENEMY_THINK_BUCKETS} buckets, chunks of {ENEMY_THINK_CHUNK}, {TICKS} ticks ---")
+    for budget_ms in BUDGETS_MS:
+        step_time, thinks, deferred, backlog, waits, last_think, store = run(budget_ms)
+        print(f"  Budget {budget_ms or 'none':>5} ms: {step_time * 1000:7.2f} ms/tick, {thinks:6.0f} thinks/tick, "
+              f"{deferred:6.0f} cut off/tick, backlog {backlog:5d}, longest wait {max(waits)} ticks")
+        assert all(enemy_id in last_think for enemy_id in store.id[:store.count].tolist()), "Some enemy never thought"
+        if not budget_ms:
+            assert min(waits) == max(waits) == ENEMY_THINK_BUCKETS, f"Think waits {min(waits)}..{max(waits)}, expected {ENEMY_THINK_BUCKETS}"
+        if budget_ms == BUDGETS_MS[-1]:
+            assert thinks == ENEMY_THINK_CHUNK and backlog > 0, "A tiny budget should leave one chunk per tick and defer the rest"
+            assert max(waits) <= math.ceil(POPULATION / ENEMY_THINK_CHUNK) + 1, "Deferred enemies are starving"
+
+# --- END OF FILE bench_think_scheduler.py ---
@@ -1,11 +1,24 @@
 # --- START OF FILE combat_manager.py ---
 import random
+import math
+import time
 
 import enemies.player as player_module
 from combat_mech import PLAYER_ATTACK_POWER, PLAYER_ATTACK_RANGE
 
-from enemies.enemy_base import Enemy
+from enemies.enemy_base import Enemy, NETWORK_STATE_KEYS
+from enemies.enemy_arrays import EnemyArrays, ANIM_CODES
+from enemies.think_scheduler import ThinkScheduler
+from enemies.enemy_pool import EnemyPool
+from enemies.respawn_scheduler import RespawnScheduler
 from world_struct import *
+from world_structures.spatial_hash import SpatialHash
+from world_structures.tile_collider import TileCollisionGrid
+from world_structures.broadphase_cache import BroadPhaseCache
+from world_structures.flow_field import FlowFieldService
+from world_structures.line_of_sight import LineOfSightService
+from world_structures.timer_wheel import TimerWheel
+from world_structures import kinematics, crowd
 
 from NETconfig import is_host
 
@@ -21,7 +34,7 @@ class CombatManager:
 
         Args:
             world_data (dict): Dictionary containing world information (polygons, dimensions, dungeon data).
-            collision_quadtree: Quadtree instance for spatial queries of colliders.
+            collision_quadtree: Collision index (StaticCollisionIndex, or TileCollisionGrid in the dungeon) for collider queries.
             is_point_in_polygon_func: Function to check point-in-polygon containment.
             all_enemy_animations (dict): Nested dictionary mapping enemy type names to their animation data
                                          (e.g., {"Sword_Orc": {"idle": [...], "walk": [...], ... "dims": (w,h)}}).
@@ -29,11 +42,35 @@ class CombatManager:
         self.world_data = world_data
         self.quadtree = collision_quadtree
         self.is_point_in_polygon = is_point_in_polygon_func
-        self.enemies = [] # List to hold active enemy instances
+        self.enemy_pool = EnemyPool() # O(1) removal and recycled enemies (server side)
+        self.enemies = self.enemy_pool.active # List to hold active enemy instances (owned by the pool, order not stable)
         
         self.client_enemies = {} # <<< NETWORK: Client: Dictionary of Enemy objects {enemy_id: enemy_obj}
         self.network_players = network_players_dict # Reference to the shared player dictionary
 
+        # Spatial hashes for "who is near X" queries (server side)
+        self.enemy_hash = SpatialHash() # Kept in sync as enemies spawn, move and are removed
+        self.player_hash = SpatialHash() # Re-synced from network_players before it is queried
+        self.max_enemy_radius = 0.0; self.max_player_radius = 0.0 # Widen radius queries so edge overlaps are not missed
+        self.collider_cache = None # BroadPhaseCache over the collision index (server side, created on first update)
+        self.broadphase_counters = (0, 0, 0) # Last tick's (cache hits, index queries, invalidations)
+        self.flow_field = None # FlowFieldService over the dungeon tile grid (None outside dungeons)
+        self.flow_field_counters = (0, 0) # Last tick's (field builds, waypoint lookups)
+        self.room_route_counters = (0, 0) # Last tick's (route cache hits, route searches) on the dungeon room graph
+        self.line_of_sight = None # LineOfSightService over the collision data in use (enemies do not see through walls)
+        self.los_counters = (0, 0) # Last tick's (visibility cache hits, rays cast)
+        # Server simulation backend: with EnemyArrays, self.enemies holds EnemyViews over its arrays
+        self.enemy_store = EnemyArrays() if ENEMY_SIM_BACKEND == "arrays" and EnemyArrays.available() else None
+        # Simulation level-of-detail (see _lod_tiers): last tick's {tier: (enemy count, seconds spent)} and report totals
+        self.lod_tick = 0
+        self.lod_stats = {'active': (0, 0.0), 'reduced': (0, 0.0), 'dormant': (0, 0.0)}
+        self.lod_report_totals = {tier: [0, 0.0] for tier in self.lod_stats}; self.lod_report_ticks = 0; self.lod_report_elapsed = 0.0
+        self.think_scheduler = ThinkScheduler() # Spreads active enemies' targeting / state decisions over ticks
+        self.think_report_totals = [0, 0] # Thinks run / deferred since the last LOD report
+        self.timer_wheel = TimerWheel() # Objects backend enemies' countdowns (the arrays backend counts down whole columns)
+        self.respawns = RespawnScheduler() # Replaces removed enemies per spawn region, a few per tick
+        self.respawn_counters = (0, 0) # Last tick's (replacements spawned, due replacements left waiting)
+
         self.enemy_animations = all_enemy_animations
         # Map enemy type names (strings) to their actual class objects
         self.enemy_classes = {
@@ -48,52 +85,110 @@ class CombatManager:
         # Reset enemy ID counter at initialization (server side)
         Enemy._enemy_id_counter = 0
 
+    def register_enemy(self, enemy):
+        """(Server Only) Adds an enemy to the active list and the enemy spatial hash (as an EnemyView with the arrays backend)."""
+        if self.enemy_store is not None: enemy = self.enemy_store.add(enemy)
+        else: enemy.attach_timers(self.timer_wheel)
+        self.enemy_pool.add(enemy)
+        self.enemy_hash.insert(enemy, enemy.x, enemy.y)
+        self.max_enemy_radius = max(self.max_enemy_radius, enemy.radius)
+
+    def unregister_enemy(self, enemy):
+        """(Server Only) Removes an enemy from the active list, the enemy spatial hash and the broad-phase cache, and retires it to the pool (its spawn region schedules a replacement)."""
+        self.unregister_enemies([enemy])
+
+    def unregister_enemies(self, enemies):
+        """(Server Only) unregister_enemy() for a batch (one column compaction with the arrays backend)."""
+        enemies = [enemy for enemy in enemies if self.enemy_pool.remove(enemy)]
+        for enemy in enemies:
+            self.enemy_hash.remove(enemy)
+            if self.collider_cache: self.collider_cache.forget(enemy)
+            self.think_scheduler.forget(enemy)
+            self.respawns.forget(enemy) # Schedules its replacement
+        if self.enemy_store is not None: enemies = self.enemy_store.remove_many(enemies, write_back=False) # Back to plain Enemies, reset on reuse
+        else:
+            for enemy in enemies: enemy.detach_timers()
+        for enemy in enemies: self.enemy_pool.release(enemy)
+
+    def _sync_player_hash(self, network_players_dict):
+        """(Server Only) Moves every known player to its current position in the player hash and drops departed ones."""
+        live_players = set()
+        for p_id, player in list(network_players_dict.items()): # Copy: handler threads may edit the dict
+            if player:
+                self.player_hash.move(player, player.x, player.y)
+                live_players.add(player)
+                self.max_player_radius = max(self.max_player_radius, player.radius)
+        for player in [p for p in self.player_hash.entries if p not in live_players]:
+            self.player_hash.remove(player)
+
+    def _spawn_enemy(self, spawn_x, spawn_y):
+        """(Server Only) Acquires an enemy of a random available type at (spawn_x, spawn_y) and registers it. Returns it, or None on failure."""
+        enemy_type_name = random.choice(self.available_enemy_types)
+        EnemyClass = self.enemy_classes.get(enemy_type_name)
+        animations = self.enemy_animations.get(enemy_type_name)
+        if not (EnemyClass and animations):
+            print(f"[SERVER] Warning: Could not find class or animations for {enemy_type_name}.")
+            return None
+        try:
+            new_enemy = self.enemy_pool.acquire(EnemyClass, spawn_x, spawn_y,
+                                                animations['idle'], animations['walk'],
+                                                animations['attack'], animations['hurt'],
+                                                animations['death'], animations['dims'])
+            self.register_enemy(new_enemy) # Add to server list
+            return new_enemy
+        except KeyError as e:
+            print(f"[SERVER] ERROR: Missing animation key '{e}' for {enemy_type_name}.")
+        except Exception as e:
+            print(f"[SERVER] ERROR: Failed to instantiate {enemy_type_name}: {e}")
+        return None
+
+    def _overworld_spawn_point(self, left, top, right, bottom):
+        """(Server Only) One random spawn point inside the area, or None if it landed in the kingdom."""
+        spawn_x = random.randint(left, right); spawn_y = random.randint(top, bottom)
+        kingdom_poly = self.world_data.get("kingdom_poly_points")
+        if kingdom_poly and self.is_point_in_polygon((spawn_x, spawn_y), kingdom_poly): return None # Check validity (outside kingdom)
+        return spawn_x, spawn_y
+
+    def _dungeon_spawn_point(self, room_index):
+        """(Server Only) Centre of one random tile of a dungeon room, or None if the tile grid treats that tile as solid."""
+        tile_grid = self.quadtree if isinstance(self.quadtree, TileCollisionGrid) else None
+        if tile_grid is None: return None # Walkability comes from the same grid enemies collide with
+        room = self.world_data.get("dungeon_rooms_grid", [])[room_index]
+        grid_x = random.randint(room.left, room.right - 1)
+        grid_y = random.randint(room.top, room.bottom - 1)
+        if 0 <= grid_x < tile_grid.width and 0 <= grid_y < tile_grid.height and not tile_grid.solid[grid_y * tile_grid.width + grid_x]:
+            ts = tile_grid.tile_size
+            return grid_x * ts + ts // 2, grid_y * ts + ts // 2
+        return None
+
+    def _overworld_region(self, x, y):
+        return ('overworld', int(x // ENEMY_RESPAWN_REGION_SIZE), int(y // ENEMY_RESPAWN_REGION_SIZE))
+
     def spawn_enemies_in_overworld(self, count):
-        """(Server Only) Spawns enemies in the overworld."""
+        """(Server Only) Spawns enemies in the overworld. They set the respawn targets of their overworld regions."""
         print(f"[SERVER] Spawning {count} enemies in Overworld...")
         if not self.available_enemy_types: return
 
         spawned_count = 0
         attempts = 0
         max_attempts = count * 20
-        forest_poly = self.world_data.get("forest_poly_points")
-        kingdom_poly = self.world_data.get("kingdom_poly_points")
         world_w = self.world_data.get("WORLD_WIDTH", 20000)
         world_h = self.world_data.get("WORLD_HEIGHT", 20000)
 
         while spawned_count < count and attempts < max_attempts:
             attempts += 1
-            spawn_x = random.randint(0, world_w)
-            spawn_y = random.randint(0, world_h)
-            spawn_point = (spawn_x, spawn_y)
-
-            # Check validity (e.g., outside kingdom)
-            in_kingdom = kingdom_poly and self.is_point_in_polygon(spawn_point, kingdom_poly)
-            if not in_kingdom:
-                enemy_type_name = random.choice(self.available_enemy_types)
-                EnemyClass = self.enemy_classes.get(enemy_type_name)
-                animations = self.enemy_animations.get(enemy_type_name)
-
-                if EnemyClass and animations:
-                    try:
-                        new_enemy = EnemyClass(spawn_x, spawn_y,
-                                               animations['idle'], animations['walk'],
-                                               animations['attack'], animations['hurt'],
-                                               animations['death'], animations['dims'])
-                        self.enemies.append(new_enemy) # Add to server list
-                        spawned_count += 1
-                    except KeyError as e:
-                        print(f"[SERVER] ERROR: Missing animation key '{e}' for {enemy_type_name}.")
-                    except Exception as e:
-                         print(f"[SERVER] ERROR: Failed to instantiate {enemy_type_name}: {e}")
-                else:
-                    print(f"[SERVER] Warning: Could not find class or animations for {enemy_type_name}.")
+            spawn_point = self._overworld_spawn_point(0, 0, world_w, world_h)
+            if spawn_point is None: continue
+            new_enemy = self._spawn_enemy(*spawn_point)
+            if new_enemy is not None:
+                self.respawns.track(new_enemy, self._overworld_region(*spawn_point), initial=True)
+                spawned_count += 1
 
         print(f"[SERVER] Successfully spawned {spawned_count} enemies in Overworld.")
 
 
     def spawn_enemies_in_dungeon(self, count):
-        """(Server Only) Spawns enemies in the dungeon."""
+        """(Server Only) Spawns enemies in the dungeon. They set the respawn targets of their rooms."""
         print(f"[SERVER] Spawning {count} enemies in Dungeon...")
         if not self.available_enemy_types: return
 
@@ -101,49 +196,50 @@ class CombatManager:
         attempts = 0
         max_attempts = count * 20
         dungeon_rooms = self.world_data.get("dungeon_rooms_grid", [])
-        dungeon_grid = self.world_data.get("dungeon_grid")
-        TILE_FLOOR = TILE_FLOOR # Get from world_struct
-        DUNGEON_TILE_SIZE = DUNGEON_TILE_SIZE
 
-        if not dungeon_rooms or not dungeon_grid:
-            print("[SERVER] Warning: Cannot spawn dungeon enemies, grid/rooms missing.")
+        if not dungeon_rooms or not isinstance(self.quadtree, TileCollisionGrid):
+            print("[SERVER] Warning: Cannot spawn dungeon enemies, tile grid/rooms missing.")
             return
 
         while spawned_count < count and attempts < max_attempts:
              attempts += 1
              try:
-                 room = random.choice(dungeon_rooms)
-                 grid_x = random.randint(room.left, room.right - 1)
-                 grid_y = random.randint(room.top, room.bottom - 1)
-
-                 if 0 <= grid_y < len(dungeon_grid) and 0 <= grid_x < len(dungeon_grid[0]) and dungeon_grid[grid_y][grid_x] == TILE_FLOOR:
-                     spawn_x = grid_x * DUNGEON_TILE_SIZE + DUNGEON_TILE_SIZE // 2
-                     spawn_y = grid_y * DUNGEON_TILE_SIZE + DUNGEON_TILE_SIZE // 2
-
-                     enemy_type_name = random.choice(self.available_enemy_types)
-                     EnemyClass = self.enemy_classes.get(enemy_type_name)
-                     animations = self.enemy_animations.get(enemy_type_name)
-
-                     if EnemyClass and animations:
-                         try:
-                             new_enemy = EnemyClass(spawn_x, spawn_y,
-                                                  animations['idle'], animations['walk'],
-                                                  animations['attack'], animations['hurt'],
-                                                  animations['death'], animations['dims'])
-                             self.enemies.append(new_enemy) # Add to server list
-                             spawned_count += 1
-                         except KeyError as e:
-                              print(f"[SERVER] ERROR: Missing animation key '{e}' for {enemy_type_name}.")
-                         except Exception as e:
-                             print(f"[SERVER] ERROR: Failed to instantiate {enemy_type_name}: {e}")
-                     else:
-                        print(f"[SERVER] Warning: Could not find class/animations for {enemy_type_name}.")
-
-             except IndexError: continue
-             except ValueError: continue
+                 room_index = random.randrange(len(dungeon_rooms))
+                 spawn_point = self._dungeon_spawn_point(room_index)
+             except ValueError: continue # Empty room rect
+             if spawn_point is None: continue
+             new_enemy = self._spawn_enemy(*spawn_point)
+             if new_enemy is not None:
+                 self.respawns.track(new_enemy, ('dungeon', room_index), initial=True)
+                 spawned_count += 1
 
         print(f"[SERVER] Successfully spawned {spawned_count} enemies in Dungeon.")
 
+    def _respawn_point(self, region):
+        """(Server Only) A spawn point inside region that no player is near, or None after ENEMY_RESPAWN_ATTEMPTS samples."""
+        for _ in range(ENEMY_RESPAWN_ATTEMPTS):
+            if region[0] == 'dungeon':
+                try: spawn_point = self._dungeon_spawn_point(region[1])
+                except (ValueError, IndexError): return None # Room gone or empty
+            else:
+                size = ENEMY_RESPAWN_REGION_SIZE
+                left = region[1] * size; top = region[2] * size
+                right = min(left + size, self.world_data.get("WORLD_WIDTH", 20000)); bottom = min(top + size, self.world_data.get("WORLD_HEIGHT", 20000))
+                spawn_point = self._overworld_spawn_point(left, top, right, bottom)
+            if spawn_point is not None and not self.player_hash.query_radius(spawn_point[0], spawn_point[1], ENEMY_RESPAWN_MIN_PLAYER_DISTANCE):
+                return spawn_point
+        return None
+
+    def _run_respawns(self, dt):
+        """(Server Only) Spawns this tick's due replacements (at most ENEMY_RESPAWN_MAX_PER_TICK), each inside its own region."""
+        self.respawns.advance(dt)
+        for region in self.respawns.due():
+            spawn_point = self._respawn_point(region)
+            new_enemy = self._spawn_enemy(*spawn_point) if spawn_point is not None else None
+            if new_enemy is not None: self.respawns.track(new_enemy, region)
+            else: self.respawns.retry(region)
+        self.respawn_counters = self.respawns.take_counters()
+
     # <<< NETWORK: handle_player_attack takes the specific player object >>>
     def handle_player_attack(self, player):
         """(Server Only) Processes an attack action from a specific player."""
@@ -158,7 +254,9 @@ class CombatManager:
         attack_range_sq = (PLAYER_ATTACK_RANGE * 0.8)**2 # Adjust hitbox size as needed
 
         enemies_hit_count = 0
-        for enemy in self.enemies:
+        # Only enemies near the swing can be hit (exact overlap test below)
+        enemy_query_radius = math.sqrt(attack_range_sq + self.max_enemy_radius**2)
+        for enemy in self.enemy_hash.query_radius(attack_center_x, attack_center_y, enemy_query_radius):
             if enemy.is_dead: continue
 
             # Check distance from attack center to enemy center
@@ -178,8 +276,11 @@ class CombatManager:
         
         # --- 2. Check for hits against OTHER PLAYERS (PvP) ---
         players_hit_count = 0
-        # Iterate through all players known to the server (including the attacker)
-        for target_player_id, target_player in self.network_players.items():
+        # Iterate through players near the swing (the hash is refreshed first: players move outside update())
+        self._sync_player_hash(self.network_players)
+        player_query_radius = math.sqrt(attack_range_sq + self.max_player_radius**2)
+        for target_player in self.player_hash.query_radius(attack_center_x, attack_center_y, player_query_radius):
+            target_player_id = target_player.player_id
             # Skip the attacking player and dead players
             if target_player_id == player.player_id or target_player.is_dead:
                 continue
@@ -226,21 +327,146 @@ class CombatManager:
              # Attack missed because target moved out of range after animation started
 
 
+    def _room_graph(self, tile_grid):
+        """(Server Only) The dungeon RoomGraph built at load time, if it belongs to the tile grid in use."""
+        room_graph = self.world_data.get("dungeon_room_graph")
+        return room_graph if tile_grid is not None and room_graph is not None and room_graph.tile_grid is tile_grid else None
+
+    def _collider_candidates(self, movers, dt, collision_quadtree, tile_grid):
+        """(Server Only) Broad-phase candidate lists for movers (one per mover), or None when there is nothing to query."""
+        if not collision_quadtree or tile_grid is not None: return None # The dungeon tile grid needs no broad-phase
+        query_ranges = [kinematics.sweep_query_rect(enemy.rect, enemy.speed, dt) for enemy in movers] # Movement is swept, so the step length is enough
+        # Idle and slow enemies reuse last tick's candidates; only the rest go to the index (in one batch)
+        self.collider_cache = BroadPhaseCache.bind(self.collider_cache, collision_quadtree)
+        return self.collider_cache.query_batch(movers, query_ranges)
+
+    def _crowd_push_objects(self, enemies):
+        """(Server Only) Separation push per enemy (scaled by ENEMY_SEPARATION_WEIGHT) from where the tier starts the tick, or None if off."""
+        if not ENEMY_SEPARATION_WEIGHT or len(enemies) < 2: return None
+        weight = ENEMY_SEPARATION_WEIGHT
+        if crowd.available():
+            push_x, push_y = crowd.separation_push([enemy.x for enemy in enemies], [enemy.y for enemy in enemies], ENEMY_SEPARATION_RADIUS,
+                                                   ENEMY_SEPARATION_CELL_CAP, ENEMY_SEPARATION_DEAD_ZONE)
+            return list(zip((push_x * weight).tolist(), (push_y * weight).tolist()))
+        # Without NumPy: neighbours from the enemy hash, one query per enemy
+        pushes = [crowd.separation_push_hashed(enemy, self.enemy_hash, ENEMY_SEPARATION_RADIUS, ENEMY_SEPARATION_DEAD_ZONE) for enemy in enemies]
+        return [(push_x * weight, push_y * weight) for push_x, push_y in pushes]
+
+    def _crowd_push_arrays(self, slots):
+        """(Server Only) Separation push over slots (None = all), scaled by ENEMY_SEPARATION_WEIGHT, or None if off."""
+        if not ENEMY_SEPARATION_WEIGHT: return None
+        store = self.enemy_store
+        x = store.x[:store.count] if slots is None else store.x[slots]; y = store.y[:store.count] if slots is None else store.y[slots]
+        push_x, push_y = crowd.separation_push(x, y, ENEMY_SEPARATION_RADIUS, ENEMY_SEPARATION_CELL_CAP, ENEMY_SEPARATION_DEAD_ZONE)
+        return push_x * ENEMY_SEPARATION_WEIGHT, push_y * ENEMY_SEPARATION_WEIGHT
+
+    def _lod_tiers(self, network_players_dict):
+        """
+        (Server Only) Splits enemies into simulation tiers by distance to the nearest player: active (every tick),
+        reduced (every ENEMY_LOD_REDUCED_INTERVAL ticks, staggered) and dormant (not updated). Tiers are
+        recomputed every tick, so an enemy wakes up the first tick a player is within range.
+        Returns (active, reduced_due, reduced_count, dormant_count); active / reduced_due are slot arrays with
+        the arrays backend (None = all slots) and enemy lists otherwise.
+        """
+        interval = max(1, ENEMY_LOD_REDUCED_INTERVAL); phase = self.lod_tick % interval
+        if not ENEMY_LOD_ENABLED: return (None if self.enemy_store is not None else self.enemies), [], 0, 0
+        if self.enemy_store is not None:
+            active, reduced = self.enemy_store.lod_tiers(network_players_dict, ENEMY_LOD_ACTIVE_RADIUS, ENEMY_LOD_REDUCED_RADIUS)
+            reduced_due = reduced[self.enemy_store.id[reduced] % interval == phase] # Staggered by enemy id, like the objects backend (slots move)
+        else:
+            # Only enemies near some player are looked at; everything the hash does not return is dormant
+            nearest_sq = {}
+            for player in list(network_players_dict.values()):
+                if not player: continue
+                for enemy in self.enemy_hash.query_radius(player.x, player.y, ENEMY_LOD_REDUCED_RADIUS):
+                    dist_sq = (enemy.x - player.x)**2 + (enemy.y - player.y)**2
+                    if dist_sq < nearest_sq.get(enemy, math.inf): nearest_sq[enemy] = dist_sq
+            active_radius_sq = ENEMY_LOD_ACTIVE_RADIUS * ENEMY_LOD_ACTIVE_RADIUS
+            active = [enemy for enemy in self.enemies if nearest_sq.get(enemy, math.inf) <= active_radius_sq]
+            reduced = [enemy for enemy in self.enemies if active_radius_sq < nearest_sq.get(enemy, math.inf) < math.inf]
+            reduced_due = [enemy for enemy in reduced if enemy.id % interval == phase]
+        return active, reduced_due, len(reduced), len(self.enemies) - len(active) - len(reduced)
+
+    def _record_lod(self, active_count, reduced_count, dormant_count, active_time, reduced_time, dt):
+        """(Server Only) Stores this tick's per-tier counts / times and prints a tier report every ENEMY_LOD_REPORT_INTERVAL seconds."""
+        self.lod_stats = {'active': (active_count, active_time), 'reduced': (reduced_count, reduced_time), 'dormant': (dormant_count, 0.0)}
+        if not ENEMY_LOD_REPORT_INTERVAL: return
+        for tier, (count, seconds) in self.lod_stats.items():
+            totals = self.lod_report_totals[tier]; totals[0] += count; totals[1] += seconds
+        self.think_report_totals[0] += self.think_scheduler.thought; self.think_report_totals[1] += self.think_scheduler.deferred_count
+        self.lod_report_ticks += 1; self.lod_report_elapsed += dt
+        if self.lod_report_elapsed >= ENEMY_LOD_REPORT_INTERVAL:
+            ticks = self.lod_report_ticks
+            report = ", ".join(f"{tier} {count / ticks:.0f} ({seconds * 1000 / ticks:.2f} ms/tick)" for tier, (count, seconds) in self.lod_report_totals.items())
+            thinks, deferred = self.think_report_totals
+            print(f"[SERVER] Enemy LOD over {self.lod_report_elapsed:.1f}s: {report}; thinks {thinks / ticks:.0f}/tick, {deferred / ticks:.0f} deferred")
+            self.lod_report_totals = {tier: [0, 0.0] for tier in self.lod_stats}; self.lod_report_ticks = 0; self.lod_report_elapsed = 0.0
+            self.think_report_totals = [0, 0]
+
     def update(self, network_players_dict, dt, collision_quadtree, game_state):
-        """(Server Only) Updates all enemies."""
+        """(Server Only) Updates all enemies, tier by tier (see _lod_tiers)."""
         if not network_players_dict: return # Don't update if no players
 
+        self._sync_player_hash(network_players_dict)
+        self.timer_wheel.advance(dt) # Fires the countdowns that ran out (zeroes them before the enemies read them)
+        tile_grid = collision_quadtree if isinstance(collision_quadtree, TileCollisionGrid) else None
+        wall_segments = self.world_data.get("wall_segments") if tile_grid is None else None # Kingdom wall capsules (overworld)
+        if tile_grid is not None: self.flow_field = FlowFieldService.bind(self.flow_field, tile_grid) # Chase routes around dungeon walls
+        elif self.flow_field is not None: self.flow_field.close(); self.flow_field = None
+        if collision_quadtree is not None: # Occupancy grid for perception: the tile grid itself, or rasterized colliders + wall capsules
+            self.line_of_sight = LineOfSightService.bind(self.line_of_sight, collision_quadtree, wall_segments); self.line_of_sight.begin_tick()
+        elif self.line_of_sight is not None: self.line_of_sight.close(); self.line_of_sight = None
+        self.lod_tick += 1
+        self.think_scheduler.begin_tick()
+        active, reduced_due, reduced_count, dormant_count = self._lod_tiers(network_players_dict)
+        update_tier = self._update_arrays if self.enemy_store is not None else self._update_objects
+
+        start = time.perf_counter()
+        # Active enemies think in time-sliced round-robin buckets (movement and animation still every tick)
+        enemies_to_remove = update_tier(active, network_players_dict, dt, collision_quadtree, game_state, tile_grid, wall_segments, True)
+        mid = time.perf_counter()
+        # Reduced-tier enemies catch up on the ticks they skipped in one larger step: still swept and split at walls (kinematics.substeps),
+        # and never past the point they steer at. They are already sliced, so they always think
+        enemies_to_remove += update_tier(reduced_due, network_players_dict, dt * max(1, ENEMY_LOD_REDUCED_INTERVAL), collision_quadtree, game_state, tile_grid, wall_segments, False)
+        self.think_scheduler.end_tick()
+        self._record_lod(len(self.enemies) - reduced_count - dormant_count, reduced_count, dormant_count, mid - start, time.perf_counter() - mid, dt)
+        if self.collider_cache: self.broadphase_counters = self.collider_cache.take_counters()
+        if self.flow_field: self.flow_field_counters = self.flow_field.take_counters()
+        room_graph = self._room_graph(tile_grid)
+        if room_graph is not None: self.room_route_counters = room_graph.take_counters()
+        if self.line_of_sight is not None: self.los_counters = self.line_of_sight.take_counters()
+
+        # Remove dead enemies from the main list
+        if enemies_to_remove:
+             # print(f"[SERVER] Removing {len(enemies_to_remove)} defeated enemies.")
+             self.unregister_enemies(enemies_to_remove)
+             # Optional: Send message to clients about enemy removal? State update handles disappearance.
+        self._run_respawns(dt)
+
+    def _update_objects(self, enemies, network_players_dict, dt, collision_quadtree, game_state, tile_grid, wall_segments, sliced):
+        """
+        (Server Only) Objects backend tick for the given enemies: Enemy.update() per enemy. With sliced, only the enemies
+        the think scheduler picks run targeting / state decisions this tick. Returns the enemies to remove.
+        """
         enemies_to_remove = []
-        for enemy in self.enemies:
+        if sliced: enemies = self.think_scheduler.order(enemies) # Deferred thinkers first
+        # One broad-phase pass for the whole tier instead of a query per enemy
+        candidate_lists = self._collider_candidates(enemies, dt, collision_quadtree, tile_grid)
+        room_graph = self._room_graph(tile_grid)
+        pushes = self._crowd_push_objects(enemies) # One separation pass for the whole tier
+
+        for k, enemy in enumerate(enemies):
             # Get nearby colliders for this enemy
             potential_colliders = []
-            if collision_quadtree:
-                 query_range = enemy.rect.inflate(enemy.speed * 2 + 32, enemy.speed * 2 + 32)
-                 potential_colliders = collision_quadtree.query(query_range)
+            if candidate_lists is not None:
+                 potential_colliders = candidate_lists[k]
 
             # Enemy update logic (targeting, movement, animation)
-            # Pass the dictionary of players to the enemy's update method
-            reached_hit_frame = enemy.update(network_players_dict, dt, potential_colliders, game_state, collision_quadtree, self.is_point_in_polygon)
+            # Pass only the players inside this enemy's detection radius to its update method (only needed when it thinks)
+            think = self.think_scheduler.should_think(enemy) if sliced else True
+            nearby_players = {p.player_id: p for p in self.player_hash.query_radius(enemy.x, enemy.y, enemy.detection_radius)} if think else {}
+            reached_hit_frame = enemy.update(nearby_players, dt, potential_colliders, game_state, collision_quadtree, self.is_point_in_polygon, tile_grid, wall_segments, think, self.flow_field, room_graph, self.line_of_sight, pushes[k] if pushes else None)
+            self.enemy_hash.move(enemy, enemy.x, enemy.y)
 
             # If the update indicated the attack hit frame was reached, process the attack
             if reached_hit_frame and enemy.target_player:
@@ -250,13 +476,36 @@ class CombatManager:
             # Check if enemy is dead and animation finished
             if enemy.is_dead and enemy.animation_finished:
                 enemies_to_remove.append(enemy)
+        return enemies_to_remove
 
-        # Remove dead enemies from the main list
-        if enemies_to_remove:
-             # print(f"[SERVER] Removing {len(enemies_to_remove)} defeated enemies.")
-             for enemy in enemies_to_remove:
-                 self.enemies.remove(enemy)
-             # Optional: Send message to clients about enemy removal? State update handles disappearance.
+    def _update_arrays(self, slots, network_players_dict, dt, collision_quadtree, game_state, tile_grid, wall_segments, sliced):
+        """
+        (Server Only) Arrays backend tick for the given slots (None = all): EnemyArrays.step() decides for all of
+        them at once, then only the enemies that move this tick are collided, and attacks that reached their hit
+        frame are resolved. With sliced, the think scheduler's bucket runs targeting / state decisions in chunks
+        (one step() each, until the think budget runs out) and everyone else in one more step().
+        Hits are resolved after the whole tier has moved. Returns the enemies to remove.
+        """
+        store = self.enemy_store; views = store.views
+        if sliced and slots is None: slots = store.all_slots()
+        push = self._crowd_push_arrays(slots) # One separation pass for the whole tier, split across the parts
+        parts = self.think_scheduler.think_slices(store.id[slots]) if sliced else ((None, None),)
+        room_graph = self._room_graph(tile_grid)
+        hit_slots = []; movers = []; steps_x = []; steps_y = []; finished_dead = []
+        for part, think in parts: # The scheduler checks the budget between parts
+            part_push = push if push is None or part is None else (push[0][part], push[1][part])
+            part_hits, mover_slots, step_x, step_y, part_dead = store.step(network_players_dict, dt, slots if part is None else slots[part], think, self.flow_field, room_graph, self.line_of_sight, part_push)
+            hit_slots += part_hits.tolist(); finished_dead += part_dead.tolist()
+            movers += [views[slot] for slot in mover_slots]; steps_x += step_x.tolist(); steps_y += step_y.tolist()
+        world_bounds = collision_quadtree.boundary if collision_quadtree is not None else None
+        candidate_lists = self._collider_candidates(movers, dt, collision_quadtree, tile_grid) if movers else None
+        for k, (enemy, move_x, move_y) in enumerate(zip(movers, steps_x, steps_y)):
+            enemy.move_and_collide(move_x, move_y, candidate_lists[k] if candidate_lists is not None else [], tile_grid, wall_segments, world_bounds)
+            self.enemy_hash.move(enemy, enemy.x, enemy.y)
+        for slot in hit_slots:
+            enemy = views[slot]
+            if enemy.target_player: self.handle_enemy_attack(enemy, enemy.target_player)
+        return [views[slot] for slot in finished_dead]
 
 
     def draw(self, surface, camera_apply_point_func):
@@ -273,6 +522,7 @@ class CombatManager:
 
     # <<< NETWORK: Methods for state synchronization >>>
     def get_all_enemies_network_state(self):
+        if self.enemy_store is not None: return self.enemy_store.network_states() # Built column-wise, type is enemy_type
         states = {}
         for enemy in self.enemies:
             st = enemy.get_network_state()
@@ -281,43 +531,63 @@ class CombatManager:
             states[enemy.id] = st
         return states
 
-    def apply_enemy_network_state(self, enemy_states_dict):
-        """(Client Only) Updates the client's enemy list based on server data."""
-        if is_host: return # Server doesn't apply state to itself
+    def get_enemy_network_columns(self):
+        """Enemy network state as {field: column} for net_codec: the arrays backend hands over its columns as they are."""
+        if self.enemy_store is not None: return self.enemy_store.network_columns()
+        enemies = self.enemies # Read straight off the objects: no per-enemy dicts
+        return {
+            'id': [enemy.id for enemy in enemies], 'type': [enemy.__class__.__name__ for enemy in enemies],
+            'x': [enemy.x for enemy in enemies], 'y': [enemy.y for enemy in enemies],
+            'health': [enemy.health for enemy in enemies], 'max_health': [enemy.max_health for enemy in enemies],
+            'facing_right': [enemy.facing_right for enemy in enemies], 'anim': [ANIM_CODES[enemy.current_animation_type] for enemy in enemies],
+            'anim_frame': [enemy.current_frame_index for enemy in enemies], 'anim_finished': [enemy.animation_finished for enemy in enemies],
+            'is_dead': [enemy.is_dead for enemy in enemies], 'is_invulnerable': [enemy.is_invulnerable for enemy in enemies],
+            'is_attacking': [enemy.is_attacking for enemy in enemies],
+            'dialogue_text': [enemy.dialogue_text for enemy in enemies], 'dialogue_timer': [enemy.dialogue_timer for enemy in enemies]
+        }
 
-        server_ids = set(enemy_states_dict.keys())
-        client_ids = set(self.client_enemies.keys())
+    def apply_enemy_network_state(self, enemy_columns):
+        """
+        (Client Only) Updates or creates the client's enemies from server data (a full snapshot or a delta), given as
+        net_codec enemy columns ({key: list}, one entry per enemy): rows are applied straight from the columns, with
+        no state dict per enemy. Snapshots only carry the enemies near this client's player, so nothing is removed
+        here: the server announces enemies that leave the area (or die) with a despawn message, see despawn_enemies().
+        """
+        if is_host: return # Server doesn't apply state to itself
 
         # Add/Update enemies
-        for enemy_id, state_data in enemy_states_dict.items():
-            if enemy_id in self.client_enemies:
+        client_enemies = self.client_enemies
+        rows = zip(*(enemy_columns[key] for key in NETWORK_STATE_KEYS))
+        for enemy_id, enemy_type, values in zip(enemy_columns['id'], enemy_columns['type'], rows):
+            enemy = client_enemies.get(enemy_id)
+            if enemy is not None:
                 # Update existing enemy
-                self.client_enemies[enemy_id].apply_network_state(state_data)
+                enemy.apply_network_values(*values)
+                continue
+            # New enemy encountered, create it locally
+            EnemyClass = self.enemy_classes.get(enemy_type)
+            animations = self.enemy_animations.get(enemy_type)
+
+            if EnemyClass and animations:
+                try:
+                    new_enemy = EnemyClass(values[0], values[1],
+                                           animations['idle'], animations['walk'],
+                                           animations['attack'], animations['hurt'],
+                                           animations['death'], animations['dims'])
+                    # Override ID and apply full state
+                    new_enemy.id = enemy_id # Ensure correct ID
+                    new_enemy.apply_network_values(*values)
+                    client_enemies[enemy_id] = new_enemy
+                    # print(f"[CLIENT] Spawned enemy {enemy_id} ({enemy_type})") # Debug
+                except Exception as e:
+                    print(f"[CLIENT] Error creating new enemy {enemy_id} of type {enemy_type}: {e}")
             else:
-                # New enemy encountered, create it locally
-                enemy_type = state_data.get('type')
-                EnemyClass = self.enemy_classes.get(enemy_type)
-                animations = self.enemy_animations.get(enemy_type)
-
-                if EnemyClass and animations:
-                    try:
-                        new_enemy = EnemyClass(state_data['x'], state_data['y'],
-                                               animations['idle'], animations['walk'],
-                                               animations['attack'], animations['hurt'],
-                                               animations['death'], animations['dims'])
-                        # Override ID and apply full state
-                        new_enemy.id = enemy_id # Ensure correct ID
-                        new_enemy.apply_network_state(state_data)
-                        self.client_enemies[enemy_id] = new_enemy
-                        # print(f"[CLIENT] Spawned enemy {enemy_id} ({enemy_type})") # Debug
-                    except Exception as e:
-                        print(f"[CLIENT] Error creating new enemy {enemy_id} of type {enemy_type}: {e}")
-                else:
-                    print(f"[CLIENT] Warning: Cannot create enemy {enemy_id}, unknown type '{enemy_type}' or missing animations.")
-
-        # Remove enemies that are no longer in the server's state
-        removed_ids = client_ids - server_ids
-        for enemy_id in removed_ids:
+                print(f"[CLIENT] Warning: Cannot create enemy {enemy_id}, unknown type '{enemy_type}' or missing animations.")
+
+    def despawn_enemies(self, enemy_ids):
+        """(Client Only) Removes enemies the server despawned from this client's view."""
+        if is_host: return
+        for enemy_id in enemy_ids:
             if enemy_id in self.client_enemies:
                 # print(f"[CLIENT] Removing enemy {enemy_id}") # Debug
                 del self.client_enemies[enemy_id]
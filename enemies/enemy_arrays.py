@@ -0,0 +1,479 @@
+# --- START OF FILE enemy_arrays.py ---
+import math
+import pygame
+
+from .enemy_base import Enemy
+from .stat_constants import *
+
+# NumPy is optional: without it CombatManager keeps the per-object Enemy.update() backend
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- State / Animation Codes ---
+# Enemy.state and Enemy.current_animation_type strings, stored as small ints in the arrays
+STATE_NAMES = ('idle', 'wander', 'chasing', 'returning', 'attacking', 'hurt', 'dead')
+ST_IDLE, ST_WANDER, ST_CHASING, ST_RETURNING, ST_ATTACKING, ST_HURT, ST_DEAD = range(len(STATE_NAMES))
+STATE_CODES = {name: code for code, name in enumerate(STATE_NAMES)}
+ANIM_NAMES = ('idle', 'walk', 'attack', 'hurt', 'death')
+AN_IDLE, AN_WALK, AN_ATTACK, AN_HURT, AN_DEATH = range(len(ANIM_NAMES))
+ANIM_CODES = {name: code for code, name in enumerate(ANIM_NAMES)}
+
+# Per-enemy columns: name -> dtype. Mutable ones are exposed on EnemyView under the Enemy attribute name
+# (see _VIEW_FIELDS); the rest are copied from the Enemy when it is added and never change.
+_COLUMNS = {
+    'x': 'f8', 'y': 'f8', 'spawn_x': 'f8', 'spawn_y': 'f8', 'speed': 'f8', 'radius': 'f8',
+    'target_x': 'f8', 'target_y': 'f8', 'has_target_pos': '?', 'target': 'i4', # target: player handle, -1 = none
+    'state': 'i1', 'anim': 'i1', 'frame': 'i4', 'anim_finished': '?', 'anim_clock': 'f8',
+    'health': 'i4', 'is_dead': '?', 'is_attacking': '?', 'hit_triggered': '?', 'hit_frame': 'i4',
+    'cooldown': 'f8', 'cooldown_duration': 'f8', 'wander_timer': 'f8', 'chase_timer': 'f8',
+    'invulnerable': '?', 'invuln_timer': 'f8', 'dialogue_timer': 'f8', 'said_greeting': '?',
+    'facing_right': '?', 'dir_x': 'f8', 'dir_y': 'f8', 'think_elapsed': 'f8',
+    'detection_sq': 'f8', 'attack_sq': 'f8', 'stop_sq': 'f8', 'id': 'i8', # id: Enemy.id (stable while slots move)
+}
+
+# --- Enemy View ---
+def _column_property(column, cast):
+    def getter(self): return cast(getattr(self.store, column)[self.slot])
+    def setter(self, value): getattr(self.store, column)[self.slot] = value
+    return property(getter, setter)
+
+def _coded_property(column, names, codes):
+    def getter(self): return names[getattr(self.store, column)[self.slot]]
+    def setter(self, value): getattr(self.store, column)[self.slot] = codes[value]
+    return property(getter, setter)
+
+class EnemyView:
+    """
+    Thin stand-in for an Enemy whose simulation state lives in EnemyArrays.
+
+    Mutable state (position, timers, state, animation, health...) reads and writes the
+    arrays at self.slot under the usual Enemy attribute names; everything else (rect,
+    frames, name, id, defense...) is forwarded to the wrapped Enemy. Enemy's draw(),
+    take_damage(), get_network_state() and move_and_collide() run unchanged on a view.
+    """
+    __slots__ = ('store', 'slot', 'enemy')
+
+    def __init__(self, store, slot, enemy):
+        object.__setattr__(self, 'store', store); object.__setattr__(self, 'slot', slot); object.__setattr__(self, 'enemy', enemy)
+
+    def __getattr__(self, name): # Only reached for attributes the view does not define
+        return getattr(self.enemy, name)
+
+    def __setattr__(self, name, value):
+        if name in _VIEW_ATTRIBUTES: object.__setattr__(self, name, value)
+        else: setattr(self.enemy, name, value)
+
+    x = _column_property('x', float)
+    y = _column_property('y', float)
+    health = _column_property('health', int)
+    is_dead = _column_property('is_dead', bool)
+    is_attacking = _column_property('is_attacking', bool)
+    animation_finished = _column_property('anim_finished', bool)
+    current_frame_index = _column_property('frame', int)
+    attack_hit_triggered_this_cycle = _column_property('hit_triggered', bool)
+    attack_cooldown_timer = _column_property('cooldown', float)
+    wander_timer = _column_property('wander_timer', float)
+    chase_timer = _column_property('chase_timer', float)
+    is_invulnerable = _column_property('invulnerable', bool)
+    invulnerability_timer = _column_property('invuln_timer', float)
+    dialogue_timer = _column_property('dialogue_timer', float)
+    said_greeting = _column_property('said_greeting', bool)
+    facing_right = _column_property('facing_right', bool)
+    think_elapsed = _column_property('think_elapsed', float)
+    state = _coded_property('state', STATE_NAMES, STATE_CODES)
+    current_animation_type = _coded_property('anim', ANIM_NAMES, ANIM_CODES)
+
+    @property
+    def target_player(self):
+        handle = self.store.target[self.slot]
+        return self.store.players[handle] if handle >= 0 else None
+
+    @target_player.setter
+    def target_player(self, player):
+        self.store.target[self.slot] = self.store.player_handle(player) if player is not None else -1
+
+    @property
+    def target_position(self):
+        store = self.store; slot = self.slot
+        return pygame.math.Vector2(store.target_x[slot], store.target_y[slot]) if store.has_target_pos[slot] else None
+
+    @target_position.setter
+    def target_position(self, position):
+        store = self.store; slot = self.slot
+        store.has_target_pos[slot] = position is not None
+        if position is not None: store.target_x[slot], store.target_y[slot] = position
+
+    @property
+    def last_direction(self):
+        return pygame.math.Vector2(self.store.dir_x[self.slot], self.store.dir_y[self.slot])
+
+    @last_direction.setter
+    def last_direction(self, direction):
+        self.store.dir_x[self.slot], self.store.dir_y[self.slot] = direction
+
+    draw = Enemy.draw
+    take_damage = Enemy.take_damage
+    set_dialogue = Enemy.set_dialogue
+    get_network_state = Enemy.get_network_state
+    move_and_collide = Enemy.move_and_collide
+    _set_timer = Enemy._set_timer # timers is None on stored enemies, so this writes the column
+
+# Enemy attributes backed by the arrays (copied in on add, written back on remove)
+_VIEW_FIELDS = tuple(name for name, value in vars(EnemyView).items() if isinstance(value, property))
+_VIEW_ATTRIBUTES = frozenset(_VIEW_FIELDS) | frozenset(EnemyView.__slots__)
+
+# --- Structure-of-Arrays Enemy Store ---
+class EnemyArrays:
+    """
+    (Server Only) Structure-of-arrays simulation backend for CombatManager.
+
+    Every enemy's per-tick state is one slot in a set of NumPy columns, and step() advances
+    timers, targeting, wander / chase / return decisions, the animation state machine and
+    movement intent for the whole population with array operations, following the same
+    rules as Enemy.update(). Only the enemies that actually move come back out to Python,
+    for collision. Animation time is simulation time (dt), not pygame.time.get_ticks().
+    Slots are kept dense: removing an enemy moves the last one into its slot.
+    """
+    def __init__(self, capacity=64):
+        self.count = 0; self.capacity = 0
+        self.views = [] # Slot -> EnemyView
+        self.frame_counts = None # (capacity, len(ANIM_NAMES)) frames per animation
+        self.players = [] # Player handle -> player object (None for a free handle)
+        self.player_handles = {} # Player object -> handle
+        self.free_handles = [] # Handles of players that left, once no enemy targets them (reused before new ones)
+        self.rng = np.random.default_rng()
+        for name, dtype in _COLUMNS.items(): setattr(self, name, np.zeros(0, dtype=dtype))
+        self._grow(capacity)
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def __len__(self):
+        return self.count
+
+    def all_slots(self):
+        return np.arange(self.count)
+
+    def _grow(self, capacity):
+        for name, dtype in _COLUMNS.items():
+            column = np.zeros(capacity, dtype=dtype); column[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, column)
+        frame_counts = np.zeros((capacity, len(ANIM_NAMES)), dtype=np.int32)
+        if self.frame_counts is not None: frame_counts[:self.count] = self.frame_counts[:self.count]
+        self.frame_counts = frame_counts; self.capacity = capacity
+
+    def player_handle(self, player):
+        handle = self.player_handles.get(player)
+        if handle is None:
+            if self.free_handles: handle = self.free_handles.pop(); self.players[handle] = player
+            else: handle = len(self.players); self.players.append(player)
+            self.player_handles[player] = handle
+        return handle
+
+    def _release_players(self, live):
+        """Frees the handles of players not in live that no enemy targets any more (a targeted one stays until the enemy re-targets)."""
+        targeted = set(np.unique(self.target[:self.count]).tolist())
+        for player, handle in list(self.player_handles.items()):
+            if player not in live and handle not in targeted:
+                del self.player_handles[player]; self.players[handle] = None; self.free_handles.append(handle)
+
+    def add(self, enemy):
+        """Moves an Enemy's state into a new slot. Returns the EnemyView that replaces it."""
+        if self.count == self.capacity: self._grow(max(64, self.capacity * 2))
+        slot = self.count; self.count += 1
+        view = EnemyView(self, slot, enemy); self.views.append(view)
+        self.id[slot] = enemy.id; self.spawn_x[slot] = enemy.spawn_x; self.spawn_y[slot] = enemy.spawn_y
+        self.speed[slot] = enemy.speed; self.radius[slot] = enemy.radius
+        self.cooldown_duration[slot] = enemy.attack_cooldown_duration; self.hit_frame[slot] = enemy.attack_hit_frame_index
+        self.detection_sq[slot] = enemy.detection_radius_sq; self.attack_sq[slot] = enemy.attack_trigger_range_sq
+        self.stop_sq[slot] = enemy.stopping_range_sq; self.anim_clock[slot] = 0.0
+        for code, frames in enumerate((enemy.idle_animation_frames, enemy.walk_animation_frames, enemy.attack_animation_frames,
+                                       enemy.hurt_animation_frames, enemy.death_animation_frames)):
+            self.frame_counts[slot, code] = len(frames) if frames else 0
+        for name in _VIEW_FIELDS: setattr(view, name, getattr(enemy, name))
+        return view
+
+    def remove(self, view):
+        """Drops a view's slot (the last slot moves into it). Returns the wrapped Enemy with its state written back."""
+        return self.remove_many([view])[0]
+
+    def remove_many(self, views, write_back=True):
+        """
+        Drops several views at once: live slots from the tail fill the holes with one copy per column.
+        Returns the wrapped Enemies, with their state written back unless write_back is False (e.g. they are reset anyway).
+        """
+        enemies = [view.enemy for view in views]
+        if write_back:
+            for view, enemy in zip(views, enemies):
+                for name in _VIEW_FIELDS: setattr(enemy, name, getattr(view, name))
+        removed = {view.slot for view in views}
+        last = self.count; count = last - len(removed)
+        holes = sorted(slot for slot in removed if slot < count)
+        tail = [slot for slot in range(count, last) if slot not in removed] # Survivors that move down, one per hole
+        if holes:
+            hole_index = np.array(holes, dtype=np.intp); tail_index = np.array(tail, dtype=np.intp)
+            for name in _COLUMNS: column = getattr(self, name); column[hole_index] = column[tail_index]
+            self.frame_counts[hole_index] = self.frame_counts[tail_index]
+            for hole, slot in zip(holes, tail):
+                moved = self.views[slot]; self.views[hole] = moved; object.__setattr__(moved, 'slot', hole)
+        del self.views[count:]; self.count = count
+        for view in views: object.__setattr__(view, 'slot', -1)
+        return enemies
+
+    def _player_columns(self, network_players):
+        """Position / alive columns indexed by player handle, plus one trailing dummy so handle -1 reads a dead player."""
+        live = set()
+        for player in network_players.values():
+            if player: self.player_handle(player); live.add(player)
+        if len(self.player_handles) > len(live): self._release_players(live) # Someone left: recycle their handle
+        count = len(self.players)
+        px = np.zeros(count + 1); py = np.zeros(count + 1); alive = np.zeros(count + 1, dtype=bool)
+        for handle, player in enumerate(self.players):
+            if player is None: continue # Free handle: reads as a dead player
+            px[handle] = player.x; py[handle] = player.y; alive[handle] = player in live and not player.is_dead
+        return px, py, alive
+
+    def lod_tiers(self, network_players, active_radius, reduced_radius):
+        """Splits slots by distance to the nearest player. Returns (active_slots, reduced_slots); the rest are dormant."""
+        n = self.count; nearest_sq = np.full(n, np.inf)
+        for player in list(network_players.values()):
+            if player: np.minimum(nearest_sq, (self.x[:n] - player.x) ** 2 + (self.y[:n] - player.y) ** 2, out=nearest_sq)
+        active = nearest_sq <= active_radius * active_radius
+        return np.flatnonzero(active), np.flatnonzero(~active & (nearest_sq <= reduced_radius * reduced_radius))
+
+    def step(self, network_players, dt, slots=None, think=None, flow_field=None, room_graph=None, line_of_sight=None, separation=None):
+        """
+        Advances the enemies in slots (all of them if None) by dt. Returns (hit_slots, mover_slots, step_x, step_y,
+        finished_dead_slots): slots whose attack reached its hit frame this tick, slots that move this tick with
+        their step in pixels (apply with move_and_collide()), and dead enemies whose death animation has ended.
+        A subset is gathered into temporary columns, advanced, and scattered back. think is a boolean mask over
+        the stepped enemies (None = all); the rest skip targeting / state decisions, like Enemy.update(think=False).
+        flow_field (dungeon FlowFieldService) and room_graph (dungeon RoomGraph) route chasing / returning enemies
+        around walls, and line_of_sight (LineOfSightService) hides players behind walls, like the same Enemy.update() arguments.
+        separation is (push_x, push_y) over the stepped enemies, the crowd separation push in units of speed (also
+        applied to standing and attacking enemies).
+        """
+        if slots is None: n = self.count; c = {name: getattr(self, name)[:n] for name in _COLUMNS}; frame_counts = self.frame_counts[:n]
+        else: n = len(slots); c = {name: getattr(self, name)[slots] for name in _COLUMNS}; frame_counts = self.frame_counts[slots]
+        if n == 0: empty = np.zeros(0, dtype=np.intp); return empty, empty, np.zeros(0), np.zeros(0), empty
+        x = c['x']; y = c['y']; state = c['state']; anim = c['anim']; frame = c['frame']
+        finished = c['anim_finished']; attacking = c['is_attacking']; hit_triggered = c['hit_triggered']
+        target = c['target']; has_pos = c['has_target_pos']; tx = c['target_x']; ty = c['target_y']
+        cooldown = c['cooldown']; wander_timer = c['wander_timer']; chase_timer = c['chase_timer']
+        speed = c['speed']; attack_sq = c['attack_sq']; stop_sq = c['stop_sq']
+        dir_x = c['dir_x']; dir_y = c['dir_y']; facing = c['facing_right']
+        rng = self.rng
+
+        # --- Timers ---
+        np.maximum(cooldown - dt, 0.0, out=cooldown); np.maximum(wander_timer - dt, 0.0, out=wander_timer)
+        invulnerable = c['invulnerable']; invuln_timer = c['invuln_timer']
+        invuln_timer[invulnerable] -= dt; invulnerable &= invuln_timer > 0
+        dialogue_timer = c['dialogue_timer']; talking = dialogue_timer > 0
+        dialogue_timer[talking] -= dt
+        silenced = np.flatnonzero(talking & (dialogue_timer <= 0)) # Texts cleared after the scatter below
+
+        # --- State Logic ---
+        previous_state = state.copy()
+        state[c['is_dead']] = ST_DEAD
+        think_elapsed = c['think_elapsed']; think_elapsed += dt; think_dt = think_elapsed.copy()
+        if think is None: think_elapsed[:] = 0.0; thinking = (state != ST_DEAD) & ~((state == ST_HURT) & ~finished)
+        else: think_elapsed[think] = 0.0; thinking = think & (state != ST_DEAD) & ~((state == ST_HURT) & ~finished)
+
+        # Closest living player inside the detection radius (first one wins ties, like the dict scan)
+        px, py, alive = self._player_columns(network_players)
+        dist_sq = (px[:-1][None, :] - x[:, None]) ** 2 + (py[:-1][None, :] - y[:, None]) ** 2
+        dist_sq[:, ~alive[:-1]] = np.inf
+        if line_of_sight is not None: # Players behind walls are out of sight (only thinkers' pairs inside the detection radius are cast)
+            rows, cols = np.nonzero(thinking[:, None] & (dist_sq < c['detection_sq'][:, None]))
+            if len(rows):
+                blocked = ~np.array(line_of_sight.visible_many(x[rows].tolist(), y[rows].tolist(), px[cols].tolist(), py[cols].tolist()), dtype=bool)
+                dist_sq[rows[blocked], cols[blocked]] = np.inf
+        closest = dist_sq.argmin(axis=1) if dist_sq.shape[1] else np.full(n, -1)
+        min_dist_sq = dist_sq[np.arange(n), closest] if dist_sq.shape[1] else np.full(n, np.inf)
+        sees = min_dist_sq < c['detection_sq']
+        target[thinking] = np.where(sees, closest, -1)[thinking]
+
+        engaged = thinking & sees
+        chase_timer[engaged] = SWORD_ORC_CHASE_TIMEOUT
+        in_attack_range = engaged & (min_dist_sq < attack_sq) & (cooldown <= 0)
+        start_attack = in_attack_range & (state != ST_HURT)
+        state[start_attack] = ST_ATTACKING; has_pos[start_attack] = False
+        approach = engaged & ~in_attack_range & (state != ST_ATTACKING) & (state != ST_HURT)
+        state[approach] = ST_CHASING
+        far = approach & (min_dist_sq > stop_sq)
+        tx[far] = px[target[far]]; ty[far] = py[target[far]]; has_pos[far] = True
+        has_pos[approach & ~far] = False
+
+        lost = thinking & ~sees; lost_state = state.copy() # elif chain below branches on the state before it changes
+        near_sq = (speed * dt * 10) ** 2 # Jitter threshold for "arrived"
+        fighting = lost & ((lost_state == ST_CHASING) | (lost_state == ST_ATTACKING))
+        chase_timer[fighting] -= think_dt[fighting]
+        give_up = fighting & (chase_timer <= 0)
+        returning = lost & (lost_state == ST_RETURNING)
+        home = returning & ((x - c['spawn_x']) ** 2 + (y - c['spawn_y']) ** 2 < near_sq)
+        state[give_up] = ST_RETURNING; state[home] = ST_IDLE; has_pos[home] = False
+        heading_home = give_up | (returning & ~home)
+        tx[heading_home] = c['spawn_x'][heading_home]; ty[heading_home] = c['spawn_y'][heading_home]; has_pos[heading_home] = True
+        wandering = lost & (lost_state == ST_WANDER)
+        wander_done = wandering & (~has_pos | (wander_timer <= 0))
+        wander_arrived = wandering & ~wander_done & ((x - tx) ** 2 + (y - ty) ** 2 < near_sq)
+        settle = wander_done | wander_arrived
+        state[settle] = ST_IDLE; has_pos[wander_arrived] = False
+        wander_timer[settle] = rng.uniform(SWORD_ORC_WANDER_TIME_MIN, SWORD_ORC_WANDER_TIME_MAX, settle.sum())
+        start_wander = lost & (lost_state == ST_IDLE) & (wander_timer <= 0)
+        if start_wander.any():
+            count = int(start_wander.sum()); angle = rng.uniform(0, 2 * math.pi, count); dist = rng.uniform(0, SWORD_ORC_WANDER_RADIUS, count)
+            max_dist_from_spawn = SWORD_ORC_WANDER_RADIUS * 1.5
+            sx = c['spawn_x'][start_wander]; sy = c['spawn_y'][start_wander]
+            tx[start_wander] = np.clip(sx + dist * np.cos(angle), sx - max_dist_from_spawn, sx + max_dist_from_spawn)
+            ty[start_wander] = np.clip(sy + dist * np.sin(angle), sy - max_dist_from_spawn, sy + max_dist_from_spawn)
+            has_pos[start_wander] = True; state[start_wander] = ST_WANDER
+
+        # --- Movement Intent ---
+        tdx = px[target] - x; tdy = py[target] - y; target_dist_sq = tdx * tdx + tdy * tdy # Meaningless where target == -1
+        travelling = ((state == ST_WANDER) | (state == ST_RETURNING)) & has_pos
+        should_move = travelling & ((tx - x) ** 2 + (ty - y) ** 2 > near_sq)
+        chasing = (state == ST_CHASING) & (target >= 0)
+        closing_in = chasing & (target_dist_sq > stop_sq)
+        tx[closing_in] = px[target[closing_in]]; ty[closing_in] = py[target[closing_in]]; has_pos[closing_in] = True
+        should_move |= closing_in
+        holding = chasing & ~closing_in; has_pos[holding] = False
+        face = holding & (target_dist_sq > 1)
+        face_len = np.sqrt(target_dist_sq[face]); dir_x[face] = tdx[face] / face_len; dir_y[face] = tdy[face] / face_len
+        facing[face] = dir_x[face] >= 0
+        mdx = tx - x; mdy = ty - y
+        if flow_field is not None or room_graph is not None: # Head for the next tile on the route instead of straight at the target
+            routed = closing_in | (should_move & (state == ST_RETURNING)) if room_graph is not None else closing_in
+            for k in np.flatnonzero(routed).tolist():
+                waypoint = flow_field.next_waypoint(tx[k], ty[k], x[k], y[k]) if flow_field is not None and closing_in[k] else None
+                if waypoint is None and room_graph is not None: waypoint = room_graph.next_waypoint(tx[k], ty[k], x[k], y[k])
+                if waypoint is not None: mdx[k] = waypoint[0] - x[k]; mdy[k] = waypoint[1] - y[k]
+        move_len_sq = mdx * mdx + mdy * mdy
+        moving = should_move & has_pos & (move_len_sq > 1)
+        move_len = np.sqrt(move_len_sq[moving]); dir_x[moving] = mdx[moving] / move_len; dir_y[moving] = mdy[moving] / move_len
+        facing[moving] = dir_x[moving] >= 0
+        base_anim = np.where(moving, AN_WALK, AN_IDLE)
+
+        # --- Animation State Machine (branches on the state snapshot, like the if/elif chain) ---
+        sm_state = state.copy(); previous_anim = anim.copy(); new_anim = anim.copy()
+        has_target = target >= 0
+        in_attack_reach = has_target & (target_dist_sq < attack_sq)
+        rest_anim = np.where(target_dist_sq > stop_sq, AN_WALK, AN_IDLE)
+        dying = (sm_state == ST_DEAD) & (anim != AN_DEATH)
+        new_anim[dying] = AN_DEATH; finished[dying] = False; attacking[dying] = False
+        hurt = sm_state == ST_HURT
+        hurt_start = hurt & (anim != AN_HURT) & (anim != AN_DEATH)
+        new_anim[hurt_start] = AN_HURT; finished[hurt_start] = False; attacking[hurt_start] = False
+        recovered = hurt & (anim == AN_HURT) & finished
+        strike_back = recovered & in_attack_reach & (cooldown <= 0)
+        resume_chase = recovered & has_target & ~strike_back
+        recovered_idle = recovered & ~has_target
+        attack = sm_state == ST_ATTACKING
+        attack_start = attack & ((anim == AN_IDLE) | (anim == AN_WALK))
+        attack_end = attack & (anim == AN_ATTACK) & finished
+        attacking[attack_end] = False; cooldown[attack_end] = c['cooldown_duration'][attack_end]
+        attack_again = attack_end & in_attack_reach & (cooldown <= 0)
+        after_attack_chase = attack_end & has_target & ~attack_again
+        after_attack_idle = attack_end & ~has_target
+        begin_attack = strike_back | attack_start | attack_again
+        state[strike_back] = ST_ATTACKING
+        new_anim[begin_attack] = AN_ATTACK; finished[begin_attack] = False; attacking[begin_attack] = True; hit_triggered[begin_attack] = False
+        rechase = resume_chase | after_attack_chase
+        state[rechase] = ST_CHASING; new_anim[rechase] = rest_anim[rechase]
+        to_idle = recovered_idle | after_attack_idle
+        state[to_idle] = ST_IDLE; new_anim[to_idle] = AN_IDLE
+        base = ~((sm_state == ST_DEAD) | hurt | attack) & (finished | (anim == AN_IDLE) | (anim == AN_WALK)) & (anim != base_anim)
+        new_anim[base] = base_anim[base]
+
+        changed = new_anim != previous_anim
+        anim[changed] = new_anim[changed]; frame[changed] = 0
+        finished[changed] = (new_anim[changed] == AN_IDLE) | (new_anim[changed] == AN_WALK) # Looping anims don't 'finish' in one cycle
+        left_attack = changed & (previous_anim == AN_ATTACK) & (new_anim != AN_ATTACK)
+        attacking[left_attack] = False; hit_triggered[left_attack] = False
+        attacking &= anim == AN_ATTACK
+        attacking |= (anim == AN_ATTACK) & ~finished
+
+        # --- Animation Progression & Hit Frame Check ---
+        frame_count = frame_counts[np.arange(n), anim]
+        finished[frame_count <= 0] = True
+        anim_clock = c['anim_clock'] # Time since the last frame advance, as of the start of this tick
+        advance = (frame_count > 0) & (~finished | ((anim == AN_DEATH) & (frame < frame_count - 1))) & (anim_clock * 1000 > ANIMATION_SPEED_MS)
+        anim_clock[advance] = 0.0; anim_clock += dt
+        previous_frame = frame.copy()
+        ended = advance & (frame + 1 >= frame_count)
+        one_shot = (anim == AN_ATTACK) | (anim == AN_HURT) | (anim == AN_DEATH)
+        ended_once = ended & one_shot; ended_loop = ended & ~one_shot
+        finished[ended_once] = True; frame[ended_once] = np.where(anim[ended_once] == AN_DEATH, frame_count[ended_once] - 1, 0)
+        hit_triggered[ended_once & (anim == AN_ATTACK)] = False
+        frame[ended_loop] = 0; finished[ended_loop] = False
+        stepped = advance & ~ended; frame[stepped] += 1; finished[stepped] = False
+        hit_frame = c['hit_frame']
+        hits = advance & (anim == AN_ATTACK) & attacking & ~hit_triggered & (hit_frame >= 0) & (frame >= hit_frame) & (previous_frame < hit_frame)
+        hit_triggered[hits] = True
+
+        # --- Movement Steps (never past the steering point, like Enemy.update) ---
+        can_move = moving & ~c['is_dead'] & ((anim == AN_IDLE) | (anim == AN_WALK) | ((anim == AN_ATTACK) & finished))
+        if separation is None:
+            movers = np.flatnonzero(can_move)
+            step_length = np.minimum(speed[movers] * dt * 60, np.sqrt(move_len_sq[movers]))
+            step_x = dir_x[movers] * step_length; step_y = dir_y[movers] * step_length
+        else: # Crowd separation nudges standing and swinging enemies too
+            nudged = ~c['is_dead'] & (anim != AN_HURT) & (anim != AN_DEATH)
+            step_length = speed * dt * 60; steer_length = np.where(can_move, np.minimum(step_length, np.sqrt(move_len_sq)), 0.0)
+            step_x = dir_x * steer_length + np.where(nudged, separation[0], 0.0) * step_length
+            step_y = dir_y * steer_length + np.where(nudged, separation[1], 0.0) * step_length
+            movers = np.flatnonzero((step_x != 0) | (step_y != 0)); step_x = step_x[movers]; step_y = step_y[movers]
+
+        # --- Dialogue Trigger ---
+        in_fight = (state == ST_CHASING) | (state == ST_ATTACKING)
+        was_in_fight = (previous_state == ST_CHASING) | (previous_state == ST_ATTACKING)
+        said_greeting = c['said_greeting']
+        greeting = np.flatnonzero(has_target & in_fight & ~was_in_fight & ~said_greeting)
+        said_greeting |= has_target & in_fight & ~was_in_fight
+        said_greeting &= has_target | in_fight
+        finished_dead = np.flatnonzero(c['is_dead'] & finished)
+        hits = np.flatnonzero(hits)
+
+        if slots is not None: # Scatter back, then translate local indices to slots
+            for name in _COLUMNS: getattr(self, name)[slots] = c[name]
+            silenced = slots[silenced]; greeting = slots[greeting]; hits = slots[hits]; movers = slots[movers]; finished_dead = slots[finished_dead]
+        for slot in silenced: self.views[slot].enemy.dialogue_text = None
+        for slot in greeting: # set_dialogue() writes the dialogue timer through the view, so this runs after the scatter
+            view = self.views[slot]
+            if view.name == "Sword_Orc": view.set_dialogue("Meat?")
+        return hits, movers, step_x, step_y, finished_dead
+
+    def network_states(self):
+        """Same dicts as Enemy.get_network_state() for every slot, built from whole columns at once. Returns {id: state}."""
+        n = self.count
+        xs = self.x[:n].tolist(); ys = self.y[:n].tolist(); health = self.health[:n].tolist(); facing = self.facing_right[:n].tolist()
+        anim = self.anim[:n].tolist(); frame = self.frame[:n].tolist(); finished = self.anim_finished[:n].tolist()
+        dead = self.is_dead[:n].tolist(); invulnerable = self.invulnerable[:n].tolist(); attacking = self.is_attacking[:n].tolist()
+        dialogue_timer = self.dialogue_timer[:n].tolist()
+        states = {}
+        for slot, view in enumerate(self.views):
+            enemy = view.enemy
+            states[enemy.id] = {
+                'id': enemy.id, 'type': enemy.enemy_type, 'x': xs[slot], 'y': ys[slot],
+                'health': health[slot], 'max_health': enemy.max_health, 'facing_right': facing[slot],
+                'anim_type': ANIM_NAMES[anim[slot]], 'anim_frame': frame[slot], 'anim_finished': finished[slot],
+                'is_dead': dead[slot], 'is_invulnerable': invulnerable[slot], 'is_attacking': attacking[slot],
+                'dialogue_text': enemy.dialogue_text, 'dialogue_timer': dialogue_timer[slot]
+            }
+        return states
+
+    def network_columns(self):
+        """Every slot's network state as columns (anim as ANIM_NAMES codes), for net_codec to pack without per-enemy dicts. Returns {field: column}."""
+        n = self.count; enemies = [view.enemy for view in self.views]
+        return {
+            'id': [enemy.id for enemy in enemies], 'type': [enemy.enemy_type for enemy in enemies],
+            'x': self.x[:n], 'y': self.y[:n], 'health': self.health[:n], 'max_health': [enemy.max_health for enemy in enemies],
+            'facing_right': self.facing_right[:n], 'anim': self.anim[:n], 'anim_frame': self.frame[:n], 'anim_finished': self.anim_finished[:n],
+            'is_dead': self.is_dead[:n], 'is_invulnerable': self.invulnerable[:n], 'is_attacking': self.is_attacking[:n],
+            'dialogue_text': [enemy.dialogue_text for enemy in enemies], 'dialogue_timer': self.dialogue_timer[:n]
+        }
+
+# --- END OF FILE enemy_arrays.py ---
@@ -4,6 +4,11 @@ import random
 import math
 # Import constants using a clear alias or specific names
 from .stat_constants import *
+from world_structures import kinematics
+
+# State keys apply_network_values() takes, in its argument order
+NETWORK_STATE_KEYS = ('x', 'y', 'health', 'max_health', 'facing_right', 'is_dead', 'is_invulnerable', 'is_attacking',
+                      'dialogue_text', 'dialogue_timer', 'anim_type', 'anim_frame', 'anim_finished')
 
 class Enemy:
     # <<< NETWORK: Added unique ID >>>
@@ -12,47 +17,76 @@ class Enemy:
                  defense, agility, idle_frames, walk_frames, attack_frames, hurt_frames, death_frames,
                  frame_dims, name="Enemy", attack_hit_frame_index=None):
 
-        self.id = Enemy._enemy_id_counter
-        Enemy._enemy_id_counter += 1
         self.enemy_type = name # Store the type name (e.g., "Sword_Orc")
 
-        self.x = float(x); self.y = float(y); self.spawn_x = float(x); self.spawn_y = float(y)
-        self.health = health; self.max_health = health
+        self.max_health = health
         self.speed = speed; self.attack_power = attack_power; self.attack_range = attack_range
         # Use constants for range buffer
         self.stopping_range = max(5, attack_range - SWORD_ORC_ATTACK_RANGE_BUFFER) # Example: use SWORD_ORC buffer, or make generic ENEMY_ATTACK_RANGE_BUFFER
         self.stopping_range_sq = self.stopping_range * self.stopping_range
         self.attack_trigger_range_sq = attack_range * attack_range
-        self.attack_cooldown_timer = 0.0; self.attack_cooldown_duration = attack_cooldown
-        self.detection_radius_sq = detection_radius * detection_radius
+        self.attack_cooldown_duration = attack_cooldown
+        self.detection_radius = detection_radius; self.detection_radius_sq = detection_radius * detection_radius
 
         # Use generic enemy caps
         self.defense = max(0.0, min(defense, ENEMY_MAX_DEFENSE))
         self.agility = max(0.0, min(agility, ENEMY_MAX_AGILITY))
 
-        self.state = 'idle' # idle, walking, chasing, returning, attacking, hurt, dead
-        self.target_player = None # <<< NETWORK: Store the player object being targeted >>>
-        self.target_position = None
-        self.wander_timer = random.uniform(SWORD_ORC_WANDER_TIME_MIN, SWORD_ORC_WANDER_TIME_MAX)
-        self.chase_timer = 0.0
         self.wander_radius = SWORD_ORC_WANDER_RADIUS
         self.chase_timeout = SWORD_ORC_CHASE_TIMEOUT
 
-        # Rect and facing
+        # Size
         self.radius = frame_dims[0] / 4 if frame_dims else 10
-        self.rect = pygame.Rect(x - self.radius, y - self.radius, self.radius * 2, self.radius * 2)
-        self.last_direction = pygame.math.Vector2(1, 0)
-        self.facing_right = True
+        self.rect = pygame.Rect(0, 0, 0, 0); self.last_direction = pygame.math.Vector2(1, 0) # Set in place by reset()
+        self.timers = None # TimerWheel running this enemy's countdowns (server, objects backend); None = decremented in update()
         self.name = name
-        self.said_greeting = False # Specific dialogue trigger flag
 
-        # --- Animation State ---
+        # --- Animation Frames ---
         self.idle_animation_frames = idle_frames
         self.walk_animation_frames = walk_frames
         self.attack_animation_frames = attack_frames
         self.hurt_animation_frames = hurt_frames
         self.death_animation_frames = death_frames
         self.frame_width, self.frame_height = frame_dims if frame_dims else (self.radius*2, self.radius*2)
+        self.invulnerability_duration = ENEMY_INVULNERABILITY_DURATION
+
+        # --- Attack Timing Attributes ---
+        num_attack_frames = len(self.attack_animation_frames) if self.attack_animation_frames else 0
+        if attack_hit_frame_index is None and num_attack_frames > 1:
+            # Default hit frame (e.g., 60% through animation)
+            self.attack_hit_frame_index = max(0, min(int(num_attack_frames * 0.6), num_attack_frames - 1))
+        elif attack_hit_frame_index is not None:
+            # Use provided index, ensuring it's valid
+            self.attack_hit_frame_index = max(0, min(attack_hit_frame_index, num_attack_frames - 1)) if num_attack_frames > 0 else -1
+        else: # No frames or index provided
+            self.attack_hit_frame_index = -1
+
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        """ Puts the enemy back in its freshly spawned state at (x, y) under a new id. Stats, frames and
+            derived ranges set up by the constructor are kept, so pooled enemies are recycled through this. """
+        self.id = Enemy._enemy_id_counter
+        Enemy._enemy_id_counter += 1
+
+        self.x = float(x); self.y = float(y); self.spawn_x = float(x); self.spawn_y = float(y)
+        self.health = self.max_health
+        self.attack_cooldown_timer = 0.0
+
+        self.state = 'idle' # idle, walking, chasing, returning, attacking, hurt, dead
+        self.target_player = None # <<< NETWORK: Store the player object being targeted >>>
+        self.target_position = None
+        self.wander_timer = random.uniform(SWORD_ORC_WANDER_TIME_MIN, SWORD_ORC_WANDER_TIME_MAX)
+        self.chase_timer = 0.0
+        self.think_elapsed = 0.0 # Seconds since the last think step (targeting / state decisions)
+
+        # Rect and facing
+        self.rect.update(x - self.radius, y - self.radius, self.radius * 2, self.radius * 2)
+        self.last_direction.update(1, 0)
+        self.facing_right = True
+        self.said_greeting = False # Specific dialogue trigger flag
+
+        # --- Animation State ---
         self.current_frame_index = 0
         self.last_animation_update = pygame.time.get_ticks()
         self.current_animation_type = 'idle' # idle, walk, attack, hurt, death
@@ -61,57 +95,78 @@ class Enemy:
         self.is_attacking = False
         self.is_invulnerable = False
         self.invulnerability_timer = 0.0
-        self.invulnerability_duration = ENEMY_INVULNERABILITY_DURATION
 
         # --- Dialogue Attributes ---
         self.dialogue_text = None
         self.dialogue_timer = 0.0
 
-        # --- Attack Timing Attributes ---
-        num_attack_frames = len(self.attack_animation_frames) if self.attack_animation_frames else 0
-        if attack_hit_frame_index is None and num_attack_frames > 1:
-            # Default hit frame (e.g., 60% through animation)
-            self.attack_hit_frame_index = max(0, min(int(num_attack_frames * 0.6), num_attack_frames - 1))
-        elif attack_hit_frame_index is not None:
-            # Use provided index, ensuring it's valid
-            self.attack_hit_frame_index = max(0, min(attack_hit_frame_index, num_attack_frames - 1)) if num_attack_frames > 0 else -1
-        else: # No frames or index provided
-            self.attack_hit_frame_index = -1
         self.attack_hit_triggered_this_cycle = False
 
 
+    # --- Countdown Timers ---
+    TIMER_FIELDS = ('attack_cooldown_timer', 'wander_timer', 'invulnerability_timer', 'dialogue_timer')
+
+    def attach_timers(self, wheel):
+        """Hands the countdowns to a TimerWheel: update() stops decrementing them and the wheel zeroes each one when it runs out."""
+        self.timers = wheel
+        for name in Enemy.TIMER_FIELDS:
+            if getattr(self, name) > 0: wheel.arm(self, name, getattr(self, name), self._timer_expired)
+
+    def detach_timers(self):
+        if self.timers is not None: self.timers.disarm(self); self.timers = None
+
+    def _set_timer(self, name, seconds):
+        """Starts countdown attribute name (on the timer wheel if attached)."""
+        if self.timers is not None: self.timers.arm(self, name, seconds, self._timer_expired)
+        else: setattr(self, name, seconds)
+
+    def _timer_expired(self, name):
+        if name == 'invulnerability_timer': self.is_invulnerable = False
+        elif name == 'dialogue_timer': self.dialogue_text = None
+
     def set_dialogue(self, text, duration=DIALOGUE_DEFAULT_DURATION):
         """Sets the dialogue text and starts the timer."""
         if DIALOGUE_FONT: # Only set if font loaded
             self.dialogue_text = text
-            self.dialogue_timer = duration
+            self._set_timer('dialogue_timer', duration)
         else:
             # Fallback to print if font failed
             print(f"{self.name} ({self.id}) says: {text} (Dialogue font failed)")
 
     # <<< NETWORK: Update now takes dictionary of players >>>
-    def update(self, network_players, dt, colliders_nearby, game_state, quadtree, is_point_in_polygon):
-        """ Server-side authoritative update logic for the enemy. """
+    def update(self, network_players, dt, colliders_nearby, game_state, quadtree, is_point_in_polygon, tile_grid=None, wall_segments=None, think=True, flow_field=None, room_graph=None, line_of_sight=None, separation=None):
+        """ Server-side authoritative update logic for the enemy. tile_grid (dungeon) resolves walls without colliders_nearby;
+            wall_segments (kingdom wall capsules) is resolved after the AABB colliders. With think=False the
+            targeting / state decisions are skipped (the enemy keeps its current target and intent) while
+            timers, movement and animation still advance (timers only here if no TimerWheel is attached). flow_field (dungeon FlowFieldService) routes
+            chasing around walls instead of steering straight at the player; room_graph (dungeon RoomGraph)
+            routes longer trips (returning to spawn, chases past the flow field's reach) from room to room.
+            line_of_sight (LineOfSightService) hides players behind walls from targeting. separation is this tick's
+            crowd separation push (x, y), in units of speed, added to the step (also while standing or attacking). """
         current_time_ms = pygame.time.get_ticks()
         previous_state_for_dialogue = self.state
+        self.think_elapsed += dt
+        think_dt = self.think_elapsed # Time covered by this think step (several ticks when thinks are time-sliced)
+        if think: self.think_elapsed = 0.0
+
+        # --- Timers --- (with a TimerWheel attached they are zeroed when they run out instead)
+        if self.timers is None:
+            self.attack_cooldown_timer = max(0.0, self.attack_cooldown_timer - dt)
+            self.wander_timer = max(0.0, self.wander_timer - dt)
+            if self.is_invulnerable:
+                self.invulnerability_timer -= dt
+                if self.invulnerability_timer <= 0: self.is_invulnerable = False
 
-        # --- Timers ---
-        self.attack_cooldown_timer = max(0.0, self.attack_cooldown_timer - dt)
-        self.wander_timer = max(0.0, self.wander_timer - dt)
-        if self.is_invulnerable:
-            self.invulnerability_timer -= dt
-            if self.invulnerability_timer <= 0: self.is_invulnerable = False
-
-        if self.dialogue_timer > 0:
-            self.dialogue_timer -= dt
-            if self.dialogue_timer <= 0:
-                self.dialogue_text = None
+            if self.dialogue_timer > 0:
+                self.dialogue_timer -= dt
+                if self.dialogue_timer <= 0:
+                    self.dialogue_text = None
 
         # --- State Logic (Determine the INTENDED action/state) ---
         if self.is_dead:
             self.state = 'dead'
 
-        if self.state != 'dead' and not (self.state == 'hurt' and not self.animation_finished):
+        if think and self.state != 'dead' and not (self.state == 'hurt' and not self.animation_finished):
             # --- Find Closest Visible Player ---
             closest_player = None
             min_dist_sq = self.detection_radius_sq # Start with max detection range
@@ -120,10 +175,8 @@ class Enemy:
             for p_id, player in network_players.items():
                 if player and not player.is_dead: # Check if player object exists and is alive
                     dist_sq = (player.x - self.x)**2 + (player.y - self.y)**2
-                    if dist_sq < min_dist_sq:
-                        # Basic line of sight check (optional, can be complex)
-                        # For now, assume if within radius, can be seen
-                        # if is_visible(self.x, self.y, player.x, player.y, colliders_nearby):
+                    # Line of sight is only checked for players that would become the closest one
+                    if dist_sq < min_dist_sq and (line_of_sight is None or line_of_sight.visible(self.x, self.y, player.x, player.y)):
                         min_dist_sq = dist_sq
                         closest_player = player
 
@@ -156,7 +209,7 @@ class Enemy:
             else: # Player not visible or dead, or no players left
                 self.target_player = None # Clear target player
                 if self.state == 'chasing' or self.state == 'attacking': # Was chasing or attacking?
-                    self.chase_timer -= dt
+                    self.chase_timer -= think_dt
                     if self.chase_timer <= 0:
                          # Give up chase, return to spawn
                          self.state = 'returning'
@@ -175,14 +228,14 @@ class Enemy:
                     if self.target_position is None or self.wander_timer <= 0:
                         # Wander finished or timer expired, go idle
                         self.state = 'idle'
-                        self.wander_timer = random.uniform(SWORD_ORC_WANDER_TIME_MIN, SWORD_ORC_WANDER_TIME_MAX)
+                        self._set_timer('wander_timer', random.uniform(SWORD_ORC_WANDER_TIME_MIN, SWORD_ORC_WANDER_TIME_MAX))
                     else:
                         # Check if reached wander target
                         dist_to_target_sq = (self.x - self.target_position.x)**2 + (self.y - self.target_position.y)**2
                         if dist_to_target_sq < (self.speed * dt * 10)**2: # Close enough
                             self.state = 'idle'
                             self.target_position = None
-                            self.wander_timer = random.uniform(SWORD_ORC_WANDER_TIME_MIN, SWORD_ORC_WANDER_TIME_MAX)
+                            self._set_timer('wander_timer', random.uniform(SWORD_ORC_WANDER_TIME_MIN, SWORD_ORC_WANDER_TIME_MAX))
                 elif self.state == 'idle':
                     # If idle timer expired, start wandering
                     if self.wander_timer <= 0:
@@ -201,6 +254,7 @@ class Enemy:
 
         # --- Movement Calculation (Based on target_position) ---
         move_vector = pygame.math.Vector2(0, 0)
+        move_distance = 0.0 # Distance to the point steered at (waypoint or target); a step never goes past it
         should_move = False # Flag if movement should occur
 
         # Determine if movement is needed based on state and target
@@ -232,8 +286,15 @@ class Enemy:
         # Calculate move_vector if movement should occur
         if should_move and self.target_position:
             direction = self.target_position - pygame.math.Vector2(self.x, self.y)
+            waypoint = None
+            if flow_field is not None and self.state == 'chasing' and self.target_player: # Follow the route around corners
+                waypoint = flow_field.next_waypoint(self.target_position.x, self.target_position.y, self.x, self.y)
+            if waypoint is None and room_graph is not None and self.state in ('chasing', 'returning'): # Long trips: room to room
+                waypoint = room_graph.next_waypoint(self.target_position.x, self.target_position.y, self.x, self.y)
+            if waypoint is not None: direction = pygame.math.Vector2(waypoint[0] - self.x, waypoint[1] - self.y)
             if direction.length_squared() > 1: # Avoid normalizing zero vector
-                move_vector = direction.normalize()
+                move_distance = direction.length()
+                move_vector = direction / move_distance
                 self.last_direction = move_vector.copy()
                 self.facing_right = (move_vector.x >= 0)
             else:
@@ -296,7 +357,7 @@ class Enemy:
                 # Attack animation finished
                 self.is_attacking = False
                 # Reset attack cooldown timer
-                self.attack_cooldown_timer = self.attack_cooldown_duration
+                self._set_timer('attack_cooldown_timer', self.attack_cooldown_duration)
                 # Re-evaluate state after attack
                 if self.target_player: # Check if target still exists
                     dist_sq = (self.target_player.x - self.x)**2 + (self.target_player.y - self.y)**2
@@ -402,46 +463,13 @@ class Enemy:
                        move_vector.length_squared() > 0 # Check if move_vector is non-zero
 
         effective_speed = self.speed if can_move_now else 0
-        final_move_vector = move_vector * effective_speed * dt * 60 # Apply speed and scale by FPS
+        # Apply speed and scale by FPS, stopping at the steering point (reduced LOD ticks cover several ticks' worth of dt)
+        final_move_vector = move_vector * min(effective_speed * dt * 60, move_distance)
+        if separation is not None and not self.is_dead and self.current_animation_type not in ('hurt', 'death'):
+            final_move_vector += pygame.math.Vector2(separation) * (self.speed * dt * 60) # Crowd separation nudges standing and swinging enemies too
 
         if final_move_vector.length_squared() > 0: # Only apply movement if vector is non-zero
-            # Store position before moving
-            prev_x, prev_y = self.x, self.y
-
-            # Move X
-            self.x += final_move_vector.x
-            self.rect.centerx = int(self.x)
-            collided_x = False
-            for obstacle in colliders_nearby:
-                if self.rect.colliderect(obstacle):
-                    if final_move_vector.x > 0: self.rect.right = obstacle.left
-                    elif final_move_vector.x < 0: self.rect.left = obstacle.right
-                    self.x = self.rect.centerx
-                    collided_x = True
-                    break
-
-            # Move Y
-            self.y += final_move_vector.y
-            self.rect.centery = int(self.y)
-            collided_y = False
-            for obstacle in colliders_nearby:
-                if self.rect.colliderect(obstacle):
-                    if final_move_vector.y > 0: self.rect.bottom = obstacle.top
-                    elif final_move_vector.y < 0: self.rect.top = obstacle.bottom
-                    self.y = self.rect.centery
-                    collided_y = True
-                    break
-
-            # Update final position from potentially adjusted rect
-            self.x = self.rect.centerx
-            self.y = self.rect.centery
-
-            # World boundary clamp (Get bounds from world_struct or config)
-            world_w = 20000 # Placeholder - use actual effective world size
-            world_h = 20000
-            self.x = max(self.radius, min(self.x, world_w - self.radius))
-            self.y = max(self.radius, min(self.y, world_h - self.radius))
-            self.rect.center = (int(self.x), int(self.y))
+            self.move_and_collide(final_move_vector.x, final_move_vector.y, colliders_nearby, tile_grid, wall_segments, quadtree.boundary if quadtree is not None else None)
 
 
         # --- Dialogue Trigger ---
@@ -456,6 +484,36 @@ class Enemy:
         return triggered_hit_this_frame
 
 
+    def move_and_collide(self, move_x, move_y, colliders_nearby, tile_grid=None, wall_segments=None, world_bounds=None):
+        """ Applies one tick's movement step (pixels) with collision: swept AABB against colliders_nearby,
+            then tile_grid / wall_segments, then world_bounds (the collision index boundary, i.e. the
+            effective world; WORLD_WIDTH x WORLD_HEIGHT if None). Updates x, y and rect. """
+        # Long steps are split so the tile grid / wall capsules cannot be stepped through (see kinematics.substeps)
+        steps = kinematics.substeps(move_x, move_y, self.radius, tile_grid, wall_segments)
+        step_x = move_x / steps; step_y = move_y / steps
+        for _ in range(steps):
+            # Move X (swept against all nearby colliders, so a large step cannot skip over one)
+            self.x, _ = kinematics.move_x(self.rect, self.x, step_x, colliders_nearby)
+            if tile_grid is not None: tile_grid.resolve_x(self.rect, step_x)
+
+            # Move Y
+            self.y, _ = kinematics.move_y(self.rect, self.y, step_y, colliders_nearby)
+            if tile_grid is not None: tile_grid.resolve_y(self.rect, step_y)
+
+            # Update position from potentially adjusted rect
+            self.x = self.rect.centerx
+            self.y = self.rect.centery
+            if wall_segments is not None: # Kingdom wall: circle vs wall capsules
+                self.x, self.y, _ = wall_segments.resolve_circle(self.x, self.y, self.radius)
+                self.rect.center = (int(round(self.x)), int(round(self.y)))
+
+        # World boundary clamp (dungeon grid or overworld, whichever the collision index covers)
+        left, top, right, bottom = (world_bounds.left, world_bounds.top, world_bounds.right, world_bounds.bottom) if world_bounds is not None else (0, 0, WORLD_WIDTH, WORLD_HEIGHT)
+        self.x = max(left + self.radius, min(self.x, right - self.radius))
+        self.y = max(top + self.radius, min(self.y, bottom - self.radius))
+        self.rect.center = (int(round(self.x)), int(round(self.y))) # Round like kinematics does
+
+
     def draw(self, surface, camera_apply_point_func):
         """ Draws the enemy sprite based on current animation state. """
         enemy_screen_pos = camera_apply_point_func(self.x, self.y)
@@ -567,7 +625,7 @@ class Enemy:
                  self.animation_finished = False # Start the animation
             self.is_attacking = False # Hurt interrupts attack
             self.is_invulnerable = True
-            self.invulnerability_timer = self.invulnerability_duration
+            self._set_timer('invulnerability_timer', self.invulnerability_duration)
 
         return actual_damage # Return actual damage dealt
 
@@ -595,32 +653,31 @@ class Enemy:
     # <<< NETWORK: Method to update state from network data (CLIENT SIDE) >>>
     def apply_network_state(self, state_data):
         """Updates the enemy's attributes based on received network data."""
+        self.apply_network_values(
+            state_data.get('x', self.x), state_data.get('y', self.y),
+            state_data.get('health', self.health), state_data.get('max_health', self.max_health),
+            state_data.get('facing_right', self.facing_right), state_data.get('is_dead', self.is_dead),
+            state_data.get('is_invulnerable', self.is_invulnerable), state_data.get('is_attacking', self.is_attacking),
+            state_data.get('dialogue_text', self.dialogue_text), state_data.get('dialogue_timer', self.dialogue_timer),
+            state_data.get('anim_type', self.current_animation_type), state_data.get('anim_frame', self.current_frame_index),
+            state_data.get('anim_finished', self.animation_finished))
+
+    def apply_network_values(self, x, y, health, max_health, facing_right, is_dead, is_invulnerable, is_attacking,
+                             dialogue_text, dialogue_timer, anim_type, anim_frame, anim_finished):
+        """apply_network_state() for a complete state given as values (NETWORK_STATE_KEYS order), e.g. one row of snapshot columns."""
         # Directly update core attributes
-        self.x = state_data.get('x', self.x)
-        self.y = state_data.get('y', self.y)
-        self.health = state_data.get('health', self.health)
-        self.max_health = state_data.get('max_health', self.max_health)
-        self.facing_right = state_data.get('facing_right', self.facing_right)
-        self.is_dead = state_data.get('is_dead', self.is_dead)
-        self.is_invulnerable = state_data.get('is_invulnerable', self.is_invulnerable)
-        self.is_attacking = state_data.get('is_attacking', self.is_attacking)
-        self.dialogue_text = state_data.get('dialogue_text', self.dialogue_text)
-        self.dialogue_timer = state_data.get('dialogue_timer', self.dialogue_timer)
-
-        # Update animation state carefully
-        new_anim_type = state_data.get('anim_type', self.current_animation_type)
-        new_anim_frame = state_data.get('anim_frame', self.current_frame_index)
-        new_anim_finished = state_data.get('anim_finished', self.animation_finished)
-
-        if new_anim_type != self.current_animation_type:
-            self.current_animation_type = new_anim_type
-            self.current_frame_index = new_anim_frame # Use server's frame on change
-        elif self.current_animation_type == new_anim_type:
-             self.current_frame_index = new_anim_frame # Sync frame
-
-        self.animation_finished = new_anim_finished
+        self.x = x; self.y = y
+        self.health = health; self.max_health = max_health
+        self.facing_right = facing_right; self.is_dead = is_dead
+        self.is_invulnerable = is_invulnerable; self.is_attacking = is_attacking
+        self.dialogue_text = dialogue_text; self.dialogue_timer = dialogue_timer
+
+        # Animation: the server's type and frame (a new type starts from the server's frame too)
+        self.current_animation_type = anim_type
+        self.current_frame_index = anim_frame
+        self.animation_finished = anim_finished
 
         # Update rect based on new position
-        self.rect.center = (int(self.x), int(self.y))
+        self.rect.center = (int(x), int(y))
 
 # --- END OF FILE enemy_base.py ---
\ No newline at end of file
@@ -0,0 +1,72 @@
+# --- START OF FILE enemy_pool.py ---
+from .stat_constants import ENEMY_POOL_MAX_FREE
+
+# --- Enemy Pool ---
+class EnemyPool:
+    """
+    (Server Only) Dense storage for live enemies plus free lists of retired ones.
+
+    active is a plain list (CombatManager.enemies is this list) and slot_of maps enemy id to its
+    index, so removal swaps the last enemy into the hole instead of shifting the list: O(1) per
+    death however large the population. Retired enemies go on a per-type free list (up to
+    max_free each) and acquire() hands them back out after Enemy.reset(), so spawning does not
+    rebuild derived stats or allocate a new object. Iteration order is not stable across removals.
+    """
+    def __init__(self, max_free=ENEMY_POOL_MAX_FREE):
+        self.active = [] # Live enemies (EnemyViews with the arrays backend)
+        self.slot_of = {} # enemy id -> index in active
+        self.free = {} # enemy type name -> [retired Enemy]
+        self.max_free = max(0, int(max_free))
+        self.created = 0; self.reused = 0 # Spawn counters
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def __contains__(self, enemy):
+        slot = self.slot_of.get(enemy.id)
+        return slot is not None and self.active[slot] is enemy
+
+    def get(self, enemy_id):
+        """Live enemy with enemy_id, or None."""
+        slot = self.slot_of.get(enemy_id)
+        return self.active[slot] if slot is not None else None
+
+    def add(self, enemy):
+        self.slot_of[enemy.id] = len(self.active); self.active.append(enemy)
+
+    def remove(self, enemy):
+        """Swap-removes a live enemy. Returns False if it was not in the pool."""
+        slot = self.slot_of.pop(enemy.id, None)
+        if slot is None: return False
+        last = self.active.pop()
+        if last is not enemy: self.active[slot] = last; self.slot_of[last.id] = slot
+        return True
+
+    def acquire(self, enemy_class, x, y, *args):
+        """An enemy_class instance spawned at (x, y): a retired one reset in place if available, else enemy_class(x, y, *args)."""
+        free = self.free.get(enemy_class.__name__)
+        while free:
+            enemy = free.pop()
+            if type(enemy) is enemy_class:
+                enemy.reset(x, y); self.reused += 1
+                return enemy
+        self.created += 1
+        return enemy_class(x, y, *args)
+
+    def release(self, enemy):
+        """Keeps a removed (plain Enemy, not a view) enemy for reuse by acquire()."""
+        free = self.free.setdefault(type(enemy).__name__, [])
+        if len(free) < self.max_free:
+            enemy.target_player = None; enemy.target_position = None # Don't keep players alive through the pool
+            free.append(enemy)
+
+    def take_counters(self):
+        """Returns (created, reused) since the last call and resets them."""
+        counters = (self.created, self.reused)
+        self.created = self.reused = 0
+        return counters
+
+# --- END OF FILE enemy_pool.py ---
@@ -3,6 +3,7 @@ import pygame
 from open_world_dir.ui import ui_font
 import combat_mech as combat_mech_stable
 import world_struct as world_struct_stable
+from world_structures import kinematics
 import asset.assets as assets
 
 # --- Player Class ---
@@ -81,10 +82,12 @@ class Player:
         # Note: attack_requested and interact_requested are set by KEYDOWN events in main loop now
         return move_vector
 
-    def update(self, move_vector, potential_colliders, dt, world_width, world_height):
+    def update(self, move_vector, potential_colliders, dt, world_width, world_height, tile_grid=None, wall_segments=None):
         """Updates player state based on movement, animation, and game rules.
            On the server, this is the authoritative update.
-           On the client, this is less critical as state is overwritten by server."""
+           On the client, this is less critical as state is overwritten by server.
+           tile_grid: optional TileCollisionGrid (dungeon); walls are then resolved from the grid directly.
+           wall_segments: optional SegmentColliderSet (kingdom wall capsules), resolved after the AABB colliders."""
         current_time_ms = pygame.time.get_ticks()
 
         # --- Invulnerability Timer ---
@@ -163,33 +166,28 @@ class Player:
             move_delta_x = final_move_vector.x * dt * 60
             move_delta_y = final_move_vector.y * dt * 60
 
-            # Move X
-            self.x += move_delta_x
-            self.rect.centerx = int(round(self.x)) # Use round for better centering
-            for obstacle in potential_colliders:
-                if self.rect.colliderect(obstacle):
-                    if move_delta_x > 0: # Moving right
-                        self.rect.right = obstacle.left
-                    elif move_delta_x < 0: # Moving left
-                        self.rect.left = obstacle.right
-                    self.x = float(self.rect.centerx) # Update float pos from collision corrected rect
-                    break # Stop checking collisions for this axis
-
-            # Move Y
-            self.y += move_delta_y
-            self.rect.centery = int(round(self.y))
-            for obstacle in potential_colliders:
-                if self.rect.colliderect(obstacle):
-                    if move_delta_y > 0: # Moving down
-                        self.rect.bottom = obstacle.top
-                    elif move_delta_y < 0: # Moving up
-                        self.rect.top = obstacle.bottom
-                    self.y = float(self.rect.centery) # Update float pos from collision corrected rect
-                    break # Stop checking collisions for this axis
-
-            # Final position update from rect (redundant if updated above, but safe)
-            self.x = float(self.rect.centerx)
-            self.y = float(self.rect.centery)
+            # Long steps (dt clamp) are split so the tile grid / wall capsules cannot be stepped through
+            steps = kinematics.substeps(move_delta_x, move_delta_y, self.radius, tile_grid, wall_segments)
+            step_x = move_delta_x / steps; step_y = move_delta_y / steps
+            for _ in range(steps):
+                # Move X (swept against all nearby colliders, so a large step cannot skip over one)
+                self.x, _ = kinematics.move_x(self.rect, self.x, step_x, potential_colliders)
+                if tile_grid is not None and tile_grid.resolve_x(self.rect, step_x):
+                    self.x = float(self.rect.centerx) # Snapped against a wall tile
+
+                # Move Y
+                self.y, _ = kinematics.move_y(self.rect, self.y, step_y, potential_colliders)
+                if tile_grid is not None and tile_grid.resolve_y(self.rect, step_y):
+                    self.y = float(self.rect.centery)
+
+                # Position update from rect (redundant if updated above, but safe)
+                self.x = float(self.rect.centerx)
+                self.y = float(self.rect.centery)
+
+                # Kingdom wall: circle vs wall capsules
+                if wall_segments is not None:
+                    self.x, self.y, _ = wall_segments.resolve_circle(self.x, self.y, self.radius)
+                    self.rect.center = (int(round(self.x)), int(round(self.y)))
 
         # --- World Boundary Check ---
         self.x = max(self.radius, min(self.x, world_width - self.radius))
@@ -0,0 +1,74 @@
+# --- START OF FILE respawn_scheduler.py ---
+import heapq
+import random
+
+from .stat_constants import ENEMY_RESPAWN_DELAY, ENEMY_RESPAWN_JITTER, ENEMY_RESPAWN_MAX_PER_TICK, ENEMY_RESPAWN_RETRY
+
+# --- Enemy Respawn Scheduler ---
+class RespawnScheduler:
+    """
+    (Server Only) Keeps each spawn region at its population target by replacing removed enemies later.
+
+    Every tracked enemy belongs to a region (an overworld area or a dungeon room); the initial
+    spawn sets each region's target. When a tracked enemy is removed, a replacement for its region
+    is pushed onto a min-heap keyed by due time (delay plus random jitter, so a burst of kills turns
+    into a trickle of respawns). Each tick, due() pops at most max_per_tick replacements, skipping
+    regions that are already back at target; anything left over stays due for the next tick, so a
+    respawn wave never lands in one frame. Time is the simulation time passed to advance().
+    """
+    def __init__(self, delay=ENEMY_RESPAWN_DELAY, jitter=ENEMY_RESPAWN_JITTER, max_per_tick=ENEMY_RESPAWN_MAX_PER_TICK):
+        self.delay = delay; self.jitter = jitter
+        self.max_per_tick = max(1, int(max_per_tick))
+        self.now = 0.0
+        self.heap = [] # (due time, order, region)
+        self.order = 0 # Tie-breaker: equal due times come out in scheduling order
+        self.targets = {} # region -> population target
+        self.alive = {} # region -> tracked enemies alive
+        self.region_of = {} # enemy id -> region
+        self.spawned = 0; self.waiting = 0 # This tick's counters: replacements handed out / due ones left for later ticks
+
+    def __len__(self):
+        return len(self.heap)
+
+    def track(self, enemy, region, initial=False):
+        """Starts counting enemy toward region. initial=True (the first spawn) also raises the region's target by one."""
+        self.region_of[enemy.id] = region
+        self.alive[region] = self.alive.get(region, 0) + 1
+        if initial: self.targets[region] = self.targets.get(region, 0) + 1
+
+    def forget(self, enemy):
+        """Call when an enemy is removed: if it was tracked, its region's replacement is scheduled."""
+        region = self.region_of.pop(enemy.id, None)
+        if region is None: return
+        self.alive[region] -= 1
+        self._push(self.now + self.delay + random.uniform(0, self.jitter), region)
+
+    def retry(self, region):
+        """Puts back a replacement that could not be placed this tick."""
+        self._push(self.now + ENEMY_RESPAWN_RETRY, region)
+
+    def _push(self, due, region):
+        heapq.heappush(self.heap, (due, self.order, region)); self.order += 1
+
+    def advance(self, dt):
+        self.now += dt
+
+    def due(self):
+        """Pops this tick's replacements (at most max_per_tick). Returns their regions; the caller spawns and track()s them."""
+        heap = self.heap; regions = []; handed = {}
+        while heap and heap[0][0] <= self.now and len(regions) < self.max_per_tick:
+            region = heapq.heappop(heap)[2]
+            if self.alive.get(region, 0) + handed.get(region, 0) >= self.targets.get(region, 0): continue # Already refilled
+            regions.append(region); handed[region] = handed.get(region, 0) + 1
+        self.spawned = len(regions)
+        self.waiting = 0
+        if heap and heap[0][0] <= self.now: self.waiting = sum(1 for entry in heap if entry[0] <= self.now)
+        return regions
+
+    def take_counters(self):
+        """Returns (replacements handed out, due replacements left waiting) from the last due() call and resets them."""
+        counters = (self.spawned, self.waiting)
+        self.spawned = self.waiting = 0
+        return counters
+
+# --- END OF FILE respawn_scheduler.py ---
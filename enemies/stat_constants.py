@@ -61,9 +61,41 @@ SWORD_ORC_BASE_AGILITY = 0.05     # 5% dodge chance
 ENEMY_MAX_DEFENSE = 0.90 # Cap
 ENEMY_MAX_AGILITY = 0.90 # Cap # Adjusted to match the later definition in original
 ENEMY_INVULNERABILITY_DURATION = 0.3 # Seconds of invulnerability after getting hit
+ENEMY_SIM_BACKEND = "arrays" # Server enemy simulation: "arrays" (NumPy structure-of-arrays, falls back if NumPy is missing) or "objects" (Enemy.update() per enemy)
+
+# --- Enemy Simulation Level-of-Detail (Server) ---
+# Tiers by distance to the nearest player: active enemies update every tick, reduced ones every
+# ENEMY_LOD_REDUCED_INTERVAL ticks (with the skipped time), dormant ones not at all until a player comes close.
+ENEMY_LOD_ENABLED = True
+ENEMY_LOD_ACTIVE_RADIUS = 1200   # Keep above detection radius + half the screen so nobody sees a sleeping enemy
+ENEMY_LOD_REDUCED_RADIUS = 2400  # Beyond this enemies are dormant
+ENEMY_LOD_REDUCED_INTERVAL = 4   # Ticks between updates of a reduced-tier enemy (staggered across the tier)
+ENEMY_LOD_REPORT_INTERVAL = 10.0 # Seconds between [SERVER] tier reports (0 = no reports)
+
+# --- Enemy Think Scheduling (Server) ---
+ENEMY_THINK_BUCKETS = 4      # Active enemies re-target / re-decide every this many ticks (round-robin buckets), movement runs every tick
+ENEMY_THINK_BUDGET_MS = 4.0  # No new think steps start once a tick's enemy update has used this much time (0 = unlimited)
+ENEMY_THINK_CHUNK = 512      # Enemies per vectorized think step (arrays backend); this many thinks always run per tick, budget or not
+
+# --- Enemy Pooling (Server) ---
+ENEMY_POOL_MAX_FREE = 256 # Retired enemies kept per type for reuse by later spawns (beyond this they are dropped)
+
+# --- Enemy Crowd Separation (Server) ---
+ENEMY_SEPARATION_RADIUS = 32   # Enemies closer than this steer apart (about one and a half bodies)
+ENEMY_SEPARATION_WEIGHT = 1.0  # Strongest separation push, as a fraction of the enemy's speed (0 = off); 1 lets a crowd hold off walkers pressing in
+ENEMY_SEPARATION_CELL_CAP = 12 # Neighbours looked at per grid cell, so a pile-up stays cheap to pull apart
+ENEMY_SEPARATION_DEAD_ZONE = 0.1 # Weaker pushes (fraction of full strength) are ignored: barely touching enemies stay put
+
+# --- Enemy Respawning (Server) ---
+# Every region (overworld area / dungeon room) keeps the population its initial spawn gave it: removed enemies are replaced later.
+ENEMY_RESPAWN_DELAY = 45.0       # Seconds before a removed enemy's replacement is due
+ENEMY_RESPAWN_JITTER = 15.0      # Up to this many extra seconds, so a burst of kills respawns as a trickle
+ENEMY_RESPAWN_MAX_PER_TICK = 4   # Replacements spawned per tick at most (the rest wait for later ticks)
+ENEMY_RESPAWN_RETRY = 5.0        # Seconds before a replacement that found no valid spot tries again
+ENEMY_RESPAWN_ATTEMPTS = 8       # Spawn point samples inside the region per replacement
+ENEMY_RESPAWN_REGION_SIZE = 2000 # Side of an overworld spawn region in pixels
+ENEMY_RESPAWN_MIN_PLAYER_DISTANCE = 900 # Replacements never appear closer than this to a player (off screen)
 
-# Placeholder Dungeon Tile Constants (used in CombatManager spawn) - Should come from dungeon/world module
-TILE_FLOOR = 1
 # --- Add constants for other enemy types below as needed ---
 # Example:
 # GOBLIN_BASE_HEALTH = 30
@@ -0,0 +1,95 @@
+# --- START OF FILE think_scheduler.py ---
+import time
+
+from .stat_constants import ENEMY_THINK_BUCKETS, ENEMY_THINK_BUDGET_MS, ENEMY_THINK_CHUNK
+
+# NumPy is optional: only the arrays backend (which needs it anyway) calls think_slices()
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- Enemy Think Scheduler ---
+class ThinkScheduler:
+    """
+    (Server Only) Time-slices enemy "think" steps (targeting and state decisions).
+
+    Enemies are split into round-robin buckets (enemy id modulo the bucket count) and one
+    bucket thinks per tick, so each enemy re-evaluates every `buckets` ticks while timers, movement
+    and animation still run every tick. Thinking starts one enemy at a time (objects backend) or
+    one vectorized chunk of chunk_size enemies at a time (arrays backend), and once the tick has
+    used budget_ms no more starts: enemies cut off that way are deferred and think first next tick.
+    The first chunk_size thinks of a tick always run, so deferred enemies keep making progress even
+    when the rest of the tick already spent the budget. Frame time therefore stays flat as the
+    population grows; think latency grows instead.
+    """
+    def __init__(self, buckets=ENEMY_THINK_BUCKETS, budget_ms=ENEMY_THINK_BUDGET_MS, chunk_size=ENEMY_THINK_CHUNK):
+        self.buckets = max(1, int(buckets))
+        self.budget = budget_ms / 1000.0 if budget_ms else 0.0 # 0 = no budget
+        self.chunk_size = max(1, int(chunk_size))
+        self.bucket = 0 # Bucket that thinks this tick
+        self.deferred = {} # Ids of enemies whose think was cut by the budget, in the order they were cut
+        self.tick_start = 0.0
+        self.thought = 0; self.deferred_count = 0 # This tick's counters
+
+    def begin_tick(self):
+        self.tick_start = time.perf_counter(); self.thought = 0; self.deferred_count = 0
+
+    def end_tick(self):
+        """Moves on to the next bucket (anyone the budget cut off this tick is in deferred)."""
+        self.bucket = (self.bucket + 1) % self.buckets
+
+    def over_budget(self):
+        return self.budget > 0 and time.perf_counter() - self.tick_start > self.budget
+
+    def _cut_off(self):
+        """True once the tick is over budget and its guaranteed first chunk_size thinks have run."""
+        return self.thought >= self.chunk_size and self.over_budget()
+
+    def forget(self, enemy):
+        self.deferred.pop(enemy.id, None)
+
+    def order(self, enemies):
+        """Puts deferred enemies first (longest waiting first) so they get this tick's budget before anyone else."""
+        if not self.deferred: return enemies
+        late = {enemy.id: enemy for enemy in enemies if enemy.id in self.deferred}
+        return [late[enemy_id] for enemy_id in self.deferred if enemy_id in late] + [enemy for enemy in enemies if enemy.id not in late]
+
+    def should_think(self, enemy):
+        """(Objects backend) True if enemy thinks this tick; records it as deferred if the budget cuts it off."""
+        if enemy.id not in self.deferred and enemy.id % self.buckets != self.bucket: return False
+        if self._cut_off():
+            self.deferred[enemy.id] = None; self.deferred_count += 1
+            return False
+        self.deferred.pop(enemy.id, None); self.thought += 1
+        return True
+
+    def think_slices(self, ids):
+        """
+        (Arrays backend) Splits ids (the stepped enemies' EnemyArrays id column) into parts for EnemyArrays.step(),
+        as (indices into ids, think mask) pairs: chunks of up to chunk_size enemies that think (think mask None),
+        deferred ones first (longest waiting first), for as long as the budget lasts, then one last part with
+        everyone else (all-False mask), who only count down, animate and move. The budget is checked before each
+        chunk, so step each part before asking for the next; cut-off thinkers are deferred to the next tick.
+        """
+        due = ids % self.buckets == self.bucket
+        if self.deferred: # Deferred ones present in ids, longest waiting first, then the rest of the bucket
+            waiting = np.fromiter(self.deferred, dtype=ids.dtype, count=len(self.deferred))
+            by_id = np.argsort(ids); found = np.searchsorted(ids, waiting, sorter=by_id).clip(0, max(len(ids) - 1, 0))
+            late = by_id[found[ids[by_id[found]] == waiting]] if len(ids) else found[:0]
+            due[late] = False; order = np.concatenate((late, np.flatnonzero(due)))
+        else:
+            order = np.flatnonzero(due)
+        start = 0
+        while start < len(order) and not self._cut_off():
+            chunk = order[start:start + self.chunk_size]; start += len(chunk)
+            if self.deferred:
+                for enemy_id in ids[chunk].tolist(): self.deferred.pop(enemy_id, None)
+            self.thought += len(chunk)
+            yield chunk, None
+        for enemy_id in ids[order[start:]].tolist(): self.deferred[enemy_id] = None
+        self.deferred_count += len(order) - start
+        rest = np.ones(len(ids), dtype=bool); rest[order[:start]] = False; rest = np.flatnonzero(rest)
+        yield rest, np.zeros(len(rest), dtype=bool)
+
+# --- END OF FILE think_scheduler.py ---
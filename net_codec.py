@@ -0,0 +1,530 @@
+# --- START OF FILE net_codec.py ---
+import struct
+
+from enemies.enemy_arrays import ANIM_NAMES, ANIM_CODES
+from NETconfig import SNAPSHOT_HISTORY
+
+# NumPy is optional: without it records are packed / unpacked with struct, and snapshots are always sent in full
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- Message Types ---
+# First byte of every payload. Only these messages exist on the wire; anything else is rejected.
+MSG_INITIAL_STATE, MSG_GAME_STATE, MSG_PLAYER_INPUT, MSG_PLAYER_DISCONNECT, MSG_ERROR, MSG_GAME_DELTA, MSG_DESPAWN = range(1, 8)
+MESSAGE_CODES = {'initial_state': MSG_INITIAL_STATE, 'game_state_update': MSG_GAME_STATE, 'player_input': MSG_PLAYER_INPUT,
+                 'player_disconnect': MSG_PLAYER_DISCONNECT, 'error': MSG_ERROR, 'game_state_delta': MSG_GAME_DELTA,
+                 'despawn': MSG_DESPAWN}
+MESSAGE_NAMES = {code: name for name, code in MESSAGE_CODES.items()}
+SNAPSHOT_MESSAGES = frozenset((MSG_GAME_STATE, MSG_GAME_DELTA)) # Carry only the latest state: a newer one makes an unsent older one worthless
+
+# --- Record Schemas ---
+# Fixed-width little-endian records, one per entity. Booleans share one flags byte, the animation
+# type is its ANIM_NAMES code, and strings (enemy type, dialogue) are indices into the message's
+# string table. Record fields read the column of the same name, except the ones mapped below.
+FLAG_FACING_RIGHT, FLAG_ANIM_FINISHED, FLAG_DEAD, FLAG_INVULNERABLE, FLAG_ATTACKING = 1, 2, 4, 8, 16
+_FLAG_KEYS = (('facing_right', FLAG_FACING_RIGHT), ('anim_finished', FLAG_ANIM_FINISHED), ('is_dead', FLAG_DEAD),
+              ('is_invulnerable', FLAG_INVULNERABLE), ('is_attacking', FLAG_ATTACKING))
+_STRING_FIELDS = {'kind': 'type', 'dialogue': 'dialogue_text'} # Record field -> string column
+NO_STRING = 0xFFFF # String index meaning None
+NO_SEQUENCE = 0xFFFFFFFF # Snapshot sequence meaning none (an ack before any snapshot was applied)
+
+PLAYER_FIELDS = (('id', '<i4'), ('x', '<f4'), ('y', '<f4'), ('health', '<f4'), ('max_health', '<i4'),
+                 ('defense', '<f4'), ('agility', '<f4'), ('anim', 'u1'), ('flags', 'u1'), ('anim_frame', '<u2'))
+ENEMY_FIELDS = (('id', '<i4'), ('x', '<f4'), ('y', '<f4'), ('health', '<f4'), ('max_health', '<i4'),
+                ('dialogue_timer', '<f4'), ('kind', '<u2'), ('dialogue', '<u2'), ('anim', 'u1'), ('flags', 'u1'), ('anim_frame', '<u2'))
+PLAYER_RECORD = struct.Struct('<ifffiffBBH') # Same layout as PLAYER_FIELDS (32 bytes)
+ENEMY_RECORD = struct.Struct('<ifffifHHBBH') # Same layout as ENEMY_FIELDS (32 bytes)
+PLAYER_DTYPE = np.dtype(list(PLAYER_FIELDS)) if np is not None else None
+ENEMY_DTYPE = np.dtype(list(ENEMY_FIELDS)) if np is not None else None
+_ANIM_NAME_LOOKUP = np.array(ANIM_NAMES, dtype=object) if np is not None else None # Animation code -> name, for a whole column at once
+# Columns each entity kind needs, i.e. its get_network_state() keys with 'anim' (code) for 'anim_type'
+PLAYER_COLUMNS = ('id', 'x', 'y', 'health', 'max_health', 'defense', 'agility', 'anim', 'anim_frame') + tuple(key for key, _ in _FLAG_KEYS)
+ENEMY_COLUMNS = ('id', 'type', 'x', 'y', 'health', 'max_health', 'dialogue_text', 'dialogue_timer', 'anim', 'anim_frame') + tuple(key for key, _ in _FLAG_KEYS)
+
+_SNAPSHOT_HEADER = struct.Struct('<IHHH') # Sequence, player records, enemy records, strings
+_DELTA_HEADER = struct.Struct('<IIHHHHH') # Sequence, baseline sequence, changed players / enemies, removed players / enemies, strings
+_INITIAL_HEADER = struct.Struct('<i') # your_id, followed by a snapshot
+_INPUT = struct.Struct('<ffBI') # Move vector, buttons, acknowledged snapshot sequence
+_DISCONNECT = struct.Struct('<i')
+_DESPAWN_HEADER = struct.Struct('<I') # Enemy ids that follow (i4 each)
+_STRING_LENGTH = struct.Struct('<H')
+BUTTON_ATTACK, BUTTON_INTERACT = 1, 2
+
+class CodecError(ValueError):
+    """Raised for payloads that do not match the schema (and for states that cannot be encoded)."""
+
+# --- Encoding ---
+def state_columns(states, keys):
+    """{id: get_network_state() dict} -> {key: list} for keys (PLAYER_COLUMNS / ENEMY_COLUMNS), 'anim' coded from 'anim_type'."""
+    rows = list(states.values()); columns = {}
+    try:
+        for key in keys:
+            if key == 'anim': columns[key] = [ANIM_CODES[state.get('anim_type', 'idle')] for state in rows]
+            else: columns[key] = [state.get(key) for state in rows]
+    except KeyError as e:
+        raise CodecError(f"No animation code for {e}") from e
+    return columns
+
+def _string_index(strings, text):
+    if text is None: return NO_STRING
+    index = strings.get(text)
+    if index is None:
+        index = strings[text] = len(strings)
+        if index >= NO_STRING: raise CodecError("Too many distinct strings in one message")
+    return index
+
+def _string_table(strings):
+    table = bytearray()
+    for text in strings: # Insertion order is index order
+        raw = text.encode('utf-8'); table += _STRING_LENGTH.pack(len(raw)) + raw
+    return bytes(table)
+
+def _pack_rows(columns, fields, record, strings):
+    """(No NumPy) Packs columns into back-to-back records, one struct.pack_into per entity."""
+    count = len(columns['id']); values = []
+    for name, _ in fields:
+        if name == 'flags': values.append([sum(bit for key, bit in _FLAG_KEYS if columns[key][k]) for k in range(count)])
+        elif name in _STRING_FIELDS: values.append([_string_index(strings, text) for text in columns[_STRING_FIELDS[name]]])
+        else: values.append(columns[name])
+    out = bytearray(count * record.size)
+    for k, row in enumerate(zip(*values)): record.pack_into(out, k * record.size, *row)
+    return bytes(out)
+
+def _table(columns, fields):
+    """
+    (NumPy) Columns -> a snapshot table: {record field: array} in wire types (so equal values compare equal
+    after quantization), flags packed, string fields as object arrays of the strings, rows sorted by id.
+    """
+    count = len(columns['id'])
+    order = np.argsort(np.asarray(columns['id'], dtype=np.int64), kind='stable')
+    table = {}
+    for name, dtype in fields:
+        if name == 'flags':
+            column = np.zeros(count, dtype=np.uint8)
+            for key, bit in _FLAG_KEYS: column[np.asarray(columns[key], dtype=bool)] |= bit
+        elif name in _STRING_FIELDS:
+            column = np.empty(count, dtype=object); column[:] = list(columns[_STRING_FIELDS[name]])
+        else: column = np.asarray(columns[name]).astype(dtype)
+        table[name] = column[order]
+    return table
+
+def _string_indices(texts, strings):
+    return np.array([_string_index(strings, text) for text in texts.tolist()], dtype='<u2')
+
+def _pack_table(table, dtype, strings):
+    """(NumPy) A snapshot table as back-to-back records: one structured array filled column by column."""
+    rows = np.empty(len(table['id']), dtype=dtype)
+    for name, column in table.items(): rows[name] = _string_indices(column, strings) if name in _STRING_FIELDS else column
+    return rows.tobytes()
+
+def _pack_delta(current, baseline, fields, strings):
+    """
+    (NumPy) Delta section between two snapshot tables: ids of the entities that are new or changed, then per field a
+    bitmask over those entities (little bit order) followed by the new values where the bit is set. New entities set
+    every bit. Returns (changed count, removed ids, bytes).
+    """
+    ids = current['id']; base_ids = baseline['id']
+    if len(base_ids):
+        pos = np.minimum(np.searchsorted(base_ids, ids), len(base_ids) - 1); found = base_ids[pos] == ids
+    else:
+        pos = np.zeros(len(ids), dtype=np.intp); found = np.zeros(len(ids), dtype=bool)
+    masks = []; changed = ~found; matched = pos[found]
+    for name, _ in fields[1:]:
+        mask = ~found
+        mask[found] = current[name][found] != baseline[name][matched]
+        masks.append(mask); changed |= mask
+    rows = np.flatnonzero(changed)
+    removed = base_ids[~np.isin(base_ids, ids)]
+    parts = [ids[rows].tobytes()]
+    for (name, _), mask in zip(fields[1:], masks):
+        mask = mask[rows]; parts.append(np.packbits(mask, bitorder='little').tobytes())
+        values = current[name][rows[mask]]
+        parts.append(_string_indices(values, strings).tobytes() if name in _STRING_FIELDS else values.tobytes())
+    return len(rows), removed, b''.join(parts)
+
+def _snapshot_columns(data):
+    players = state_columns(data.get('players', {}), PLAYER_COLUMNS)
+    enemies = data.get('enemy_columns')
+    if enemies is None: enemies = state_columns(data.get('enemies', {}), ENEMY_COLUMNS)
+    return players, enemies
+
+def snapshot_tables(data):
+    """(NumPy) (player table, enemy table) for a snapshot message dict ('players' plus 'enemy_columns' or 'enemies')."""
+    players, enemies = _snapshot_columns(data)
+    try:
+        return _table(players, PLAYER_FIELDS), _table(enemies, ENEMY_FIELDS)
+    except (KeyError, TypeError, ValueError, OverflowError) as e:
+        raise CodecError(f"Cannot encode entity state: {e}") from e
+
+def _pack_snapshot(sequence, data=None, tables=None):
+    """Snapshot body: header, string table, player records, enemy records (from tables with NumPy, columns of data otherwise)."""
+    strings = {}
+    if np is not None:
+        players, enemies = tables if tables is not None else snapshot_tables(data)
+        body = _pack_table(players, PLAYER_DTYPE, strings) + _pack_table(enemies, ENEMY_DTYPE, strings)
+    else:
+        players, enemies = _snapshot_columns(data)
+        try:
+            body = _pack_rows(players, PLAYER_FIELDS, PLAYER_RECORD, strings) + _pack_rows(enemies, ENEMY_FIELDS, ENEMY_RECORD, strings)
+        except (struct.error, KeyError, TypeError) as e:
+            raise CodecError(f"Cannot encode entity state: {e}") from e
+    return _SNAPSHOT_HEADER.pack(sequence, len(players['id']), len(enemies['id']), len(strings)) + _string_table(strings) + body
+
+def encode_delta(sequence, tables, baseline_sequence, baseline_tables):
+    """(NumPy) A game_state_delta message taking the client from snapshot baseline_sequence to snapshot sequence."""
+    strings = {}
+    changed_players, removed_players, player_part = _pack_delta(tables[0], baseline_tables[0], PLAYER_FIELDS, strings)
+    changed_enemies, removed_enemies, enemy_part = _pack_delta(tables[1], baseline_tables[1], ENEMY_FIELDS, strings)
+    header = _DELTA_HEADER.pack(sequence, baseline_sequence, changed_players, changed_enemies, len(removed_players), len(removed_enemies), len(strings))
+    return bytes((MSG_GAME_DELTA,)) + header + _string_table(strings) + player_part + enemy_part + removed_players.tobytes() + removed_enemies.tobytes()
+
+def encode_message(data):
+    """
+    Encodes one message dict (the shapes open_world sends) to bytes. Snapshots may carry the enemies as
+    'enemy_columns' (CombatManager.get_enemy_network_columns()) instead of per-enemy dicts.
+    Deltas come from encode_delta(). Raises CodecError for unknown or malformed messages.
+    """
+    code = MESSAGE_CODES.get(data.get('type'))
+    if code is None or code == MSG_GAME_DELTA: raise CodecError(f"Cannot encode message type {data.get('type')!r}")
+    head = bytes((code,))
+    try:
+        if code == MSG_GAME_STATE: return head + _pack_snapshot(data.get('sequence', 0), data)
+        if code == MSG_INITIAL_STATE: return head + _INITIAL_HEADER.pack(data['your_id']) + _pack_snapshot(0, data)
+        if code == MSG_PLAYER_INPUT:
+            move_x, move_y = data.get('move_vector', (0, 0))
+            buttons = (BUTTON_ATTACK if data.get('attack') else 0) | (BUTTON_INTERACT if data.get('interact') else 0)
+            ack = data.get('ack')
+            return head + _INPUT.pack(move_x, move_y, buttons, NO_SEQUENCE if ack is None else ack)
+        if code == MSG_PLAYER_DISCONNECT: return head + _DISCONNECT.pack(data['id'])
+        if code == MSG_DESPAWN:
+            enemy_ids = list(data.get('enemies', ()))
+            return head + _DESPAWN_HEADER.pack(len(enemy_ids)) + struct.pack(f'<{len(enemy_ids)}i', *enemy_ids)
+    except (struct.error, KeyError, TypeError, ValueError) as e:
+        if isinstance(e, CodecError): raise
+        raise CodecError(f"Cannot encode {data.get('type')} message: {e}") from e
+    return head + str(data.get('message', '')).encode('utf-8') # MSG_ERROR
+
+# --- Decoding ---
+def _unpack_rows(payload, offset, count, fields, record, strings):
+    """(No NumPy) Inverse of _pack_rows: count records at offset -> {key: list} under the get_network_state() keys."""
+    names = [name for name, _ in fields]
+    rows = list(record.iter_unpack(payload[offset:offset + count * record.size]))
+    raw = {name: [row[k] for row in rows] for k, name in enumerate(names)}
+    flags = raw.pop('flags')
+    columns = {key: [bool(value & bit) for value in flags] for key, bit in _FLAG_KEYS}
+    columns.update(raw)
+    columns['anim_type'] = [ANIM_NAMES[code] for code in columns.pop('anim')]
+    lookup = dict(enumerate(strings)); lookup[NO_STRING] = None
+    for name, key in _STRING_FIELDS.items():
+        if name in columns: columns[key] = [lookup[index] for index in columns.pop(name)]
+    return columns
+
+def _lookup_strings(indices, strings):
+    """(NumPy) String-table indices -> object array of the strings (None for NO_STRING)."""
+    lookup = np.empty(len(strings) + 1, dtype=object); lookup[:len(strings)] = strings
+    indices = indices.astype(np.intp); indices[indices == NO_STRING] = len(strings)
+    if len(indices) and indices.max() > len(strings): raise CodecError("String index outside the string table")
+    return lookup[indices]
+
+def _check_values(name, column):
+    if name == 'anim' and len(column) and column.max() >= len(ANIM_NAMES): raise CodecError("Animation code outside ANIM_NAMES")
+
+def _unpack_table(payload, offset, count, dtype, strings):
+    """(NumPy) Inverse of _pack_table: count records at offset, read with one np.frombuffer -> snapshot table."""
+    rows = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+    table = {}
+    for name in dtype.names:
+        column = rows[name]
+        if name in _STRING_FIELDS: column = _lookup_strings(column, strings)
+        _check_values(name, column); table[name] = column
+    return table
+
+def table_columns(table, rows=None):
+    """(NumPy) Snapshot table (only rows, if given) -> {key: list} under the get_network_state() keys: flags expanded, 'anim_type' names, strings."""
+    flags = table['flags'] if rows is None else table['flags'][rows]
+    columns = {key: (flags & bit).astype(bool).tolist() for key, bit in _FLAG_KEYS}
+    for name, column in table.items():
+        if name == 'flags': continue
+        column = column if rows is None else column[rows]
+        if name == 'anim': columns['anim_type'] = _ANIM_NAME_LOOKUP[column].tolist()
+        else: columns[_STRING_FIELDS.get(name, name)] = column.tolist()
+    return columns
+
+class ColumnRow:
+    """Read-only view of row index of a {key: list} column set, standing in for a state dict (get(), [], in, keys())."""
+    __slots__ = ('columns', 'index')
+
+    def __init__(self, columns, index):
+        self.columns = columns; self.index = index
+
+    def __getitem__(self, key):
+        return self.columns[key][self.index]
+
+    def get(self, key, default=None):
+        column = self.columns.get(key)
+        return default if column is None else column[self.index]
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    def keys(self):
+        return self.columns.keys()
+
+def column_states(columns):
+    """{key: list} columns -> {id: ColumnRow}, the shape apply_network_state() takes, without building a dict per entity."""
+    return {entity_id: ColumnRow(columns, k) for k, entity_id in enumerate(columns['id'])}
+
+def _unpack_strings(payload, offset, count):
+    strings = []
+    for _ in range(count):
+        (length,) = _STRING_LENGTH.unpack_from(payload, offset); offset += _STRING_LENGTH.size
+        if offset + length > len(payload): raise CodecError("String table runs past the payload")
+        strings.append(bytes(payload[offset:offset + length]).decode('utf-8')); offset += length
+    return strings, offset
+
+def _unpack_snapshot(payload, offset, message):
+    """
+    Inverse of _pack_snapshot, into message: 'sequence', 'players' as {id: ColumnRow} and 'enemy_columns' as
+    {key: list} (the shape CombatManager.apply_enemy_network_state() reads), both with the get_network_state()
+    keys, and with NumPy the snapshot 'tables' (for SnapshotReceiver).
+    """
+    sequence, n_players, n_enemies, n_strings = _SNAPSHOT_HEADER.unpack_from(payload, offset); offset += _SNAPSHOT_HEADER.size
+    strings, offset = _unpack_strings(payload, offset, n_strings)
+    if offset + n_players * PLAYER_RECORD.size + n_enemies * ENEMY_RECORD.size != len(payload):
+        raise CodecError("Record block does not match the payload length")
+    message['sequence'] = sequence
+    if np is not None:
+        players = _unpack_table(payload, offset, n_players, PLAYER_DTYPE, strings)
+        enemies = _unpack_table(payload, offset + n_players * PLAYER_RECORD.size, n_enemies, ENEMY_DTYPE, strings)
+        message['tables'] = (players, enemies)
+        players = table_columns(players); enemies = table_columns(enemies)
+    else:
+        players = _unpack_rows(payload, offset, n_players, PLAYER_FIELDS, PLAYER_RECORD, strings)
+        enemies = _unpack_rows(payload, offset + n_players * PLAYER_RECORD.size, n_enemies, ENEMY_FIELDS, ENEMY_RECORD, strings)
+    message['players'] = column_states(players); message['enemy_columns'] = enemies # Thousands of rows: no object per enemy
+    return message
+
+def _unpack_delta_section(payload, offset, count, fields, strings):
+    """(NumPy) Inverse of _pack_delta's bytes. Returns (ids, {field: (mask, values)}, offset after the section)."""
+    ids = np.frombuffer(payload, dtype='<i4', count=count, offset=offset); offset += 4 * count
+    mask_bytes = (count + 7) // 8; values = {}
+    for name, dtype in fields[1:]:
+        mask = np.unpackbits(np.frombuffer(payload, dtype=np.uint8, count=mask_bytes, offset=offset), count=count, bitorder='little').astype(bool)
+        offset += mask_bytes
+        wire = np.dtype('<u2' if name in _STRING_FIELDS else dtype); set_count = int(mask.sum())
+        column = np.frombuffer(payload, dtype=wire, count=set_count, offset=offset); offset += set_count * wire.itemsize
+        if name in _STRING_FIELDS: column = _lookup_strings(column, strings)
+        _check_values(name, column); values[name] = (mask, column)
+    return ids, values, offset
+
+def _unpack_delta(payload, offset, message):
+    if np is None: raise CodecError("Snapshot deltas need NumPy")
+    sequence, baseline, n_players, n_enemies, n_removed_players, n_removed_enemies, n_strings = _DELTA_HEADER.unpack_from(payload, offset)
+    strings, offset = _unpack_strings(payload, offset + _DELTA_HEADER.size, n_strings)
+    player_ids, player_values, offset = _unpack_delta_section(payload, offset, n_players, PLAYER_FIELDS, strings)
+    enemy_ids, enemy_values, offset = _unpack_delta_section(payload, offset, n_enemies, ENEMY_FIELDS, strings)
+    removed_players = np.frombuffer(payload, dtype='<i4', count=n_removed_players, offset=offset); offset += 4 * n_removed_players
+    removed_enemies = np.frombuffer(payload, dtype='<i4', count=n_removed_enemies, offset=offset); offset += 4 * n_removed_enemies
+    if offset != len(payload): raise CodecError("Delta does not match the payload length")
+    message.update(sequence=sequence, baseline=baseline, players=(player_ids, player_values, removed_players), enemies=(enemy_ids, enemy_values, removed_enemies))
+    return message
+
+def apply_delta(baseline, ids, values, removed):
+    """
+    (NumPy) Rebuilds a snapshot table from its baseline table and one delta section. Returns (table, rows of the
+    changed entities in it). Raises CodecError if the delta adds an entity without sending all of its fields.
+    """
+    keep = ~np.isin(baseline['id'], removed)
+    table = {name: column[keep] for name, column in baseline.items()} # Copies, the baseline stays intact
+    base_ids = table['id']; count = len(base_ids)
+    if count:
+        pos = np.minimum(np.searchsorted(base_ids, ids), count - 1); found = base_ids[pos] == ids
+    else:
+        pos = np.zeros(len(ids), dtype=np.intp); found = np.zeros(len(ids), dtype=bool)
+    added = ~found; added_count = int(added.sum())
+    if added_count:
+        if not all(mask[added].all() for mask, _ in values.values()): raise CodecError("Delta adds an entity without its full state")
+        table = {name: np.concatenate([column, np.zeros(added_count, dtype=column.dtype)]) for name, column in table.items()}
+    target = np.where(found, pos, count + np.cumsum(added) - 1)
+    table['id'][target[added]] = ids[added]
+    for name, (mask, column) in values.items(): table[name][target[mask]] = column
+    if added_count:
+        order = np.argsort(table['id'], kind='stable'); table = {name: column[order] for name, column in table.items()}
+    return table, np.searchsorted(table['id'], ids)
+
+def decode_message(payload):
+    """
+    Decodes bytes from encode_message() / encode_delta() back to the message dict. Raises CodecError on anything malformed.
+    A game_state_delta holds raw delta sections; SnapshotReceiver turns it back into entity states.
+    """
+    if not payload: raise CodecError("Empty payload")
+    code = payload[0]
+    name = MESSAGE_NAMES.get(code)
+    if name is None: raise CodecError(f"Unknown message code {code}")
+    try:
+        if code == MSG_GAME_STATE: return _unpack_snapshot(payload, 1, {'type': name})
+        if code == MSG_GAME_DELTA: return _unpack_delta(payload, 1, {'type': name})
+        if code == MSG_INITIAL_STATE:
+            (your_id,) = _INITIAL_HEADER.unpack_from(payload, 1)
+            return _unpack_snapshot(payload, 1 + _INITIAL_HEADER.size, {'type': name, 'your_id': your_id})
+        if code == MSG_PLAYER_INPUT:
+            move_x, move_y, buttons, ack = _INPUT.unpack(payload[1:])
+            return {'type': name, 'move_vector': [move_x, move_y], 'attack': bool(buttons & BUTTON_ATTACK),
+                    'interact': bool(buttons & BUTTON_INTERACT), 'ack': None if ack == NO_SEQUENCE else ack}
+        if code == MSG_PLAYER_DISCONNECT:
+            (pid,) = _DISCONNECT.unpack(payload[1:])
+            return {'type': name, 'id': pid}
+        if code == MSG_DESPAWN:
+            (count,) = _DESPAWN_HEADER.unpack_from(payload, 1)
+            if len(payload) != 1 + _DESPAWN_HEADER.size + 4 * count: raise CodecError("Despawn id count does not match payload size")
+            return {'type': name, 'enemies': list(struct.unpack_from(f'<{count}i', payload, 1 + _DESPAWN_HEADER.size))}
+        return {'type': name, 'message': bytes(payload[1:]).decode('utf-8', errors='replace')} # MSG_ERROR
+    except (struct.error, IndexError, KeyError, ValueError) as e: # ValueError covers UnicodeDecodeError and short np.frombuffer reads
+        if isinstance(e, CodecError): raise
+        raise CodecError(f"Malformed {name} payload: {e}") from e
+
+# --- Snapshot Delta Compression ---
+def _view(tables, enemy_ids):
+    """(NumPy) Snapshot tables cut down to the enemies in enemy_ids (sorted). Players are always kept."""
+    players, enemies = tables
+    keep = np.isin(enemies['id'], enemy_ids, assume_unique=True)
+    return players, {name: column[keep] for name, column in enemies.items()}
+
+def _filter_columns(columns, enemy_ids):
+    """Enemy columns cut down to the enemies in enemy_ids (a set), for the no-NumPy full snapshot."""
+    rows = [k for k, enemy_id in enumerate(columns['id']) if enemy_id in enemy_ids]
+    return {key: [values[k] for k in rows] for key, values in columns.items()}
+
+class SnapshotHistory:
+    """
+    (Server Only) Numbered game-state snapshots for delta compression.
+
+    push() records this tick's state as snapshot tables under the next sequence number and keeps the last
+    history_size of them. encode_for(ack) returns the message for a client whose latest acknowledged snapshot
+    is ack: a delta against that snapshot while it is still in the history (and smaller than the full snapshot),
+    otherwise the full snapshot, which is what a client gets on join, after falling too far behind, or when
+    it never acks (a client without NumPy). Encodings are shared by every client with the same ack in a tick,
+    so the cost follows how many entities changed, not how many exist. Without NumPy every snapshot goes out in full.
+
+    Given the client's InterestArea (moved with update_interest() first), encode_for() cuts both this snapshot
+    and the baseline down to the enemies that client sees; those encodings are the client's own.
+    """
+    def __init__(self, history_size=SNAPSHOT_HISTORY):
+        self.history_size = max(1, int(history_size))
+        self.sequence = 0
+        self.history = {} # sequence -> (player table, enemy table), oldest first
+        self.current = None # This tick's snapshot message dict (kept for the no-NumPy full encode)
+        self.encoded = {} # This tick: baseline sequence (None = full) -> payload
+        self.full_sent = 0; self.delta_sent = 0; self.bytes_sent = 0
+
+    def __len__(self):
+        return len(self.history)
+
+    def push(self, players, enemy_columns=None):
+        """Records a snapshot. players: {id: get_network_state()}; enemy_columns: CombatManager.get_enemy_network_columns() (None: no enemies). Returns its sequence."""
+        self.sequence = self.sequence + 1 if self.sequence + 1 < NO_SEQUENCE else 1
+        self.current = {'type': 'game_state_update', 'sequence': self.sequence, 'players': players, 'enemy_columns': enemy_columns}
+        self.encoded = {}
+        if np is not None:
+            self.history[self.sequence] = snapshot_tables(self.current)
+            while len(self.history) > self.history_size: del self.history[next(iter(self.history))]
+        return self.sequence
+
+    def update_interest(self, interest, center):
+        """Moves a client's InterestArea to this snapshot around center ((x, y) of its player, or None). Returns the enemy ids that left it."""
+        enemies = self.history[self.sequence][1] if np is not None else _snapshot_columns(self.current)[1]
+        return interest.update(self.sequence, enemies['id'], enemies['x'], enemies['y'], center)
+
+    def encode_for(self, ack, interest=None):
+        """
+        The payload (bytes) to send a client whose last acknowledged snapshot sequence is ack (None: nothing acked yet).
+        interest: the client's InterestArea, or None to send the whole world.
+        """
+        baseline = self.history.get(ack) if ack is not None and ack != self.sequence else None
+        if interest is not None and baseline is not None:
+            seen = interest.seen.get(ack)
+            baseline = None if seen is None else _view(baseline, seen)
+        key = ack if baseline is not None else None
+        payload = self.encoded.get(key) if interest is None else None
+        if payload is None:
+            if baseline is not None:
+                tables = self.history[self.sequence]
+                if interest is not None: tables = _view(tables, interest.visible)
+                payload = encode_delta(self.sequence, tables, ack, baseline)
+                if len(payload) >= len(tables[0]['id']) * PLAYER_RECORD.size + len(tables[1]['id']) * ENEMY_RECORD.size:
+                    payload = self._full(interest) # Everything changed: the full snapshot is no bigger
+            else: payload = self._full(interest)
+            if interest is None: self.encoded[key] = payload
+        if payload[0] == MSG_GAME_DELTA: self.delta_sent += 1
+        else: self.full_sent += 1
+        self.bytes_sent += len(payload)
+        return payload
+
+    def _full(self, interest=None):
+        if interest is not None:
+            if np is not None: return bytes((MSG_GAME_STATE,)) + _pack_snapshot(self.sequence, tables=_view(self.history[self.sequence], interest.visible))
+            data = dict(self.current, enemy_columns=_filter_columns(_snapshot_columns(self.current)[1], interest.visible))
+            return bytes((MSG_GAME_STATE,)) + _pack_snapshot(self.sequence, data)
+        payload = self.encoded.get(None)
+        if payload is None:
+            tables = self.history.get(self.sequence) if np is not None else None
+            payload = self.encoded[None] = bytes((MSG_GAME_STATE,)) + _pack_snapshot(self.sequence, self.current, tables)
+        return payload
+
+    def take_counters(self):
+        """Returns (full snapshots sent, deltas sent, bytes sent) since the last call and resets them."""
+        counters = (self.full_sent, self.delta_sent, self.bytes_sent)
+        self.full_sent = self.delta_sent = self.bytes_sent = 0
+        return counters
+
+class SnapshotReceiver:
+    """
+    (Client) Turns decoded game_state_update / game_state_delta messages back into entity states.
+
+    Full snapshots and rebuilt deltas are kept as tables by sequence (the last history_size), so a delta can
+    be applied to whichever snapshot the server took as its baseline. ack is the sequence to acknowledge in
+    player_input; it is None until a full snapshot has arrived, after a delta against a snapshot this side no
+    longer has (the server then answers with a full snapshot), and always without NumPy.
+    """
+    def __init__(self, history_size=SNAPSHOT_HISTORY):
+        self.history_size = max(1, int(history_size))
+        self.history = {} # sequence -> (player table, enemy table), oldest first
+        self.ack = None
+
+    def receive(self, message):
+        """
+        Returns (player states, enemy columns, removed player ids, removed enemy ids), player states as {id: ColumnRow}
+        and enemies as {key: list} columns.
+        A full snapshot lists every entity and returns None for both removed lists (whatever it does not list is gone);
+        a delta lists only new and changed entities. Returns None if the delta's baseline is unknown.
+        """
+        if message['type'] == 'game_state_update':
+            tables = message.get('tables')
+            if tables is not None: self._remember(message['sequence'], tables)
+            return message['players'], message['enemy_columns'], None, None
+        baseline = self.history.get(message['baseline'])
+        if baseline is None: # Lost track: stop acking until a full snapshot resets us
+            self.history.clear(); self.ack = None
+            return None
+        player_ids, player_values, removed_players = message['players']
+        enemy_ids, enemy_values, removed_enemies = message['enemies']
+        players, player_rows = apply_delta(baseline[0], player_ids, player_values, removed_players)
+        enemies, enemy_rows = apply_delta(baseline[1], enemy_ids, enemy_values, removed_enemies)
+        self._remember(message['sequence'], (players, enemies))
+        return (column_states(table_columns(players, player_rows)), table_columns(enemies, enemy_rows),
+                removed_players.tolist(), removed_enemies.tolist())
+
+    def forget(self, enemy_ids):
+        """Drops despawned enemies from every kept snapshot, like the server drops them from the client's view."""
+        if not enemy_ids or np is None: return
+        for sequence, (players, enemies) in self.history.items():
+            keep = ~np.isin(enemies['id'], enemy_ids)
+            if not keep.all(): self.history[sequence] = (players, {name: column[keep] for name, column in enemies.items()})
+
+    def _remember(self, sequence, tables):
+        self.history[sequence] = tables; self.ack = sequence
+        while len(self.history) > self.history_size: del self.history[next(iter(self.history))]
+
+# --- END OF FILE net_codec.py ---
@@ -0,0 +1,76 @@
+# --- START OF FILE net_interest.py ---
+from NETconfig import AOI_ENTER_RADIUS, AOI_LEAVE_RADIUS, SNAPSHOT_HISTORY
+
+# NumPy is optional: without it the area is tracked as a set with a per-enemy loop (snapshots then always go out in full)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- Client Area of Interest ---
+class InterestArea:
+    """
+    (Server Only) One client's area of interest: the enemies its snapshots carry.
+
+    An enemy enters the area when it comes within enter_radius of the client's player and leaves it only
+    once it is beyond leave_radius (or gone from the world), so enemies near the edge do not flicker in and
+    out. update() runs once per snapshot and returns the enemies that left, which the server announces with
+    a despawn message; snapshot size then follows how crowded the player's surroundings are, not the world.
+    seen keeps the visible ids of each recent snapshot so a delta is built against the same view the client
+    acknowledged. An enemy that leaves is dropped from all of them, so if it comes back it is sent in full.
+    """
+    def __init__(self, enter_radius=AOI_ENTER_RADIUS, leave_radius=AOI_LEAVE_RADIUS, history_size=SNAPSHOT_HISTORY):
+        self.enter_sq = float(enter_radius) ** 2
+        self.leave_sq = float(max(enter_radius, leave_radius)) ** 2 # Leaving never happens closer than entering
+        self.history_size = max(1, int(history_size))
+        self.visible = np.zeros(0, dtype=np.int32) if np is not None else set() # Sorted ids with NumPy
+        self.seen = {} # (NumPy) snapshot sequence -> visible ids then, oldest first
+        self.entered = 0; self.left = 0 # Counters since the last take_counters()
+
+    def __len__(self):
+        return len(self.visible)
+
+    def update(self, sequence, ids, xs, ys, center):
+        """
+        Moves the area to snapshot sequence. ids / xs / ys: the snapshot's enemies (id-sorted arrays with NumPy,
+        sequences otherwise); center: (x, y) of the client's player, or None (no player yet / gone) to keep the
+        current area minus enemies that no longer exist. Returns the ids that left the area, as a list.
+        """
+        if np is None: return self._update_set(ids, xs, ys, center)
+        ids = np.asarray(ids, dtype=np.int32)
+        was = np.isin(ids, self.visible, assume_unique=True)
+        if center is None: now = was
+        else:
+            dx = np.asarray(xs, dtype=np.float64) - center[0]; dy = np.asarray(ys, dtype=np.float64) - center[1]
+            dist_sq = dx * dx + dy * dy
+            now = (dist_sq < self.enter_sq) | (was & (dist_sq < self.leave_sq))
+        visible = ids[now]
+        left = np.setdiff1d(self.visible, visible, assume_unique=True)
+        self.entered += int(np.count_nonzero(now & ~was)); self.left += len(left)
+        self.visible = visible
+        if len(left):
+            for seq, seen_ids in self.seen.items(): self.seen[seq] = np.setdiff1d(seen_ids, left, assume_unique=True)
+        self.seen[sequence] = visible
+        while len(self.seen) > self.history_size: del self.seen[next(iter(self.seen))]
+        return left.tolist()
+
+    def _update_set(self, ids, xs, ys, center):
+        was = self.visible; now = set()
+        for enemy_id, x, y in zip(ids, xs, ys):
+            if center is None:
+                if enemy_id in was: now.add(enemy_id)
+                continue
+            dist_sq = (x - center[0]) ** 2 + (y - center[1]) ** 2
+            if dist_sq < self.enter_sq or (dist_sq < self.leave_sq and enemy_id in was): now.add(enemy_id)
+        left = sorted(was - now)
+        self.entered += len(now - was); self.left += len(left)
+        self.visible = now
+        return left
+
+    def take_counters(self):
+        """Returns (enemies that entered, enemies that left) since the last call and resets them."""
+        counters = (self.entered, self.left)
+        self.entered = self.left = 0
+        return counters
+
+# --- END OF FILE net_interest.py ---
@@ -0,0 +1,235 @@
+# --- START OF FILE net_server.py ---
+import collections
+import selectors
+import socket
+
+import net_codec
+from NETconfig import HEADER_SIZE, MAX_CLIENTS, OUTBOUND_QUEUE_LIMIT, PORT
+
+RECV_SIZE = 65536 # Bytes read from a socket per readiness event
+MAX_INBOUND_MESSAGE = 1 << 16 # Clients only send small messages; a bigger frame header means a broken or hostile peer
+WRITE_CHUNK = 65536 # Queued messages moved to the write buffer at a time; once there they are committed
+
+def frame(payload):
+    """A payload prefixed with the fixed-size length header every message on the wire carries."""
+    return f"{len(payload):<{HEADER_SIZE}}".encode('utf-8') + payload
+
+class Connection:
+    """
+    (Server Only) One client socket with its read buffer (bytes not yet forming a whole message), its outbound
+    queue (framed messages not yet handed to the write buffer) and its write buffer (bytes the socket has not
+    taken yet). Snapshots in the queue can still be replaced; whatever reached the write buffer goes out as is.
+    """
+    def __init__(self, sock, addr):
+        self.sock = sock; self.addr = addr
+        self.inbox = bytearray() # Received, not yet parsed
+        self.queue = collections.deque() # (framed message, is snapshot), oldest first
+        self.queued_bytes = 0; self.queued_snapshots = 0
+        self.outbox = bytearray() # Write buffer: framed, not yet accepted by the socket
+        self.writing = False # Registered for write readiness
+        self.closing = False # Close once everything queued is written (rejected connections)
+        self.closed = False
+        self.snapshots_dropped = 0; self.messages_sent = 0 # Counters since the last take_counters()
+
+    def __repr__(self):
+        return f"Connection{self.addr}"
+
+    def has_output(self):
+        return bool(self.outbox or self.queue)
+
+    def take_counters(self):
+        """Returns (queue depth, queued bytes, snapshots dropped, messages sent); the last two are since the last call and reset."""
+        counters = (len(self.queue), self.queued_bytes, self.snapshots_dropped, self.messages_sent)
+        self.snapshots_dropped = self.messages_sent = 0
+        return counters
+
+# --- Server Network Layer ---
+class ServerCore:
+    """
+    (Server Only) Single-threaded, non-blocking network layer of the host.
+
+    One selectors loop accepts connections, reads whatever arrived and writes whatever each socket will
+    take; nothing in it blocks, so a dedicated host serves many clients from the simulation thread without
+    a handler thread per client. poll() does the I/O and turns complete messages into events, which the
+    simulation drains with events() as (kind, connection, message): 'connect', 'message' (the decoded dict)
+    and 'disconnect'. Output goes the other way: send() / close() only queue, and the bytes leave on the
+    next poll() or flush(). A connection that errors or sends a malformed message is closed and reported
+    with a 'disconnect' event; connections past max_connections get an error message and are closed.
+
+    Each connection's outbound queue is bounded. A client that falls behind keeps only the newest snapshot
+    queued (net_codec.SNAPSHOT_MESSAGES replace any older unsent one), so its backlog stays small and the
+    next delta still builds on what it acknowledged; reliable messages stay queued in order. If those alone
+    pass max_queue the client is disconnected, so one stalled connection never holds up everyone's tick.
+    """
+    def __init__(self, port=PORT, max_connections=MAX_CLIENTS - 1, max_queue=OUTBOUND_QUEUE_LIMIT): # -1: the host counts as a client
+        self.port = port
+        self.max_connections = max(0, int(max_connections))
+        self.max_queue = max(1, int(max_queue))
+        self.selector = selectors.DefaultSelector()
+        self.listener = None
+        self.connections = set() # Accepted (and not rejected) connections
+        self.inbound = collections.deque() # Events for the simulation: (kind, connection, message)
+
+    def start(self):
+        """Binds and listens on the port. Raises socket.error if it cannot."""
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # Allow reusing address quickly
+        try:
+            listener.bind(('0.0.0.0', self.port)) # Bind to all available interfaces
+            listener.listen(max(self.max_connections, 1))
+            listener.setblocking(False)
+        except socket.error:
+            listener.close()
+            raise
+        self.listener = listener
+        self.selector.register(listener, selectors.EVENT_READ, None)
+        print(f"[SERVER] Listening on port {listener.getsockname()[1]}...")
+
+    def poll(self, timeout=0.0):
+        """Accepts, reads and writes whatever is ready, waiting at most timeout seconds. Returns the number of queued events."""
+        if self.listener is None: return 0
+        for key, mask in self.selector.select(timeout):
+            conn = key.data
+            if conn is None: self._accept(); continue
+            if mask & selectors.EVENT_READ: self._read(conn)
+            if mask & selectors.EVENT_WRITE and not conn.closed: self._write(conn)
+        return len(self.inbound)
+
+    def flush(self):
+        """Writes queued output to every connection that has some, without waiting for the next poll()."""
+        for conn in list(self.connections):
+            if conn.has_output() and not conn.closed: self._write(conn)
+
+    def events(self):
+        """Takes every queued event, oldest first."""
+        events = list(self.inbound); self.inbound.clear()
+        return events
+
+    def send(self, conn, data):
+        """Queues a message (a dict, or bytes from net_codec) for conn. Returns False if conn is closed or the message cannot be encoded."""
+        if conn.closed: return False
+        try:
+            payload = data if isinstance(data, bytes) else net_codec.encode_message(data)
+        except net_codec.CodecError as e:
+            print(f"[SERVER] Could not encode message for {conn.addr}: {e}")
+            return False
+        framed = frame(payload); snapshot = bool(payload) and payload[0] in net_codec.SNAPSHOT_MESSAGES
+        if snapshot and conn.queued_snapshots: # Falling behind: the newest snapshot replaces the unsent ones
+            kept = collections.deque(entry for entry in conn.queue if not entry[1])
+            conn.queued_bytes = sum(len(entry[0]) for entry in kept)
+            conn.snapshots_dropped += conn.queued_snapshots; conn.queued_snapshots = 0
+            conn.queue = kept
+        conn.queue.append((framed, snapshot)); conn.queued_bytes += len(framed)
+        if snapshot: conn.queued_snapshots += 1
+        if len(conn.queue) > self.max_queue:
+            self.close(conn, f"outbound queue over {self.max_queue} messages (client too slow)")
+            return False
+        if not conn.writing: self._watch(conn, write=True)
+        return True
+
+    def take_counters(self):
+        """Returns {connection: Connection.take_counters()} for every client connection."""
+        return {conn: conn.take_counters() for conn in self.connections}
+
+    def close(self, conn, reason=None):
+        """Closes conn now (its unsent output is dropped) and queues its 'disconnect' event if it was a client."""
+        if conn.closed: return
+        conn.closed = True
+        if reason: print(f"[SERVER] Closing connection {conn.addr}: {reason}")
+        try: self.selector.unregister(conn.sock)
+        except (KeyError, ValueError): pass
+        try: conn.sock.close()
+        except socket.error: pass # Ignore errors closing an already potentially closed socket
+        if conn in self.connections:
+            self.connections.discard(conn)
+            self.inbound.append(('disconnect', conn, None))
+
+    def shutdown(self):
+        """Closes every connection and the listening socket."""
+        for conn in list(self.connections): self.close(conn)
+        if self.listener is not None:
+            self.selector.unregister(self.listener); self.listener.close(); self.listener = None
+        self.selector.close()
+
+    # --- Socket I/O ---
+    def _accept(self):
+        while True: # Take every pending connection
+            try:
+                sock, addr = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except socket.error as e:
+                print(f"[SERVER] Error accepting connection: {e}")
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # Snapshots are small and latency-bound
+            conn = Connection(sock, addr)
+            self.selector.register(sock, selectors.EVENT_READ, conn)
+            if len(self.connections) >= self.max_connections: # Server full: say so, then close once it is written
+                print(f"[SERVER] Connection rejected from {addr}: Server full.")
+                conn.closing = True
+                self.send(conn, {'type': 'error', 'message': 'Server is full.'})
+                continue
+            print(f"[SERVER] Accepted connection from {addr}")
+            self.connections.add(conn)
+            self.inbound.append(('connect', conn, None))
+
+    def _read(self, conn):
+        try:
+            chunk = conn.sock.recv(RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except socket.error as e:
+            self.close(conn, f"receive error: {e}"); return
+        if not chunk:
+            self.close(conn, "connection closed by peer"); return
+        if conn.closing: return # Rejected: whatever it sends is ignored
+        conn.inbox += chunk
+        self._parse(conn)
+
+    def _parse(self, conn):
+        inbox = conn.inbox; offset = 0
+        while len(inbox) - offset >= HEADER_SIZE:
+            try:
+                length = int(inbox[offset:offset + HEADER_SIZE].decode('utf-8').strip())
+            except ValueError:
+                self.close(conn, f"invalid header {bytes(inbox[offset:offset + HEADER_SIZE])!r}"); return
+            if not 0 < length <= MAX_INBOUND_MESSAGE:
+                self.close(conn, f"message size {length} out of range"); return
+            end = offset + HEADER_SIZE + length
+            if len(inbox) < end: break # Rest of the message not here yet
+            try:
+                message = net_codec.decode_message(bytes(inbox[offset + HEADER_SIZE:end])) # Schema-checked, never executes anything from the wire
+            except net_codec.CodecError as e:
+                self.close(conn, f"failed to decode data: {e}"); return
+            self.inbound.append(('message', conn, message))
+            offset = end
+        if offset: del inbox[:offset]
+
+    def _write(self, conn):
+        if not conn.outbox: self._fill(conn)
+        try:
+            sent = conn.sock.send(conn.outbox)
+        except (BlockingIOError, InterruptedError):
+            return
+        except socket.error as e:
+            self.close(conn, f"send error: {e}"); return
+        del conn.outbox[:sent]
+        if conn.has_output(): return
+        if conn.closing: self.close(conn); return
+        self._watch(conn, write=False) # Nothing left: stop asking for write readiness
+
+    def _fill(self, conn):
+        """Moves queued messages (up to about WRITE_CHUNK bytes) into the empty write buffer."""
+        queue = conn.queue; outbox = conn.outbox
+        while queue and len(outbox) < WRITE_CHUNK:
+            framed, snapshot = queue.popleft()
+            outbox += framed; conn.queued_bytes -= len(framed); conn.messages_sent += 1
+            if snapshot: conn.queued_snapshots -= 1
+
+    def _watch(self, conn, write):
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if write else 0)
+        try: self.selector.modify(conn.sock, events, conn); conn.writing = write
+        except (KeyError, ValueError): pass # Already unregistered
+
+# --- END OF FILE net_server.py ---
@@ -3,6 +3,11 @@ import pygame
 import random
 import math
 
+from world_structures.spatial_hash import SpatialHash
+from world_structures.tile_collider import TileCollisionGrid
+from world_structures.broadphase_cache import BroadPhaseCache
+from world_structures.timer_wheel import TimerWheel
+from world_structures import kinematics
 
 # Fallback values if modules not found directly (e.g., running standalone)
 SCREEN_WIDTH = 800
@@ -66,15 +71,30 @@ class NPC:
         self.dialogue_timer = 0.0
         # <<< NETWORK: Store ID of interacting player (server-side use primarily) >>>
         self.talking_to_player_id = None
+        self.timers = None # TimerWheel running wander_timer / dialogue_timer (server); None = decremented every update
 
-    def update_behavior(self, dt, colliders_nearby):
-        """ (Server Only) Updates NPC state machine and movement based on behavior. """
+    def attach_timers(self, wheel):
+        """(Server Only) Hands the countdowns to a TimerWheel: they are no longer decremented every update."""
+        self.timers = wheel
+        for name in ('wander_timer', 'dialogue_timer'):
+            if getattr(self, name) > 0: wheel.arm(self, name, getattr(self, name), self._timer_expired)
+
+    def _set_timer(self, name, seconds):
+        if self.timers is not None: self.timers.arm(self, name, seconds, self._timer_expired)
+        else: setattr(self, name, seconds)
+
+    def _timer_expired(self, name):
+        if name == 'dialogue_timer' and self.dialogue_active: self._advance_dialogue()
+
+    def update_behavior(self, dt, colliders_nearby, tile_grid=None, wall_segments=None):
+        """ (Server Only) Updates NPC state machine and movement based on behavior. tile_grid (dungeon) replaces colliders_nearby;
+            wall_segments keeps NPCs out of the kingdom wall capsules. """
         if self.state == 'talking':
-            # Don't wander or move while talking
-            self.wander_timer = random.uniform(NPC_WANDER_TIME_MIN, NPC_WANDER_TIME_MAX) # Reset wander timer
+            # Don't wander or move while talking (the wander timer restarts when the dialogue ends)
+            if self.timers is None: self.wander_timer = random.uniform(NPC_WANDER_TIME_MIN, NPC_WANDER_TIME_MAX) # Reset wander timer
             return
 
-        self.wander_timer -= dt
+        if self.timers is None: self.wander_timer -= dt
 
         # --- State Transitions ---
         if self.state == 'idle':
@@ -101,7 +121,7 @@ class NPC:
                     # print(f"NPC {self.id} reached wander target.") # Debug
                     self.state = 'idle'
                     self.target_position = None
-                    self.wander_timer = random.uniform(NPC_WANDER_TIME_MIN, NPC_WANDER_TIME_MAX)
+                    self._set_timer('wander_timer', random.uniform(NPC_WANDER_TIME_MIN, NPC_WANDER_TIME_MAX))
                 else:
                     # Move towards target
                     move_vector = direction.normalize() * self.speed * dt * 60 # Use FPS scaling
@@ -112,14 +132,14 @@ class NPC:
                     potential_move_y = self.y + move_vector.y
                     temp_rect_x = self.rect.copy()
                     temp_rect_x.centerx = int(potential_move_x)
-                    collided_x = False
+                    collided_x = tile_grid is not None and tile_grid.rect_blocked(temp_rect_x)
                     for obs in colliders_nearby:
                          if temp_rect_x.colliderect(obs):
                               collided_x = True; break
 
                     temp_rect_y = self.rect.copy()
                     temp_rect_y.centery = int(potential_move_y)
-                    collided_y = False
+                    collided_y = tile_grid is not None and tile_grid.rect_blocked(temp_rect_y)
                     for obs in colliders_nearby:
                          if temp_rect_y.colliderect(obs):
                               collided_y = True; break
@@ -127,12 +147,14 @@ class NPC:
                     # Apply movement only if no collision on that axis
                     if not collided_x: self.x = potential_move_x
                     if not collided_y: self.y = potential_move_y
+                    if wall_segments is not None:
+                        self.x, self.y, _ = wall_segments.resolve_circle(self.x, self.y, self.radius)
 
                     self.rect.center = (int(self.x), int(self.y))
 
             else: # No target position while wandering? Go idle.
                 self.state = 'idle'
-                self.wander_timer = random.uniform(NPC_WANDER_TIME_MIN, NPC_WANDER_TIME_MAX)
+                self._set_timer('wander_timer', random.uniform(NPC_WANDER_TIME_MIN, NPC_WANDER_TIME_MAX))
 
         # World boundary clamp (use effective world dimensions from main game)
         # self.x = max(self.radius, min(self.x, world_width - self.radius))
@@ -141,22 +163,26 @@ class NPC:
 
 
     def update_dialogue(self, dt):
-        """(Server Only) Manages the progression and timeout of dialogue."""
-        if self.dialogue_active:
+        """(Server Only) Manages the progression and timeout of dialogue (driven by the timer wheel instead when one is attached)."""
+        if self.dialogue_active and self.timers is None:
             self.dialogue_timer -= dt
             if self.dialogue_timer <= 0:
-                # Advance to next line or end dialogue
-                self.current_dialogue_index += 1
-                if self.current_dialogue_index >= len(self.dialogue):
-                    # End of dialogue
-                    self.dialogue_active = False
-                    self.current_dialogue_index = 0
-                    self.state = 'idle' # Revert state after talking
-                    self.talking_to_player_id = None # Clear interacting player
-                    # print(f"NPC {self.id} finished dialogue.") # Debug
-                else:
-                    # Set timer for the next line
-                    self.dialogue_timer = NPC_DIALOGUE_DURATION
+                self._advance_dialogue()
+
+    def _advance_dialogue(self):
+        """(Server Only) Moves to the next line, or ends the dialogue after the last one."""
+        self.current_dialogue_index += 1
+        if self.current_dialogue_index >= len(self.dialogue):
+            # End of dialogue
+            self.dialogue_active = False
+            self.current_dialogue_index = 0
+            self.state = 'idle' # Revert state after talking
+            self.talking_to_player_id = None # Clear interacting player
+            self._set_timer('wander_timer', random.uniform(NPC_WANDER_TIME_MIN, NPC_WANDER_TIME_MAX)) # Idle a while before wandering again
+            # print(f"NPC {self.id} finished dialogue.") # Debug
+        else:
+            # Set timer for the next line
+            self._set_timer('dialogue_timer', NPC_DIALOGUE_DURATION)
 
     # <<< NETWORK: Modified to store player ID >>>
     def interact(self, interacting_player_id):
@@ -166,7 +192,7 @@ class NPC:
             self.state = 'talking'
             self.dialogue_active = True
             self.current_dialogue_index = 0
-            self.dialogue_timer = NPC_DIALOGUE_DURATION
+            self._set_timer('dialogue_timer', NPC_DIALOGUE_DURATION)
             self.talking_to_player_id = interacting_player_id
             # Make NPC face the player? (Needs player position - manager handles this)
         # If already talking, could potentially advance dialogue on interact press?
@@ -245,6 +271,10 @@ class NPCManager:
         # <<< NETWORK: Use different collections for host/client >>>
         if self.is_host:
             self.npcs = [] # Server: Authoritative list of NPC objects
+            self.npc_hash = SpatialHash() # Server: NPC positions for interaction range queries
+            self.collider_cache = None # Server: BroadPhaseCache over the collision index (created on first update)
+            self.broadphase_counters = (0, 0, 0) # Server: last tick's (cache hits, index queries, invalidations)
+            self.timer_wheel = TimerWheel() # Server: NPC wander / dialogue countdowns
             NPC._npc_id_counter = 0 # Reset counter on server start
         else:
             self.client_npcs = {} # Client: Dictionary {id: npc_obj} synchronized from server
@@ -285,7 +315,9 @@ class NPCManager:
 
             npc_dialogue = random.choice(dialogue_options)
             new_npc = NPC(spawn_x, spawn_y, dialogue=npc_dialogue)
+            new_npc.attach_timers(self.timer_wheel)
             self.npcs.append(new_npc)
+            self.npc_hash.insert(new_npc, new_npc.x, new_npc.y)
             spawned_count += 1
             print(f"[SERVER] Spawned NPC {new_npc.id} at ({int(spawn_x)}, {int(spawn_y)})")
 
@@ -303,15 +335,27 @@ class NPCManager:
     def update(self, dt, collision_quadtree=None):
         """(Server Only) Updates behavior and dialogue for all managed NPCs."""
         if not self.is_host: return # Only server updates logic
-
-        for npc in self.npcs:
+        self.timer_wheel.advance(dt) # Fires wander / dialogue countdowns that ran out
+
+        # One broad-phase pass for all NPCs instead of a query per NPC (the dungeon tile grid needs none)
+        tile_grid = collision_quadtree if isinstance(collision_quadtree, TileCollisionGrid) else None
+        wall_segments = self.world_data.get("wall_segments") if tile_grid is None else None
+        candidate_lists = None
+        if collision_quadtree and tile_grid is None:
+            query_ranges = [kinematics.sweep_query_rect(npc.rect, npc.speed, dt) for npc in self.npcs]
+            # Idle NPCs reuse last tick's candidates; only NPCs that left their cached range query the index
+            self.collider_cache = BroadPhaseCache.bind(self.collider_cache, collision_quadtree)
+            candidate_lists = self.collider_cache.query_batch(self.npcs, query_ranges)
+            self.broadphase_counters = self.collider_cache.take_counters()
+
+        for k, npc in enumerate(self.npcs):
             # Get colliders near the NPC for its behavior update
             colliders_nearby = []
-            if collision_quadtree:
-                 query_range = npc.rect.inflate(npc.speed * 2 + 32, npc.speed * 2 + 32)
-                 colliders_nearby = collision_quadtree.query(query_range)
+            if candidate_lists is not None:
+                 colliders_nearby = candidate_lists[k]
 
-            npc.update_behavior(dt, colliders_nearby)
+            npc.update_behavior(dt, colliders_nearby, tile_grid, wall_segments)
+            self.npc_hash.move(npc, npc.x, npc.y)
             npc.update_dialogue(dt)
 
             # Check if this NPC's dialogue should be the active one shown
@@ -329,7 +373,7 @@ class NPCManager:
         closest_npc = None
         min_dist_sq = NPC_INTERACTION_RANGE_SQ # Use squared distance
 
-        for npc in self.npcs:
+        for npc in self.npc_hash.query_radius(player.x, player.y, NPC_INTERACTION_RANGE):
             dist_sq = (npc.x - player.x)**2 + (npc.y - player.y)**2
             if dist_sq < min_dist_sq:
                 min_dist_sq = dist_sq
@@ -6,15 +6,17 @@ import random
 # Networking
 import socket 
 import threading
-import pickle
-import select 
 
 from world_structures import drawing
+from world_structures import kinematics
 
 # Import other game modules
 import world_struct as world_struct_stable
 import combat_mech as combat_mech_stable
 from NETconfig import * 
+import net_codec
+import net_interest
+import net_server
 
 # Import newly created modules
 import asset.assets as assets
@@ -37,15 +39,18 @@ game_state = "overworld" # Start in the overworld
 
 show_map = False
 
+# --- Snapshot Sync ---
+snapshot_history = net_codec.SnapshotHistory() # Server: numbered snapshots, sent as deltas against each client's ack
+snapshot_receiver = net_codec.SnapshotReceiver() # Client: rebuilds snapshots from deltas, holds the ack to send back
+
 # --- Network Helper Functions ---
 def send_data(sock, data):
-    """Sends pickled data prefixed with its size."""
+    """(Client) Sends a message (a dict, or bytes already from net_codec.encode_message()) prefixed with its size."""
     try:
-        pickled_data = pickle.dumps(data)
-        header = f"{len(pickled_data):<{HEADER_SIZE}}".encode('utf-8')
-        sock.sendall(header + pickled_data)
+        payload = data if isinstance(data, bytes) else net_codec.encode_message(data)
+        sock.sendall(net_server.frame(payload)) # Size header + payload, the framing ServerCore parses
         return True
-    except (socket.error, pickle.PicklingError, BrokenPipeError, ConnectionResetError) as e:
+    except (socket.error, net_codec.CodecError, BrokenPipeError, ConnectionResetError) as e:
         print(f"NETWORK SEND ERROR: {e}")
         return False # Indicate failure
 
@@ -81,16 +86,16 @@ def receive_data(sock):
 
             # 3. Check if the full message is received
             if len(full_msg) == expected_msg_len:
-                # 4. Unpickle the complete message
+                # 4. Decode the complete message (schema-checked, never executes anything from the wire)
                 try:
-                    data = pickle.loads(full_msg)
+                    data = net_codec.decode_message(full_msg)
                     return data # Success!
-                except pickle.UnpicklingError as e:
-                    print(f"NETWORK RECV ERROR: Failed to unpickle data: {e}")
+                except net_codec.CodecError as e:
+                    print(f"NETWORK RECV ERROR: Failed to decode data: {e}")
                     # Potentially corrupted data, decide how to handle (e.g., drop, disconnect)
                     return None # Or raise an error
                 except Exception as e:
-                    print(f"NETWORK RECV ERROR: Unexpected error during unpickle: {e}")
+                    print(f"NETWORK RECV ERROR: Unexpected error during decode: {e}")
                     return None
 
             elif len(full_msg) > expected_msg_len:
@@ -112,102 +117,82 @@ def receive_data(sock):
              print(f"NETWORK RECV ERROR: Unexpected error in receive_data: {e}")
              return None
 
-# <<< NETWORK: Server Thread Function >>>
-def client_handler(conn, addr):
-    """Handles communication with a single client in a separate thread."""
-    global player_id_counter, combat_manager, npc_manager # Access shared data
-
+# --- Collision Helper Functions ---
+def query_player_colliders(players, dt):
+    """Runs one batched broad-phase for all players. Returns {player_id: [nearby collider rects]}."""
+    if dungeon_tile_grid is not None or not collision_quadtree or not players: return {} # Tile grid needs no broad-phase
+    player_items = [(p_id, p_obj) for p_id, p_obj in players.items() if p_obj and p_obj.rect]
+    query_ranges = [kinematics.sweep_query_rect(p_obj.rect, p_obj.speed, dt) for _, p_obj in player_items] # Movement is swept, so one step of reach is enough
+    offsets, indices = collision_quadtree.query_batch(query_ranges)
+    return {p_id: collision_quadtree.batch_candidates(offsets, indices, k) for k, (p_id, _) in enumerate(player_items)}
+
+# <<< NETWORK: Server Client Events >>>
+def handle_client_connect(conn):
+    """A client connected: creates its player and sends it the initial state."""
+    global player_id_counter
+    addr = conn.addr
     print(f"[SERVER] Connection established with {addr}")
     # 1. Assign a unique ID to the new player
-    player_id = -1
-    with threading.Lock(): # Protect access to shared counter and dict
-        player_id = player_id_counter
-        player_id_counter += 1
-        # Create a player object on the server for this client
-        # Determine spawn point (needs to be robust)
-        if game_state == "overworld":
-             start_x = world_struct_stable.KINGDOM_CENTER_X + world_struct_stable.KINGDOM_RADIUS + 200 + (player_id * 50) # Simple offset spawn
-             start_y = world_struct_stable.KINGDOM_CENTER_Y
-        else: # Dungeon fallback (improve this)
-             start_x, start_y = 100 + (player_id * 50), 100
-        # Ensure player assets are loaded before creating Player instance
-        if player_animations['idle'] and player_animations['dims']:
-             new_player = player_module.Player(player_id, start_x, start_y, PLAYER_RADIUS, PLAYER_SPEED, PLAYER_COLOR, player_animations)
-             network_players[player_id] = new_player # Add to the server's player list
-             print(f"[SERVER] Assigned Player ID {player_id} to {addr}. Spawning at ({start_x},{start_y})")
-        else:
-             print(f"[SERVER] ERROR: Player assets not loaded when trying to create player {player_id}. Disconnecting.")
-             conn.close()
-             return # Exit thread
-
-
-    # 2. Send the initial state (including the new player's ID and maybe world data)
+    player_id = player_id_counter
+    player_id_counter += 1
+    # Create a player object on the server for this client
+    # Determine spawn point (needs to be robust)
+    if game_state == "overworld":
+         start_x = world_struct_stable.KINGDOM_CENTER_X + world_struct_stable.KINGDOM_RADIUS + 200 + (player_id * 50) # Simple offset spawn
+         start_y = world_struct_stable.KINGDOM_CENTER_Y
+    else: # Dungeon fallback (improve this)
+         start_x, start_y = 100 + (player_id * 50), 100
+    # Ensure player assets are loaded before creating Player instance
+    if not (player_animations['idle'] and player_animations['dims']):
+         print(f"[SERVER] ERROR: Player assets not loaded when trying to create player {player_id}. Disconnecting.")
+         network_server.close(conn)
+         return
+    new_player = player_module.Player(player_id, start_x, start_y, PLAYER_RADIUS, PLAYER_SPEED, PLAYER_COLOR, player_animations)
+    network_players[player_id] = new_player # Add to the server's player list
+    clients[conn] = addr
+    client_player_ids[conn] = player_id # Centre of this client's area of interest
+    print(f"[SERVER] Assigned Player ID {player_id} to {addr}. Spawning at ({start_x},{start_y})")
+
+    # 2. Queue the initial state (including the new player's ID); it goes out ahead of any snapshot
     initial_state = {
         'type': 'initial_state',
         'your_id': player_id,
         'players': {pid: p.get_network_state() for pid, p in network_players.items()},
-        'enemies': combat_manager.get_all_enemies_network_state() if combat_manager else {},
+        # Enemies come with the first snapshot, cut down to this client's area of interest
         # 'npcs': npc_manager.get_all_npcs_network_state() if npc_manager else {} # Add if needed
     }
-    if not send_data(conn, initial_state):
+    if not network_server.send(conn, initial_state):
         print(f"[SERVER] Failed to send initial state to {addr}. Closing connection.")
-        with threading.Lock():
-             if player_id in network_players: del network_players[player_id]
-        conn.close()
-        return
-
-    # 3. Main loop for receiving client input
-    connected = True
-    while connected:
-        try:
-            # Receive input data from the client
-            data = receive_data(conn)
-
-            if data is None: # Handle disconnection or receive error
-                print(f"[SERVER] Receive error or connection closed for {addr} (Player {player_id}).")
-                connected = False
-                break
-
-            if isinstance(data, dict) and 'type' in data:
-                # Process different types of messages
-                if data['type'] == 'player_input':
-                    # Update the server's representation of this player's input intention
-                    player = network_players.get(player_id)
-                    if player:
-                        with threading.Lock(): # Protect player object access if needed
-                            # Apply received input to player's request flags/vectors
-                            player.last_known_move_vector = pygame.math.Vector2(data.get('move_vector', [0,0]))
-                            player.attack_requested = data.get('attack', False)
-                            player.interact_requested = data.get('interact', False)
-                            # Server's main loop will process these requests
-
-                # Handle other message types if needed (e.g., chat)
-
-            # Sending game state is handled by the main server loop broadcast
-
-        except Exception as e:
-            print(f"[SERVER] Error in client handler for {addr} (Player {player_id}): {e}")
-            connected = False # Assume disconnect on error
-
-    # 4. Cleanup on disconnect
-    print(f"[SERVER] Disconnecting {addr} (Player {player_id}).")
-    with threading.Lock(): # Protect shared resources
-        if conn in clients:
-            del clients[conn]
-        if player_id in network_players:
-            del network_players[player_id]
-            # Optional: Broadcast player disconnect message to other clients
-            disconnect_msg = {'type': 'player_disconnect', 'id': player_id}
-            broadcast_data(disconnect_msg, sender_socket=None) # Send to all
-
-    try:
-        conn.close()
-    except socket.error:
-        pass # Ignore errors closing an already potentially closed socket
+        network_server.close(conn)
+
+def handle_client_message(conn, data):
+    """A message from a client: applies its input to its player."""
+    player_id = client_player_ids.get(conn)
+    if data['type'] == 'player_input':
+        # Update the server's representation of this player's input intention
+        player = network_players.get(player_id)
+        if player:
+            # Apply received input to player's request flags/vectors; the simulation processes them this tick
+            player.last_known_move_vector = pygame.math.Vector2(data.get('move_vector', [0,0]))
+            player.attack_requested = data.get('attack', False)
+            player.interact_requested = data.get('interact', False)
+        client_acks[conn] = data.get('ack') # Baseline for this client's next snapshot delta
+
+    # Handle other message types if needed (e.g., chat)
+
+def handle_client_disconnect(conn):
+    """A client's connection closed (by either side, or on an error): removes its player and tells the others."""
+    player_id = client_player_ids.pop(conn, None)
+    print(f"[SERVER] Disconnecting {conn.addr} (Player {player_id}).")
+    clients.pop(conn, None); client_acks.pop(conn, None); client_interests.pop(conn, None)
+    if player_id in network_players:
+        del network_players[player_id]
+        # Broadcast player disconnect message to the remaining clients
+        broadcast_data({'type': 'player_disconnect', 'id': player_id})
 
 # <<< NETWORK: Server Function to Start Listening >>>
 def start_server():
-    global server_socket, is_host, player_id_counter, my_player_id, network_players
+    global network_server, is_host, player_id_counter, my_player_id, network_players
     # is_host and is_dedicated_host are set before calling this now
     player_id_counter = 0 # Reset counter for host start
 
@@ -229,63 +214,38 @@ def start_server():
         else:
             print("[SERVER] FATAL: Player assets not loaded. Cannot create host player.")
             # Clean shutdown needed here
-            if server_socket: server_socket.close()
             pygame.quit(); sys.exit()
     else:
         my_player_id = None # Dedicated host has no player ID
         print("[SERVER] Starting in dedicated mode. No host player created.")
 
 
-    # Setup server socket
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # Allow reusing address quickly
+    # Setup the non-blocking network layer (polled from the game loop, no threads)
+    network_server = net_server.ServerCore()
     try:
-        server_socket.bind(('0.0.0.0', PORT)) # Bind to all available interfaces
-        server_socket.listen(MAX_CLIENTS)
-        server_socket.setblocking(False) # Make accept non-blocking
-        print(f"[SERVER] Listening on port {PORT}...")
-
-        # Start a thread to accept connections (optional, can do in main loop with select)
-        # accept_thread = threading.Thread(target=accept_connections, daemon=True)
-        # accept_thread.start()
-
+        network_server.start()
     except socket.error as e:
         print(f"[SERVER] FATAL: Could not bind to port {PORT}: {e}")
-        server_socket = None # Ensure socket is None if bind fails
+        network_server = None # Ensure server is None if bind fails
         is_host = False # Cannot be host
         # Optionally: Try to run as client? Or just exit?
         pygame.quit()
         sys.exit() # Exit if server cannot start
 
 
-# <<< NETWORK: Server Function to Accept Connections (called in main loop) >>>
-def accept_connections():
-    global server_socket, clients, client_threads
-    if not server_socket: return # Only run if server socket is valid
-
-    # Use select to check for readable sockets (new connections) without blocking
-    readable, _, _ = select.select([server_socket], [], [], 0.01) # Timeout 10ms
-
-    if server_socket in readable:
+# <<< NETWORK: Server Network Pump (called in main loop) >>>
+def process_network_events():
+    """Accepts connections, reads client messages and writes pending output, then hands the events to the simulation."""
+    if not network_server: return # Only run if the server is up
+    network_server.poll()
+    for kind, conn, data in network_server.events():
         try:
-            conn, addr = server_socket.accept()
-            if len(clients) >= MAX_CLIENTS -1: # Check if server is full (-1 because host counts)
-                 print(f"[SERVER] Connection rejected from {addr}: Server full.")
-                 # Send rejection message?
-                 send_data(conn, {'type':'error', 'message':'Server is full.'})
-                 conn.close()
-            else:
-                 print(f"[SERVER] Accepted connection from {addr}")
-                 clients[conn] = addr
-                 # Start a new thread to handle this client
-                 thread = threading.Thread(target=client_handler, args=(conn, addr), daemon=True)
-                 thread.start()
-                 client_threads.append(thread) # Keep track if needed for shutdown
-
-        except socket.error as e:
-            print(f"[SERVER] Error accepting connection: {e}")
+            if kind == 'connect': handle_client_connect(conn)
+            elif kind == 'message': handle_client_message(conn, data)
+            elif kind == 'disconnect': handle_client_disconnect(conn)
         except Exception as e:
-            print(f"[SERVER] Unexpected error during accept: {e}")
+            print(f"[SERVER] Error handling {kind} for {conn.addr}: {e}")
+            network_server.close(conn) # Assume the client is in a bad state
 
 # <<< NETWORK: Client Function to Connect to Server >>>
 def connect_to_server(server_ip):
@@ -316,8 +276,8 @@ def connect_to_server(server_ip):
                     # Handle error gracefully - maybe disconnect?
 
             # Update enemies and NPCs based on initial state (if implemented)
-            server_enemies = initial_data.get('enemies', {})
-            if combat_manager:
+            server_enemies = initial_data.get('enemy_columns')
+            if combat_manager and server_enemies:
                  combat_manager.apply_enemy_network_state(server_enemies)
             # server_npcs = initial_data.get('npcs', {})
             # if npc_manager:
@@ -367,9 +327,12 @@ def client_receive_loop():
             # Process received data (Update game state)
             if isinstance(data, dict):
                 msg_type = data.get('type')
-                if msg_type == 'game_state_update':
+                if msg_type in ('game_state_update', 'game_state_delta'):
+                    snapshot = snapshot_receiver.receive(data) # A full snapshot, or a delta rebuilt on its baseline
+                    if snapshot is None: continue # Delta against a snapshot we no longer have: the server sends a full one next
+                    player_states, enemy_columns, removed_players, _ = snapshot # Enemy removal comes as despawn messages
+
                     # Update players
-                    player_states = data.get('players', {})
                     with threading.Lock(): # Protect network_players access
                          # Add/Update existing players
                         current_ids = set(network_players.keys())
@@ -389,23 +352,28 @@ def client_receive_loop():
                                 else:
                                     print(f"[CLIENT] ERROR: Assets not loaded, cannot create joined player {p_id}")
 
-                        # Remove players who disconnected
-                        disconnected_ids = current_ids - received_ids
+                        # Remove players who disconnected (a delta names them, a full snapshot just leaves them out)
+                        disconnected_ids = current_ids - received_ids if removed_players is None else removed_players
                         for p_id in disconnected_ids:
                             if p_id in network_players:
                                 print(f"[CLIENT] Player {p_id} disconnected.")
                                 del network_players[p_id]
 
-                    # Update enemies
-                    enemy_states = data.get('enemies', {})
+                    # Update enemies (removal comes as despawn messages)
                     if combat_manager:
-                        combat_manager.apply_enemy_network_state(enemy_states)
+                        combat_manager.apply_enemy_network_state(enemy_columns)
 
                      # Update NPCs (if implemented)
                      # npc_states = data.get('npcs', {})
                      # if npc_manager:
                      #     npc_manager.apply_npc_network_state(npc_states)
 
+                elif msg_type == 'despawn': # Enemies that left our area of interest or died
+                    enemy_ids = data.get('enemies', [])
+                    snapshot_receiver.forget(enemy_ids)
+                    if combat_manager:
+                        combat_manager.despawn_enemies(enemy_ids)
+
                 elif msg_type == 'player_disconnect':
                     p_id = data.get('id')
                     if p_id is not None: # Check ID exists before accessing dict
@@ -434,43 +402,48 @@ def client_receive_loop():
 
 
 # <<< NETWORK: Server Broadcast Function >>>
-def broadcast_data(data, sender_socket=None):
-    """Sends data to all connected clients, optionally excluding the sender."""
-    if not is_host: return # Only host broadcasts
-    disconnected_clients = []
-    with threading.Lock(): # Protect access to clients dict
-        # Create a copy of the keys to iterate over, allowing modification of original dict
-        client_sockets = list(clients.keys())
-        for client_conn in client_sockets:
-            if client_conn != sender_socket:
-                if not send_data(client_conn, data):
-                    # Mark client for removal if send fails
-                    disconnected_clients.append(client_conn)
-
-    # Remove disconnected clients outside the iteration lock
-    if disconnected_clients:
-        with threading.Lock():
-            for conn in disconnected_clients:
-                if conn in clients:
-                    print(f"[SERVER] Removing disconnected client {clients[conn]} due to send error.")
-                    addr = clients.pop(conn) # Remove and get address
-                    # Find corresponding player ID to remove from network_players
-                    player_id_to_remove = None
-                    for p_id, p_obj in network_players.items():
-                         # This link is fragile, better to store ID with socket info
-                         # For now, maybe guess based on address? Unreliable.
-                         # Best practice: store player_id in client_handler and add to clients dict
-                         # Or, more simply, iterate players and remove based on some criteria after disconnect
-                         pass # Need a better way to link socket to player_id for removal here
-                    if player_id_to_remove is not None and player_id_to_remove in network_players:
-                         del network_players[player_id_to_remove]
-                         print(f"[SERVER] Removed player object {player_id_to_remove}")
-
-                    # Close the socket connection cleanly
-                    try:
-                         conn.close()
-                    except socket.error:
-                         pass
+def broadcast_data(data, sender_socket=None, payload_for=None):
+    """
+    Queues data for all connected clients, optionally excluding the sender; it goes out on the next flush / poll.
+    payload_for(client_connection), if given, returns each client's own list of payloads instead (despawns and snapshot).
+    """
+    if not is_host or not network_server: return # Only host broadcasts
+    try:
+        payload = data if data is None or isinstance(data, bytes) else net_codec.encode_message(data) # Encoded once, sent to every client
+    except net_codec.CodecError as e:
+        print(f"[SERVER] Could not encode broadcast: {e}")
+        return
+    for client_conn in list(clients.keys()):
+        if client_conn != sender_socket:
+            for client_payload in ((payload,) if payload_for is None else payload_for(client_conn)):
+                network_server.send(client_conn, client_payload) # A dead connection surfaces as a disconnect event
+
+
+# <<< NETWORK: Server Snapshot Broadcast >>>
+def broadcast_snapshot():
+    """
+    Numbers this tick's game state and sends every client the part of it around its player: a delta against the
+    snapshot it last acknowledged (or a full one), after a despawn message for enemies that left its area.
+    """
+    if not is_host: return
+    try:
+        snapshot_history.push({pid: p.get_network_state() for pid, p in network_players.items() if p},
+                              combat_manager.get_enemy_network_columns() if combat_manager else None)
+        # Add NPCs if their state sync is ready
+    except net_codec.CodecError as e:
+        print(f"[SERVER] Could not encode snapshot: {e}")
+        return
+    broadcast_data(None, payload_for=client_snapshot_payloads)
+
+def client_snapshot_payloads(client_conn):
+    """This tick's payloads for one client: a despawn message if enemies left its area of interest, then its snapshot."""
+    interest = client_interests.get(client_conn)
+    if interest is None: interest = client_interests[client_conn] = net_interest.InterestArea()
+    player = network_players.get(client_player_ids.get(client_conn))
+    left = snapshot_history.update_interest(interest, (player.x, player.y) if player else None)
+    payloads = [net_codec.encode_message({'type': 'despawn', 'enemies': left})] if left else []
+    payloads.append(snapshot_history.encode_for(client_acks.get(client_conn), interest))
+    return payloads
 
 
 # --- Initialization ---
@@ -502,6 +475,11 @@ if world_data is None or collision_quadtree is None or player_animations is None
     pygame.quit()
     sys.exit()
 
+# In the dungeon, collision_quadtree is a TileCollisionGrid and movers resolve walls against it directly
+dungeon_tile_grid = collision_quadtree if isinstance(collision_quadtree, world_struct_stable.TileCollisionGrid) else None
+# In the overworld the kingdom wall collides as capsules around its segments
+kingdom_wall_segments = world_data.get("wall_segments") if dungeon_tile_grid is None else None
+
 # --- Player Initialization ---
 start_x, start_y = 100, 100 # Default start
 
@@ -567,8 +545,8 @@ if user_choice == 'host':
             print("[DEDICATED SERVER] Running server loop...")
             # <<< FIX: Initialize last_time before the loop >>>
             last_time = pygame.time.get_ticks()
-            while server_socket: # Loop as long as server is running
-                accept_connections()
+            while network_server: # Loop as long as server is running
+                process_network_events()
 
                 # <<< FIX: Calculate dt at the START of the loop >>>
                 current_time = pygame.time.get_ticks()
@@ -582,18 +560,16 @@ if user_choice == 'host':
                 # --- SERVER SIDE UPDATES (No Graphics/Local Input) ---
                 if is_host: # This check is slightly redundant inside dedicated loop but fine
                     # Update players based on received input
+                    player_colliders = query_player_colliders(network_players, dt) # One broad-phase for all players
                     player_ids = list(network_players.keys()) # Iterate copy
                     for p_id in player_ids:
                         player_obj = network_players.get(p_id)
                         if player_obj:
                             # Get colliders near player
-                            potential_colliders = []
-                            if collision_quadtree and player_obj.rect:
-                                query_range = player_obj.rect.inflate(player_obj.speed * 2 + 32, player_obj.speed * 2 + 32)
-                                potential_colliders = collision_quadtree.query(query_range)
+                            potential_colliders = player_colliders.get(p_id, [])
 
                             # Update player based on last known network input vector
-                            player_obj.update(player_obj.last_known_move_vector, potential_colliders, dt, effective_world_width, effective_world_height)
+                            player_obj.update(player_obj.last_known_move_vector, potential_colliders, dt, effective_world_width, effective_world_height, dungeon_tile_grid, kingdom_wall_segments)
 
                             # Process interaction/attack requests received from clients
                             if player_obj.attack_requested:
@@ -610,15 +586,8 @@ if user_choice == 'host':
                     if npc_manager: npc_manager.update(dt, collision_quadtree)
 
                     # --- Prepare and Broadcast Game State ---
-                    current_game_state_payload = {
-                        'type': 'game_state_update',
-                        # Make sure to handle potential None player objects if disconnect happens mid-dict creation
-                        'players': {pid: p.get_network_state() for pid, p in network_players.items() if p},
-                        'enemies': combat_manager.get_all_enemies_network_state() if combat_manager else {},
-                        # Add NPCs if their state sync is ready
-                        # 'npcs': npc_manager.get_all_npcs_network_state() if npc_manager else {}
-                    }
-                    broadcast_data(current_game_state_payload)
+                    broadcast_snapshot()
+                    network_server.flush() # Send this tick's snapshots now rather than at the next poll
 
                 # <<< FIX: Moved dt calculation to the top >>>
                 clock.tick(FPS) # Maintain server tick rate
@@ -671,9 +640,9 @@ while running:
     dt = min((current_time - last_time) / 1000.0, 0.1)
     last_time = current_time # Move last_time update here
 
-    # --- Server: Accept new connections ---
+    # --- Server: Accept connections, read client input ---
     if is_host:
-        accept_connections()
+        process_network_events()
 
     # --- Get Local Player Reference (for drawing, camera, UI, input) ---
     local_player = None
@@ -722,6 +691,7 @@ while running:
             'move_vector': [intended_move_vector.x, intended_move_vector.y],
             'attack': local_player.attack_requested,
             'interact': local_player.interact_requested,
+            'ack': snapshot_receiver.ack, # Latest snapshot applied: the server's next delta builds on it
         }
         # Send reliably or only on change? Send reliably might be simpler for now.
         if not send_data(client_socket, current_input_state):
@@ -733,16 +703,16 @@ while running:
     
     # --- SERVER SIDE UPDATES ---
     if is_host:
+        # One broad-phase pass for every player (host and clients)
+        player_colliders = query_player_colliders(network_players, dt)
+
         # --- Update Host Player (if not dedicated) ---
         if not is_dedicated_host and local_player:
             # Get colliders near host player
-            potential_colliders = []
-            if collision_quadtree:
-                query_range = local_player.rect.inflate(local_player.speed * 2 + 32, local_player.speed * 2 + 32)
-                potential_colliders = collision_quadtree.query(query_range)
+            potential_colliders = player_colliders.get(my_player_id, [])
 
             # Update host player based on LOCAL input vector
-            local_player.update(intended_move_vector, potential_colliders, dt, effective_world_width, effective_world_height)
+            local_player.update(intended_move_vector, potential_colliders, dt, effective_world_width, effective_world_height, dungeon_tile_grid, kingdom_wall_segments)
 
             # Process host's own attack/interact requests
             if local_player.attack_requested:
@@ -765,13 +735,10 @@ while running:
             player_obj = network_players[p_id]
             if player_obj:
                  # Get colliders near this client player
-                 potential_colliders = []
-                 if collision_quadtree:
-                      query_range = player_obj.rect.inflate(player_obj.speed * 2 + 32, player_obj.speed * 2 + 32)
-                      potential_colliders = collision_quadtree.query(query_range)
+                 potential_colliders = player_colliders.get(p_id, [])
 
                  # Update client player based on their LAST RECEIVED move vector
-                 player_obj.update(player_obj.last_known_move_vector, potential_colliders, dt, effective_world_width, effective_world_height)
+                 player_obj.update(player_obj.last_known_move_vector, potential_colliders, dt, effective_world_width, effective_world_height, dungeon_tile_grid, kingdom_wall_segments)
 
                  # Process client's attack/interact requests
                  if player_obj.attack_requested:
@@ -792,15 +759,8 @@ while running:
 
 
         # --- Prepare and Broadcast Game State ---
-        current_game_state_payload = {
-            'type': 'game_state_update',
-            # Make sure to handle potential None player objects if disconnect happens mid-dict creation
-            'players': {pid: p.get_network_state() for pid, p in network_players.items() if p},
-            'enemies': combat_manager.get_all_enemies_network_state() if combat_manager else {},
-            # Add NPCs if their state sync is ready
-            # 'npcs': npc_manager.get_all_npcs_network_state() if npc_manager else {}
-        }
-        broadcast_data(current_game_state_payload)
+        broadcast_snapshot()
+        network_server.flush() # Send this tick's snapshots now rather than at the next poll
 
 
     # --- Camera Update (Based on LOCAL player - Client or Host-Play) ---
@@ -888,11 +848,9 @@ print("Game loop ended. Cleaning up...")
 running = False # Signal threads to stop
 
 # Close network connections
-if is_host and server_socket:
+if is_host and network_server:
     print("[SERVER] Closing server socket.")
-    server_socket.close()
-    # Wait briefly for client threads to potentially finish?
-    # for t in client_threads: t.join(timeout=0.1) # Optional: wait briefly
+    network_server.shutdown()
 if not is_host and client_socket:
     print("[CLIENT] Closing client socket.")
     client_socket.close()
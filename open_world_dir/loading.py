@@ -166,14 +166,15 @@ def run_loading_screen(surface, game_state, mixer_initialized):
     current_step += 1; draw_loading_progress(surface, current_step, TOTAL_LOADING_STEPS, "Audio Loaded...")
     pygame.time.wait(50)
 
-    # --- Step 14: Determine World Size & Populate Quadtree ---
-    print("Loading Step: Quadtree Population...")
+    # --- Step 14: Determine World Size & Build Collision Index ---
+    print("Loading Step: Collision Index Population...")
     if game_state == "dungeon":
         dungeon_world_width = world_struct_stable.DUNGEON_GRID_WIDTH * world_struct_stable.DUNGEON_TILE_SIZE
         dungeon_world_height = world_struct_stable.DUNGEON_GRID_HEIGHT * world_struct_stable.DUNGEON_TILE_SIZE
-        dungeon_boundary_rect = pygame.Rect(0, 0, dungeon_world_width, dungeon_world_height)
-        collision_quadtree.boundary = dungeon_boundary_rect
-        world_struct_stable.populate_quadtree_with_dungeon(collision_quadtree, world_data["dungeon_grid"])
+        # Dungeon walls are resolved straight from the tile grid, no per-wall Rects
+        collision_quadtree = world_struct_stable.build_dungeon_tile_grid(world_data["dungeon_grid"], world_data.get("dungeon_rooms_grid"))
+        # Room / portal graph for long-range enemy navigation (replaced whenever the dungeon is regenerated)
+        world_data["dungeon_room_graph"] = world_struct_stable.build_dungeon_room_graph(collision_quadtree, world_data.get("dungeon_rooms_grid"))
         effective_world_width = dungeon_world_width
         effective_world_height = dungeon_world_height
     elif game_state == "overworld":
@@ -10,13 +10,16 @@ import pickle
 from world_structures.world_constants import * # Import all constants
 
 # --- Import from custom modules ---
-from world_structures.quadtree import QuadtreeNode
+from world_structures.collision_index import StaticCollisionIndex
+from world_structures.tile_collider import TileCollisionGrid
+from world_structures.room_graph import RoomGraph
+from world_structures.segment_colliders import SegmentColliderSet
 from world_structures.utils import is_point_in_polygon # Import specific utils as needed
 from asset.assets import load_all_sprites
 from world_structures.generation import (
     generate_grass_details, filter_grass_details,
     generate_trees_poisson_disk, is_too_close_to_wall,
-    generate_wall_rects, generate_wall_tile_data_rotated
+    generate_wall_rects, generate_wall_segments, generate_wall_tile_data_rotated
 )
 
 # Drawing functions are typically called from the main game loop, but could be imported here if needed
@@ -145,6 +148,7 @@ def generate_world_elements(loaded_sprites):
         kingdom_wall_rects = generate_wall_rects( # Call from generation.py
             kingdom_wall_vertices, KINGDOM_WALL_THICKNESS, gate_segment_index, gate_p1_world, gate_p2_world
         )
+        kingdom_wall_segments = generate_wall_segments(kingdom_wall_vertices, gate_segment_index, gate_p1_world, gate_p2_world)
     else:
         print("Generating solid wall collision rects (no gate opening).")
         if gate_segment_index != -1: # If gate was intended but failed
@@ -152,6 +156,7 @@ def generate_world_elements(loaded_sprites):
         kingdom_wall_rects = generate_wall_rects( # Call from generation.py
             kingdom_wall_vertices, KINGDOM_WALL_THICKNESS, -1, None, None
         )
+        kingdom_wall_segments = generate_wall_segments(kingdom_wall_vertices, -1, None, None)
 
     # --- Single Gatehouse at Midpoint ---
     gatehouse_sprite_info = loaded_sprites.get('gatehouse')
@@ -252,14 +257,18 @@ def generate_world_elements(loaded_sprites):
 
     # --- Final Collation ---
     print("Static world element generation complete.")
-    all_colliders = tree_colliders + kingdom_wall_rects + building_colliders + tower_colliders + gatehouse_colliders
+    # The kingdom wall collides as capsules around its segments, not as the stamped wall rects
+    all_colliders = tree_colliders + building_colliders + tower_colliders + gatehouse_colliders
+    wall_segments = SegmentColliderSet(kingdom_wall_segments, KINGDOM_WALL_THICKNESS / 2)
+    print(f"Kingdom wall collision: {len(wall_segments)} segments (instead of {len(kingdom_wall_rects)} wall rects).")
 
     return {
         "forest_poly_points": forest_poly_points, "forest_trees": forest_trees,
         "kingdom_poly_points": kingdom_poly_points, "kingdom_wall_vertices": kingdom_wall_vertices,
         "kingdom_structures": kingdom_structures, # Buildings
         "gate_info": {"segment_index": gate_segment_index, "p1": gate_p1_world, "p2": gate_p2_world, "mid": gate_midpoint_world},
-        "colliders": all_colliders, # Combined collision shapes
+        "colliders": all_colliders, # Combined collision shapes (AABBs)
+        "wall_segments": wall_segments, # Kingdom wall capsules (SegmentColliderSet)
         "wall_tiles": wall_tiles, # Visual wall tile data (pos, angle, sprite_key)
         "wall_towers": wall_towers,
         "gatehouses": gatehouses,
@@ -267,7 +276,7 @@ def generate_world_elements(loaded_sprites):
         # Keep separate lists for potential specific uses
         "tree_colliders_only": tree_colliders,
         "building_colliders_only": building_colliders,
-        "wall_colliders_only": kingdom_wall_rects, # Collision rects
+        "wall_colliders_only": kingdom_wall_rects, # Stamped wall rects (collision uses wall_segments)
         "tower_colliders_only": tower_colliders,
         "gatehouse_colliders_only": gatehouse_colliders,
         "loaded_sprites": loaded_sprites # Pass loaded sprites through
@@ -314,44 +323,48 @@ def load_or_generate_world():
     world_elements["dungeon_rooms_grid"] = dungeon_room_rects_grid
     print(f"Dungeon generated with {len(dungeon_room_rects_grid)} rooms.")
 
-    # --- Prepare Quadtree ---
-    print("Preparing Quadtree for population...");
+    # --- Prepare Collision Index ---
+    print("Preparing Collision Index for population...");
     world_boundary_rect = pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT)
-    collision_quadtree = QuadtreeNode(world_boundary_rect, QT_NODE_CAPACITY)
+    collision_quadtree = StaticCollisionIndex(world_boundary_rect, COLLISION_CELL_SIZE)
     # Population happens in main game loop based on game state
 
     return world_elements, collision_quadtree
 
 
-# --- Quadtree Population Helpers ---
+# --- Collision Index Population Helpers ---
 # These remain here as they are closely tied to the world structure setup
-def populate_quadtree_with_dungeon(quadtree, dungeon_grid):
-    """Populates the quadtree with wall tiles from the dungeon grid."""
-    quadtree.items = []; quadtree.divided = False; quadtree.north_west = quadtree.north_east = quadtree.south_west = quadtree.south_east = None # Reset tree
-    insert_count = 0; fail_count = 0
-    print("Populating Quadtree with Dungeon Walls...")
+def build_dungeon_tile_grid(dungeon_grid, dungeon_rooms_grid=None):
+    """
+    Builds the tile-grid collider used for dungeon movement (one byte per tile instead of a Rect per wall).
+    Room centres (rooms in grid coordinates) are checked to be open, which catches a wall / floor mix-up.
+    """
+    tile_grid = TileCollisionGrid(DUNGEON_TILE_SIZE)
+    print("Building Dungeon Tile Collision Grid...")
     if not dungeon_grid:
-        print("Warning: No dungeon grid provided for quadtree population.")
-        return
-    for y, row in enumerate(dungeon_grid):
-        for x, tile_type in enumerate(row):
-            if tile_type == TILE_WALL: # Use constant
-                wall_world_x = x * DUNGEON_TILE_SIZE; wall_world_y = y * DUNGEON_TILE_SIZE
-                wall_rect = pygame.Rect(wall_world_x, wall_world_y, DUNGEON_TILE_SIZE, DUNGEON_TILE_SIZE)
-                if quadtree.boundary.colliderect(wall_rect):
-                    if wall_rect.width > 0 and wall_rect.height > 0:
-                         if quadtree.insert(wall_rect): insert_count += 1
-                         else: print(f"ERROR: Failed Quadtree insert for dungeon wall: {wall_rect}"); fail_count += 1
-                    else: fail_count += 1
-    print(f"Dungeon Quadtree population complete. Inserted: {insert_count}, Failed/Skipped: {fail_count}")
-
-def populate_quadtree_with_overworld(quadtree, overworld_colliders):
-    """Populates the quadtree with colliders from the overworld elements."""
-    quadtree.items = []; quadtree.divided = False; quadtree.north_west = quadtree.north_east = quadtree.south_west = quadtree.south_east = None # Reset tree
-    insert_count = 0; fail_count = 0;
-    print("Populating Quadtree with Overworld Colliders...")
+        print("Warning: No dungeon grid provided for tile collision grid.")
+        return tile_grid
+    solid_count = tile_grid.build(dungeon_grid, TILE_WALL)
+    solid_centres = [room for room in dungeon_rooms_grid or [] if 0 <= room.centerx < tile_grid.width and 0 <= room.centery < tile_grid.height
+                     and tile_grid.solid[room.centery * tile_grid.width + room.centerx]]
+    if solid_centres: print(f"ERROR: {len(solid_centres)} dungeon room centres are solid in the tile grid. Check TILE_WALL / TILE_FLOOR against dungeon_gen.")
+    print(f"Dungeon Tile Collision Grid complete. {tile_grid.width}x{tile_grid.height} tiles, {solid_count} solid.")
+    return tile_grid
+
+def build_dungeon_room_graph(tile_grid, dungeon_rooms_grid):
+    """Builds the room / portal navigation graph for the dungeon (rooms in grid coordinates, as the generator returns them)."""
+    print("Building Dungeon Room Graph...")
+    room_graph = RoomGraph(tile_grid, dungeon_rooms_grid or [])
+    print(f"Dungeon Room Graph complete. {len(room_graph)} regions ({room_graph.room_count} rooms), {len(room_graph.portals)} portals.")
+    return room_graph
+
+def populate_quadtree_with_overworld(collision_index, overworld_colliders):
+    """Bulk-builds the collision index from the overworld colliders."""
+    clamped_rects = []; fail_count = 0
+    print("Populating Collision Index with Overworld Colliders...")
     if not overworld_colliders:
-        print("Warning: No colliders provided for overworld quadtree population.")
+        print("Warning: No colliders provided for overworld collision index population.")
+        collision_index.build([])
         return
     for original_collider_rect in overworld_colliders:
         if not isinstance(original_collider_rect, pygame.Rect):
@@ -359,12 +372,11 @@ def populate_quadtree_with_overworld(quadtree, overworld_colliders):
              fail_count += 1; continue
         if original_collider_rect.width <= 0 or original_collider_rect.height <= 0:
             fail_count += 1; continue
-        # Clamp collider rects to the quadtree boundary before insertion
-        clamped_rect = original_collider_rect.clamp(quadtree.boundary)
-        if clamped_rect.width > 0 and clamped_rect.height > 0:
-            if quadtree.insert(clamped_rect): insert_count += 1
-            else: print(f"ERROR: Failed Quadtree insert even after clamping: {clamped_rect} (Original: {original_collider_rect})"); fail_count += 1
+        # Clamp collider rects to the index boundary before insertion
+        clamped_rect = original_collider_rect.clamp(collision_index.boundary)
+        if clamped_rect.width > 0 and clamped_rect.height > 0: clamped_rects.append(clamped_rect)
         else: fail_count += 1 # Clamped rect became invalid
-    print(f"Overworld Quadtree population complete. Inserted: {insert_count}, Failed/Skipped: {fail_count}")
+    insert_count = collision_index.build(clamped_rects)
+    print(f"Overworld Collision Index population complete. Inserted: {insert_count}, Failed/Skipped: {fail_count}")
 
 # --- END OF FILE world_struct_stable.py ---
\ No newline at end of file
@@ -0,0 +1,74 @@
+# --- START OF FILE broadphase_cache.py ---
+from .world_constants import BROADPHASE_CACHE_SLACK
+
+# --- Per-Entity Broad-Phase Cache ---
+class BroadPhaseCache:
+    """
+    Reuses an entity's last collider candidates while it stays near where they were fetched.
+
+    On a miss the query rect is grown by slack on every side before hitting the index, and
+    the result is kept with that grown rect. Later ticks whose query rect still fits inside
+    it reuse the list (it is a superset of what a fresh query would return). Idle or slowly
+    wandering entities therefore skip the index walk for many ticks. The cache listens to
+    the index's change events and drops only entries whose area a change touched.
+    hits / misses / invalidations count how often the index walk was saved.
+    """
+    def __init__(self, index, slack=BROADPHASE_CACHE_SLACK):
+        self.index = index
+        self.slack = slack
+        self.entries = {} # entity -> (cached_rect, candidate_rects)
+        self.hits = 0; self.misses = 0; self.invalidations = 0
+        index.add_change_listener(self._on_change)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def bind(cache, index):
+        """Returns cache if it already serves index, otherwise closes it and returns a new cache for index."""
+        if cache is not None and cache.index is index: return cache
+        if cache is not None: cache.close()
+        return BroadPhaseCache(index)
+
+    def close(self):
+        """Detaches from the index (call before dropping the cache)."""
+        self.index.remove_change_listener(self._on_change)
+        self.entries.clear()
+
+    def forget(self, key):
+        """Drops a despawned entity's entry."""
+        self.entries.pop(key, None)
+
+    def take_counters(self):
+        """Returns (hits, misses, invalidations) since the last call and resets them."""
+        counters = (self.hits, self.misses, self.invalidations)
+        self.hits = self.misses = self.invalidations = 0
+        return counters
+
+    def _on_change(self, region):
+        stale = [key for key, (cached_rect, _) in self.entries.items() if cached_rect.colliderect(region)]
+        for key in stale: del self.entries[key]
+        self.invalidations += len(stale)
+
+    def query_batch(self, keys, query_rects):
+        """
+        Returns one candidate list per (key, query_rect) pair, in order. Entries that still cover
+        their query rect are reused; all misses are fetched together with one index.query_batch().
+        """
+        entries = self.entries; slack2 = 2 * self.slack
+        results = [None] * len(query_rects); miss_slots = []; miss_rects = []
+        for k, query_rect in enumerate(query_rects):
+            entry = entries.get(keys[k])
+            if entry is not None and entry[0].contains(query_rect):
+                results[k] = entry[1]
+            else:
+                miss_slots.append(k); miss_rects.append(query_rect.inflate(slack2, slack2))
+        self.hits += len(query_rects) - len(miss_slots); self.misses += len(miss_slots)
+        if miss_slots:
+            offsets, indices = self.index.query_batch(miss_rects)
+            for j, k in enumerate(miss_slots):
+                candidates = self.index.batch_candidates(offsets, indices, j)
+                results[k] = candidates; entries[keys[k]] = (miss_rects[j], candidates)
+        return results
+
+# --- END OF FILE broadphase_cache.py ---
@@ -0,0 +1,261 @@
+# --- START OF FILE collision_index.py ---
+import pygame
+from array import array
+from .world_constants import COLLISION_CELL_SIZE, COLLISION_BATCH_VECTOR_MIN
+
+# NumPy is optional: when present, large batch queries run vectorized over the same int32 columns
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Bounds written into a removed static slot: the overlap test can never pass for them
+_DEAD_LOW = 2 ** 31 - 1; _DEAD_HIGH = -2 ** 31
+
+# --- Static Collision Index ---
+class StaticCollisionIndex:
+    """
+    Flat uniform-grid index for world colliders, built once in bulk, with cheap edits on top.
+
+    Collider bounds are stored in int32 columns sorted by grid cell, and cell_start is a
+    prefix-sum over cells (CSR layout: rows cell_start[c]..cell_start[c+1] belong to cell c).
+    Each collider is filed once, under the cell holding its top-left corner, and queries
+    widen their cell span by the largest collider size, so no de-duplication is needed.
+    query(rect) keeps the QuadtreeNode contract: it returns the list of collider Rects
+    that overlap the given rect.
+
+    insert/remove/update change single colliders without a rebuild: removed bulk colliders
+    get bounds that never overlap anything, and inserted ones live in a small per-cell
+    overlay. Both are O(1) (remove by Rect looks only at that Rect's home cell). Every
+    change is reported to listeners added with add_change_listener() as the world-space
+    region that changed, so caches built from static geometry can drop just that area.
+    """
+    def __init__(self, boundary, cell_size=COLLISION_CELL_SIZE):
+        self.boundary = pygame.Rect(boundary) # Callers may replace this before build()
+        self.cell_size = max(1, int(cell_size))
+        self.rects = [] # pygame.Rect objects by collider id (None once removed), returned by query()
+        self.left = array('i'); self.top = array('i'); self.right = array('i'); self.bottom = array('i')
+        self.origin_x = 0; self.origin_y = 0; self.cols = 0; self.rows = 0
+        self.max_width = 0; self.max_height = 0 # Largest collider extent, used to widen queries
+        self.cell_start = array('i', [0])
+        self.static_count = 0 # Ids below this are bulk-built slots in the CSR columns
+        self.dynamic_cells = {} # Home cell -> list of inserted collider ids
+        self.live_count = 0
+        self.change_listeners = []
+
+    def __len__(self):
+        return self.live_count
+
+    def _cell_of(self, x, y):
+        """Returns the flat cell index holding world point (x, y), clamped to the grid."""
+        col = min(self.cols - 1, max(0, (x - self.origin_x) // self.cell_size))
+        row = min(self.rows - 1, max(0, (y - self.origin_y) // self.cell_size))
+        return row * self.cols + col
+
+    def build(self, rects):
+        """Replaces the index contents with the given Rects in one pass (count, prefix-sum, fill)."""
+        rects = [r for r in rects if r.width > 0 and r.height > 0]
+        self.origin_x, self.origin_y = self.boundary.left, self.boundary.top
+        self.cols = max(1, -(-self.boundary.width // self.cell_size)) # Ceil division
+        self.rows = max(1, -(-self.boundary.height // self.cell_size))
+        num_cells = self.cols * self.rows
+
+        # Pass 1: home cell per collider and per-cell counts
+        homes = [self._cell_of(r.left, r.top) for r in rects]
+        counts = array('i', bytes(4 * (num_cells + 1)))
+        for cell in homes: counts[cell + 1] += 1
+        for cell in range(num_cells): counts[cell + 1] += counts[cell]
+
+        # Pass 2: stable scatter so colliders are laid out cell by cell (better locality)
+        order = sorted(range(len(rects)), key=homes.__getitem__)
+        self.rects = [rects[i] for i in order]
+        self.left = array('i', (r.left for r in self.rects)); self.top = array('i', (r.top for r in self.rects))
+        self.right = array('i', (r.right for r in self.rects)); self.bottom = array('i', (r.bottom for r in self.rects))
+        self.max_width = max((r.width for r in self.rects), default=0)
+        self.max_height = max((r.height for r in self.rects), default=0)
+        self.cell_start = counts
+        self.static_count = self.live_count = len(self.rects)
+        self.dynamic_cells = {}
+        self._notify(self.boundary.copy()) # Everything may have changed
+        return len(self.rects)
+
+    # --- Dynamic Edits ---
+    def add_change_listener(self, callback):
+        """Registers callback(region_rect), called after every insert/remove/update with the world area that changed."""
+        self.change_listeners.append(callback)
+
+    def remove_change_listener(self, callback):
+        if callback in self.change_listeners: self.change_listeners.remove(callback)
+
+    def _notify(self, region):
+        for callback in self.change_listeners: callback(region)
+
+    def insert(self, rect, notify=True):
+        """Adds one collider without rebuilding. Returns its collider id (or None for an empty rect)."""
+        rect = pygame.Rect(rect)
+        if rect.width <= 0 or rect.height <= 0: return None
+        if not self.cols: self.build([]) # Lay out the grid if nothing was bulk-built yet
+        collider_id = len(self.rects); self.rects.append(rect)
+        self.dynamic_cells.setdefault(self._cell_of(rect.left, rect.top), []).append(collider_id)
+        if rect.width > self.max_width: self.max_width = rect.width
+        if rect.height > self.max_height: self.max_height = rect.height
+        self.live_count += 1
+        if notify: self._notify(rect.copy())
+        return collider_id
+
+    def find(self, rect):
+        """Returns the id of a live collider with exactly rect's bounds, or None. Only rect's home cell is searched."""
+        rect = pygame.Rect(rect)
+        if not self.rects or self.cols == 0: return None
+        cell = self._cell_of(rect.left, rect.top)
+        for i in range(self.cell_start[cell], self.cell_start[cell + 1]):
+            if self.rects[i] is not None and self.rects[i] == rect: return i
+        for collider_id in self.dynamic_cells.get(cell, ()):
+            if self.rects[collider_id] == rect: return collider_id
+        return None
+
+    def remove(self, item, notify=True):
+        """Removes a collider, given its id or a Rect with the same bounds. Returns the removed Rect, or None."""
+        collider_id = self.find(item) if isinstance(item, (pygame.Rect, tuple, list)) else int(item)
+        if collider_id is None or not 0 <= collider_id < len(self.rects): return None
+        rect = self.rects[collider_id]
+        if rect is None: return None
+        self.rects[collider_id] = None
+        if collider_id < self.static_count: # Bulk slot: make it unmatchable in place
+            self.left[collider_id] = self.top[collider_id] = _DEAD_LOW
+            self.right[collider_id] = self.bottom[collider_id] = _DEAD_HIGH
+        else:
+            self.dynamic_cells[self._cell_of(rect.left, rect.top)].remove(collider_id)
+        self.live_count -= 1
+        if notify: self._notify(rect.copy())
+        return rect
+
+    def update(self, item, new_rect):
+        """Replaces a collider (id or Rect) with new_rect. Returns the new collider id; listeners get one merged region."""
+        old_rect = self.remove(item, notify=False)
+        collider_id = self.insert(new_rect, notify=False)
+        region = pygame.Rect(new_rect) if old_rect is None else old_rect.union(pygame.Rect(new_rect))
+        self._notify(region)
+        return collider_id
+
+    def _dynamic_hits(self, qx0, qy0, qx1, qy1, c0, c1, r0, r1, out):
+        """Appends ids of inserted colliders overlapping the query (cell span already widened and clamped)."""
+        dynamic_cells = self.dynamic_cells; rects = self.rects; cols = self.cols
+        for row in range(r0, r1 + 1):
+            for cell in range(row * cols + c0, row * cols + c1 + 1):
+                for collider_id in dynamic_cells.get(cell, ()):
+                    r = rects[collider_id]
+                    if r.left < qx1 and qx0 < r.right and r.top < qy1 and qy0 < r.bottom: out(collider_id)
+
+    def query(self, range_rect):
+        found_items = []
+        if not self.live_count: return found_items
+        if not isinstance(range_rect, pygame.Rect): range_rect = pygame.Rect(range_rect)
+        qx0, qy0, qw, qh = range_rect
+        if qw <= 0 or qh <= 0: return found_items
+        qx1 = qx0 + qw; qy1 = qy0 + qh
+        # Home cells that can hold an overlapping collider, widened by the largest collider size.
+        # Clamped like _cell_of so colliders filed in edge cells (from outside the boundary) stay reachable.
+        size = self.cell_size; last_col = self.cols - 1; last_row = self.rows - 1; ox = self.origin_x; oy = self.origin_y
+        c0 = (qx0 - self.max_width - ox) // size; c0 = 0 if c0 < 0 else (last_col if c0 > last_col else c0)
+        c1 = (qx1 - 1 - ox) // size; c1 = 0 if c1 < 0 else (last_col if c1 > last_col else c1)
+        r0 = (qy0 - self.max_height - oy) // size; r0 = 0 if r0 < 0 else (last_row if r0 > last_row else r0)
+        r1 = (qy1 - 1 - oy) // size; r1 = 0 if r1 < 0 else (last_row if r1 > last_row else r1)
+
+        cell_start = self.cell_start; cols = self.cols
+        left = self.left; top = self.top; right = self.right; bottom = self.bottom; rects = self.rects
+        for base in range(r0 * cols, r1 * cols + 1, cols):
+            # Home cells of one row are contiguous in the packed columns, so scan the whole run at once
+            for i in range(cell_start[base + c0], cell_start[base + c1 + 1]):
+                # Same strict-overlap rule as pygame.Rect.colliderect
+                if left[i] < qx1 and qx0 < right[i] and top[i] < qy1 and qy0 < bottom[i]:
+                    found_items.append(rects[i])
+        if self.dynamic_cells:
+            self._dynamic_hits(qx0, qy0, qx1, qy1, c0, c1, r0, r1, lambda collider_id: found_items.append(rects[collider_id]))
+        return found_items
+
+    def query_batch(self, query_rects):
+        """
+        Broad-phase for a whole population in one pass.
+
+        query_rects is an (N, 4) sequence of (x, y, w, h) rows: a list of Rects or tuples,
+        or a NumPy int array. Returns a CSR pair (offsets, indices): indices[offsets[k]:offsets[k + 1]]
+        are positions in self.rects overlapping row k. Both are int sequences (array('i'), or
+        NumPy arrays when the vectorized path ran); use batch_candidates() to get the Rects.
+        """
+        if np is not None and len(query_rects) >= COLLISION_BATCH_VECTOR_MIN and self.live_count:
+            return self._query_batch_vectorized(query_rects)
+        if hasattr(query_rects, 'tolist'): query_rects = [tuple(map(int, row)) for row in query_rects.tolist()] # NumPy rows -> Python ints
+        offsets = array('i', [0]); indices = array('i')
+        if not self.live_count:
+            offsets.extend([0] * len(query_rects))
+            return offsets, indices
+        size = self.cell_size; last_col = self.cols - 1; last_row = self.rows - 1; ox = self.origin_x; oy = self.origin_y
+        max_w = self.max_width; max_h = self.max_height
+        cell_start = self.cell_start; cols = self.cols
+        left = self.left; top = self.top; right = self.right; bottom = self.bottom
+        append = indices.append; close_row = offsets.append; dynamic_cells = self.dynamic_cells
+        for qx0, qy0, qw, qh in query_rects:
+            if qw > 0 and qh > 0:
+                qx1 = qx0 + qw; qy1 = qy0 + qh
+                c0 = (qx0 - max_w - ox) // size; c0 = 0 if c0 < 0 else (last_col if c0 > last_col else c0)
+                c1 = (qx1 - 1 - ox) // size; c1 = 0 if c1 < 0 else (last_col if c1 > last_col else c1)
+                r0 = (qy0 - max_h - oy) // size; r0 = 0 if r0 < 0 else (last_row if r0 > last_row else r0)
+                r1 = (qy1 - 1 - oy) // size; r1 = 0 if r1 < 0 else (last_row if r1 > last_row else r1)
+                for base in range(r0 * cols, r1 * cols + 1, cols):
+                    for i in range(cell_start[base + c0], cell_start[base + c1 + 1]):
+                        if left[i] < qx1 and qx0 < right[i] and top[i] < qy1 and qy0 < bottom[i]: append(i)
+                if dynamic_cells: self._dynamic_hits(qx0, qy0, qx1, qy1, c0, c1, r0, r1, append)
+            close_row(len(indices))
+        return offsets, indices
+
+    def _query_batch_vectorized(self, query_rects):
+        """NumPy version of query_batch(): expands (query, cell row) runs with repeat/cumsum instead of Python loops."""
+        if not hasattr(query_rects, 'dtype'): query_rects = [tuple(r) for r in query_rects]
+        q = np.asarray(query_rects, dtype=np.int64).reshape(-1, 4)
+        num_queries = len(q)
+        qx0 = q[:, 0]; qy0 = q[:, 1]; qx1 = qx0 + q[:, 2]; qy1 = qy0 + q[:, 3]
+        valid = (q[:, 2] > 0) & (q[:, 3] > 0)
+        size = self.cell_size; last_col = self.cols - 1; last_row = self.rows - 1
+        c0 = np.clip((qx0 - self.max_width - self.origin_x) // size, 0, last_col)
+        c1 = np.clip((qx1 - 1 - self.origin_x) // size, 0, last_col)
+        r0 = np.clip((qy0 - self.max_height - self.origin_y) // size, 0, last_row)
+        r1 = np.clip((qy1 - 1 - self.origin_y) // size, 0, last_row)
+
+        # One entry per (query, cell row): the packed run of colliders homed in that row's cell span
+        rows_per_query = np.where(valid, r1 - r0 + 1, 0)
+        run_query = np.repeat(np.arange(num_queries), rows_per_query)
+        run_first = np.cumsum(rows_per_query) - rows_per_query
+        run_row = r0[run_query] + (np.arange(len(run_query)) - run_first[run_query])
+        cell_start = np.frombuffer(self.cell_start, dtype=np.int32)
+        base = run_row * self.cols
+        run_begin = cell_start[base + c0[run_query]]; run_len = cell_start[base + c1[run_query] + 1] - run_begin
+
+        # Expand runs into candidate (query, collider) pairs and keep the overlapping ones
+        cand_query = np.repeat(run_query, run_len)
+        cand_first = np.cumsum(run_len) - run_len
+        cand_item = np.repeat(run_begin - cand_first, run_len) + np.arange(len(cand_query))
+        left = np.frombuffer(self.left, dtype=np.int32); top = np.frombuffer(self.top, dtype=np.int32)
+        right = np.frombuffer(self.right, dtype=np.int32); bottom = np.frombuffer(self.bottom, dtype=np.int32)
+        hit = ((left[cand_item] < qx1[cand_query]) & (qx0[cand_query] < right[cand_item]) &
+               (top[cand_item] < qy1[cand_query]) & (qy0[cand_query] < bottom[cand_item]))
+        hit_query = cand_query[hit]; indices = cand_item[hit]
+        if self.dynamic_cells: # Inserted colliders are few: test them all against every query, then merge by query
+            dynamic_ids = np.array([i for ids in self.dynamic_cells.values() for i in ids], dtype=np.int64)
+            if len(dynamic_ids):
+                d = np.array([tuple(self.rects[i]) for i in dynamic_ids], dtype=np.int64).reshape(-1, 4)
+                d_hit = ((d[:, 0] < qx1[:, None]) & (qx0[:, None] < d[:, 0] + d[:, 2]) &
+                         (d[:, 1] < qy1[:, None]) & (qy0[:, None] < d[:, 1] + d[:, 3]) & valid[:, None])
+                d_query, d_col = np.nonzero(d_hit)
+                hit_query = np.concatenate((hit_query, d_query)); indices = np.concatenate((indices, dynamic_ids[d_col]))
+                order = np.argsort(hit_query, kind='stable'); hit_query = hit_query[order]; indices = indices[order]
+        offsets = np.zeros(num_queries + 1, dtype=np.int64)
+        np.cumsum(np.bincount(hit_query, minlength=num_queries), out=offsets[1:])
+        return offsets, indices
+
+    def batch_candidates(self, offsets, indices, k):
+        """Returns the collider Rects for row k of a query_batch() result (same list query() would give)."""
+        rects = self.rects
+        return [rects[i] for i in indices[offsets[k]:offsets[k + 1]].tolist()]
+
+# --- END OF FILE collision_index.py ---
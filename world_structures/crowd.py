@@ -0,0 +1,95 @@
+# --- START OF FILE crowd.py ---
+import math
+
+# NumPy is optional: without it callers use separation_push_hashed() per entity
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5)) # Spreads the push directions of exactly stacked pairs
+
+# --- Crowd Separation ---
+def available():
+    """True if separation_push() can run (NumPy installed)."""
+    return np is not None
+
+def _weight(dist, radius):
+    """Push strength for a neighbour dist away: 1 when stacked, fading to 0 at radius."""
+    return 1.0 - dist / radius
+
+def separation_push(x, y, radius, cell_cap=None, dead_zone=0.0):
+    """
+    (NumPy) Separation steering for a whole crowd in one pass. x, y are positions (arrays or sequences); returns arrays (push_x, push_y),
+    each point's summed push away from every other point closer than radius (strength 1 - dist / radius per
+    neighbour), clamped to length 1. Neighbours come from a uniform grid of radius-sized cells: points are sorted
+    by cell, each occupied cell finds its 3x3 neighbour cells with one searchsorted over the cell keys, and every
+    point is paired with the runs of points in those cells, so the cost follows local density instead of n^2.
+    cell_cap bounds how many points of each neighbouring cell are looked at (the first ones in input order), which
+    keeps a pile-up from going quadratic. Pushes shorter than dead_zone are dropped, so enemies that barely touch
+    stay put (and skip collision). Exactly stacked pairs are pushed apart along a direction picked from their indices.
+    """
+    x = np.asarray(x, dtype=np.float64); y = np.asarray(y, dtype=np.float64)
+    n = len(x); push_x = np.zeros(n); push_y = np.zeros(n)
+    if n < 2 or radius <= 0: return push_x, push_y
+    cx = np.floor(x / radius).astype(np.int64); cy = np.floor(y / radius).astype(np.int64)
+    cx -= cx.min() - 1; cy -= cy.min() - 1 # Leave an empty border so neighbour keys never wrap
+    span = int(cy.max()) + 2
+    key = cx * span + cy
+    # Work in cell order: the points of one cell are a contiguous run, and searches only touch the sorted cell keys
+    order = np.argsort(key, kind='stable'); sorted_key = key[order]; xs = x[order]; ys = y[order]
+    cells, cell_start, point_cell = np.unique(sorted_key, return_index=True, return_inverse=True)
+    cell_count = np.diff(np.append(cell_start, n))
+    index = np.arange(n); radius_sq = radius * radius
+    sum_x = np.zeros(n); sum_y = np.zeros(n)
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            wanted = cells + (ox * span + oy) # Still sorted
+            found = np.minimum(np.searchsorted(cells, wanted), len(cells) - 1)
+            hit = cells[found] == wanted
+            low = np.where(hit, cell_start[found], 0)[point_cell]; counts = np.where(hit, cell_count[found], 0)[point_cell]
+            if cell_cap is not None: np.minimum(counts, cell_cap, out=counts)
+            total = int(counts.sum())
+            if not total: continue
+            # Expand every point into (point, candidate) pairs: candidate k of point i is low[i] + k
+            i = np.repeat(index, counts)
+            j = np.repeat(low - (np.cumsum(counts) - counts), counts) + np.arange(total)
+            dx = xs[i] - xs[j]; dy = ys[i] - ys[j]; dist_sq = dx * dx + dy * dy
+            near = (i != j) & (dist_sq < radius_sq)
+            if not near.any(): continue
+            i = i[near]; j = j[near]; dx = dx[near]; dy = dy[near]; dist = np.sqrt(dist_sq[near])
+            stacked = dist == 0
+            if stacked.any(): # Opposite unit directions for the two points of a stacked pair (from their input indices)
+                oi = order[i[stacked]]; oj = order[j[stacked]]
+                angle = _GOLDEN_ANGLE * (oi + oj); sign = np.where(oi > oj, 1.0, -1.0)
+                dx[stacked] = sign * np.cos(angle); dy[stacked] = sign * np.sin(angle); dist[stacked] = 1.0
+            scale = _weight(np.where(stacked, 0.0, dist), radius) / dist
+            sum_x += np.bincount(i, weights=dx * scale, minlength=n); sum_y += np.bincount(i, weights=dy * scale, minlength=n)
+    push_x[order] = sum_x; push_y[order] = sum_y
+    length = np.sqrt(push_x * push_x + push_y * push_y)
+    over = length > 1.0
+    push_x[over] /= length[over]; push_y[over] /= length[over]
+    weak = length < dead_zone; push_x[weak] = 0.0; push_y[weak] = 0.0
+    return push_x, push_y
+
+def separation_push_hashed(entity, spatial_hash, radius, dead_zone=0.0):
+    """
+    separation_push() for one entity (with .x, .y, .id) against the other entities in spatial_hash,
+    without NumPy. Stacked pairs are pushed apart along a direction picked from their ids.
+    """
+    push_x = push_y = 0.0
+    for other in spatial_hash.query_radius(entity.x, entity.y, radius):
+        if other is entity: continue
+        dx = entity.x - other.x; dy = entity.y - other.y; dist = math.hypot(dx, dy)
+        if dist >= radius: continue
+        if dist == 0:
+            angle = _GOLDEN_ANGLE * (entity.id + other.id); sign = 1.0 if entity.id > other.id else -1.0
+            push_x += sign * math.cos(angle) * _weight(0.0, radius); push_y += sign * math.sin(angle) * _weight(0.0, radius)
+        else:
+            scale = _weight(dist, radius) / dist; push_x += dx * scale; push_y += dy * scale
+    length = math.hypot(push_x, push_y)
+    if length < dead_zone: return 0.0, 0.0
+    if length > 1.0: push_x /= length; push_y /= length
+    return push_x, push_y
+
+# --- END OF FILE crowd.py ---
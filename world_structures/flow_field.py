@@ -0,0 +1,107 @@
+# --- START OF FILE flow_field.py ---
+from array import array
+from collections import OrderedDict
+
+import pygame
+from .world_constants import FLOW_FIELD_MAX_STEPS, FLOW_FIELD_CACHE_SIZE
+
+# Neighbour steps (dx, dy): orthogonal first so equal-length routes prefer straight moves
+_STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1))
+
+# --- Dungeon Flow Fields ---
+class FlowFieldService:
+    """
+    Shared chase routes toward players over a TileCollisionGrid (dungeons).
+
+    A field is one breadth-first search outward from a goal tile (the tile a player stands on),
+    limited to max_steps tiles. Each reached tile stores the neighbouring tile one step closer
+    to the goal, so any number of chasers get their next waypoint with a single array read.
+    Diagonal steps are only taken when both side tiles are open, so routes never clip a wall
+    corner. Fields are built on first use and kept per goal tile (least recently used dropped
+    past cache_size): a player only costs a new search when they move onto a new tile, and
+    players sharing a tile share the field. Fields whose area a set_solid() change touches are dropped.
+    builds / lookups count how often a search ran versus how often a field was read.
+    """
+    def __init__(self, tile_grid, max_steps=FLOW_FIELD_MAX_STEPS, cache_size=FLOW_FIELD_CACHE_SIZE):
+        self.tile_grid = tile_grid
+        self.max_steps = max(1, int(max_steps))
+        self.cache_size = max(1, int(cache_size))
+        self.fields = OrderedDict() # goal tile index -> next_tile array (-1 = not reached)
+        self.builds = 0; self.lookups = 0
+        tile_grid.add_change_listener(self._on_change)
+
+    def __len__(self):
+        return len(self.fields)
+
+    @staticmethod
+    def bind(service, tile_grid):
+        """Returns service if it already routes over tile_grid, otherwise closes it and returns a new service for tile_grid."""
+        if service is not None and service.tile_grid is tile_grid: return service
+        if service is not None: service.close()
+        return FlowFieldService(tile_grid)
+
+    def close(self):
+        """Detaches from the tile grid (call before dropping the service)."""
+        self.tile_grid.remove_change_listener(self._on_change)
+        self.fields.clear()
+
+    def take_counters(self):
+        """Returns (builds, lookups) since the last call and resets them."""
+        counters = (self.builds, self.lookups)
+        self.builds = self.lookups = 0
+        return counters
+
+    def _on_change(self, region):
+        grid = self.tile_grid; ts = grid.tile_size; reach = self.max_steps * ts
+        stale = [goal for goal in self.fields
+                 if pygame.Rect((goal % grid.width) * ts - reach, (goal // grid.width) * ts - reach, 2 * reach + ts, 2 * reach + ts).colliderect(region)]
+        for goal in stale: del self.fields[goal]
+
+    def _tile_index(self, x, y):
+        grid = self.tile_grid
+        tx = int(x // grid.tile_size); ty = int(y // grid.tile_size)
+        if 0 <= tx < grid.width and 0 <= ty < grid.height: return ty * grid.width + tx
+        return -1
+
+    def _field(self, goal):
+        field = self.fields.get(goal)
+        if field is not None: self.fields.move_to_end(goal); return field
+        field = self._build(goal); self.fields[goal] = field
+        if len(self.fields) > self.cache_size: self.fields.popitem(last=False)
+        return field
+
+    def _build(self, goal):
+        """Breadth-first search from goal. Returns the next_tile array (the goal points at itself)."""
+        grid = self.tile_grid; width = grid.width; height = grid.height; solid = grid.solid
+        next_tile = array('i', [-1]) * (width * height)
+        next_tile[goal] = goal; frontier = [goal]
+        self.builds += 1
+        for _ in range(self.max_steps):
+            reached = []
+            for tile in frontier:
+                tx = tile % width; ty = tile // width
+                for dx, dy in _STEPS:
+                    nx = tx + dx; ny = ty + dy
+                    if not (0 <= nx < width and 0 <= ny < height): continue
+                    neighbour = ny * width + nx
+                    if next_tile[neighbour] != -1 or solid[neighbour]: continue
+                    if dx and dy and (solid[ty * width + nx] or solid[ny * width + tx]): continue # Would clip a corner
+                    next_tile[neighbour] = tile; reached.append(neighbour)
+            if not reached: break
+            frontier = reached
+        return next_tile
+
+    def next_waypoint(self, goal_x, goal_y, x, y):
+        """
+        World-space centre of the next tile on the route from (x, y) to (goal_x, goal_y), or None when
+        the mover should steer straight at the goal (same or neighbouring tile, off the grid, or out of reach).
+        """
+        goal = self._tile_index(goal_x, goal_y); tile = self._tile_index(x, y)
+        if goal < 0 or tile < 0 or tile == goal or self.tile_grid.solid[goal]: return None
+        self.lookups += 1
+        step = self._field(goal)[tile]
+        if step < 0 or step == goal: return None
+        grid = self.tile_grid; ts = grid.tile_size
+        return ((step % grid.width) * ts + ts / 2, (step // grid.width) * ts + ts / 2)
+
+# --- END OF FILE flow_field.py ---
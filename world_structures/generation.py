@@ -4,7 +4,7 @@ import random
 import math
 from .world_constants import * # Import all constants needed for generation
 from .utils import is_point_in_polygon, point_segment_distance_sq # Import required utils
-from .quadtree import QuadtreeNode # Needed for PDS tree generation
+from .poisson_grid import PoissonDiskGrid # Background grid for PDS tree generation
 
 # --- Grass Generation ---
 def generate_grass_details(count, kingdom_poly, forest_poly):
@@ -64,16 +64,21 @@ def generate_trees_poisson_disk(forest_poly, kingdom_poly, kingdom_wall_vertices
         print("Warning: Invalid forest polygon. Cannot generate trees.")
         return forest_trees, tree_colliders
 
-    # Calculate forest bounding box for PDS and quadtree
+    # Calculate forest bounding box for PDS and its background grid
     min_fx = min(p[0] for p in forest_poly); max_fx = max(p[0] for p in forest_poly)
     min_fy = min(p[1] for p in forest_poly); max_fy = max(p[1] for p in forest_poly)
     forest_bbox = pygame.Rect(min_fx, min_fy, max_fx - min_fx, max_fy - min_fy)
 
-    min_spacing_sq = min_spacing * min_spacing
     active_list = []
     placed_points = []
-    # Initialize quadtree for efficient proximity checks during PDS
-    pds_quadtree = QuadtreeNode(forest_bbox, QT_NODE_CAPACITY) # Use QuadtreeNode from quadtree.py
+    # Bridson background grid: one slot per cell, O(1) spacing checks
+    pds_grid = PoissonDiskGrid(forest_bbox, min_spacing)
+    # Candidates outside the wall's bounding box (grown by the avoid distance) can skip the per-segment wall check
+    wall_bbox = None
+    if kingdom_wall_vertices:
+        wall_xs = [v[0] for v in kingdom_wall_vertices]; wall_ys = [v[1] for v in kingdom_wall_vertices]
+        wall_bbox = pygame.Rect(min(wall_xs), min(wall_ys), max(wall_xs) - min(wall_xs), max(wall_ys) - min(wall_ys))
+        wall_bbox.inflate_ip(2 * wall_avoid_dist + 2, 2 * wall_avoid_dist + 2)
 
     # Find a valid starting point inside the forest, outside kingdom/walls
     start_point = None; attempts = 0; max_attempts = 500
@@ -88,7 +93,7 @@ def generate_trees_poisson_disk(forest_poly, kingdom_poly, kingdom_wall_vertices
              start_point = pt
              placed_points.append(start_point)
              active_list.append(start_point)
-             pds_quadtree.insert(start_point) # Insert uses tuple directly
+             pds_grid.add(*start_point)
              break # Found starting point
     if not start_point:
         print("Error: Could not find a valid starting point for PDS within forest boundaries after max attempts.")
@@ -112,32 +117,22 @@ def generate_trees_poisson_disk(forest_poly, kingdom_poly, kingdom_wall_vertices
             if not world_rect.collidepoint(candidate_point): continue # Outside world bounds
             if not is_point_in_polygon(candidate_point, forest_poly): continue # Outside forest
             if kingdom_poly and is_point_in_polygon(candidate_point, kingdom_poly): continue # Inside kingdom
-            if is_too_close_to_wall(candidate_point, kingdom_wall_vertices, wall_avoid_dist): continue # Too close to wall
-
-            # Check proximity to existing points using quadtree
-            search_radius = min_spacing * 1.01 # Check slightly larger than min_spacing
-            query_rect = pygame.Rect(cand_x - search_radius, cand_y - search_radius, 2 * search_radius, 2 * search_radius)
-            nearby_points = pds_quadtree.query(query_rect) # Query returns tuples
-
-            too_close = False
-            for near_pt in nearby_points:
-                # near_pt should be a tuple (nx, ny)
-                dist_sq = (cand_x - near_pt[0])**2 + (cand_y - near_pt[1])**2
-                if dist_sq < min_spacing_sq:
-                    too_close = True
-                    break
-            if too_close: continue
+            if wall_bbox and wall_bbox.collidepoint(candidate_point) and \
+               is_too_close_to_wall(candidate_point, kingdom_wall_vertices, wall_avoid_dist): continue # Too close to wall
+
+            # Check proximity to existing points using the background grid
+            if not pds_grid.fits(cand_x, cand_y): continue
 
             # Valid candidate found
             placed_points.append(candidate_point)
             active_list.append(candidate_point)
-            pds_quadtree.insert(candidate_point) # Insert the tuple
+            pds_grid.add(cand_x, cand_y)
             found_candidate = True
             break # Move to next active point
 
-        # If no valid candidate found around this active point, remove it
+        # If no valid candidate found around this active point, remove it (swap-remove, O(1))
         if not found_candidate:
-            active_list.pop(active_idx)
+            active_list[active_idx] = active_list[-1]; active_list.pop()
 
     print(f"PDS finished. Placed {len(placed_points)} tree base points.")
 
@@ -196,6 +191,21 @@ def generate_wall_rects(vertices, thickness, gate_segment_index, gate_point1, ga
             rect = pygame.Rect(0, 0, thickness, thickness); rect.center = (int(center_pos.x), int(center_pos.y)); rects.append(rect)
     return rects
 
+def generate_wall_segments(vertices, gate_segment_index, gate_point1, gate_point2):
+    """Generates wall COLLISION segments ((x1, y1), (x2, y2)), one per polygon edge, with the gate segment split around the opening."""
+    segments = []; num_vertices = len(vertices)
+    if num_vertices < 2: return segments
+    for i in range(num_vertices):
+        p1_v = pygame.math.Vector2(vertices[i]); p2_v = pygame.math.Vector2(vertices[(i + 1) % num_vertices])
+        if i == gate_segment_index and gate_point1 and gate_point2:
+            # Wall on both sides of the opening: (p1_v -> gate_point1) and (gate_point2 -> p2_v)
+            if (gate_point1 - p1_v).length() > 1: segments.append(((p1_v.x, p1_v.y), (gate_point1.x, gate_point1.y)))
+            if (p2_v - gate_point2).length() > 1: segments.append(((gate_point2.x, gate_point2.y), (p2_v.x, p2_v.y)))
+            continue
+        if (p2_v - p1_v).length() < 1: continue # Skip zero-length segments
+        segments.append(((p1_v.x, p1_v.y), (p2_v.x, p2_v.y)))
+    return segments
+
 def generate_wall_tile_data_rotated(vertices, gate_segment_index, gate_point1, gate_point2, tile_size):
     """
     Calculates positions AND angles for wall tile sprites along segments,
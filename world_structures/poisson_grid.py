@@ -0,0 +1,56 @@
+# --- START OF FILE poisson_grid.py ---
+import math
+from array import array
+
+# --- Poisson Disk Background Grid ---
+class PoissonDiskGrid:
+    """
+    Bridson background grid for Poisson disk sampling.
+
+    Cells are min_spacing / sqrt(2) wide, so no two accepted points can share a cell and
+    each cell holds one slot (a point index, -1 if empty). A spacing check only reads the
+    5x5 block of slots around the candidate, which keeps sampling linear in the number of
+    points no matter how large the forest or how small the spacing.
+    """
+    def __init__(self, bounds, min_spacing):
+        left, top, width, height = bounds
+        self.left = left; self.top = top
+        self.min_spacing_sq = min_spacing * min_spacing
+        self.cell_size = min_spacing / math.sqrt(2)
+        self.cols = max(1, int(math.ceil(width / self.cell_size)) + 1)
+        self.rows = max(1, int(math.ceil(height / self.cell_size)) + 1)
+        # Slots carry a 2-cell border of empty cells so the 5x5 neighbourhood never needs bounds checks
+        self.stride = self.cols + 4
+        self.slots = array('i', [-1]) * (self.stride * (self.rows + 4))
+        self.neighbour_offsets = tuple(dy * self.stride + dx for dy in range(-2, 3) for dx in range(-2, 3))
+        self.xs = array('d'); self.ys = array('d')
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _slot(self, x, y):
+        """Returns the slot index for world point (x, y), or -1 if it falls outside the grid."""
+        col = int((x - self.left) // self.cell_size); row = int((y - self.top) // self.cell_size)
+        if 0 <= col < self.cols and 0 <= row < self.rows: return (row + 2) * self.stride + col + 2
+        return -1
+
+    def fits(self, x, y):
+        """True if (x, y) is inside the grid and at least min_spacing from every stored point."""
+        slot = self._slot(x, y)
+        if slot < 0: return False
+        slots = self.slots
+        if slots[slot] >= 0: return False # Same cell always means too close
+        xs = self.xs; ys = self.ys; min_spacing_sq = self.min_spacing_sq
+        for offset in self.neighbour_offsets:
+            i = slots[slot + offset]
+            if i >= 0 and (xs[i] - x) ** 2 + (ys[i] - y) ** 2 < min_spacing_sq: return False
+        return True
+
+    def add(self, x, y):
+        """Stores an accepted point (caller checked fits()). Returns its index."""
+        index = len(self.xs)
+        self.xs.append(x); self.ys.append(y)
+        self.slots[self._slot(x, y)] = index
+        return index
+
+# --- END OF FILE poisson_grid.py ---
@@ -1,5 +1,5 @@
 import pygame
-from py.world.world_structures.world_constants import QT_MAX_DEPTH
+from .world_constants import QT_MAX_DEPTH
 
 # --- Quadtree Implementation --- (Unchanged)
 class QuadtreeNode:
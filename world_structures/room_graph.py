@@ -0,0 +1,203 @@
+# --- START OF FILE room_graph.py ---
+import heapq
+from array import array
+from collections import OrderedDict
+
+from .world_constants import ROOM_ROUTE_CACHE_SIZE
+
+# Neighbour steps (dx, dy): orthogonal first so equal-length routes prefer straight moves
+_STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1))
+
+# --- Dungeon Room / Portal Graph ---
+class RoomGraph:
+    """
+    Long-range dungeon navigation over regions instead of tiles.
+
+    The open tiles of a TileCollisionGrid are split into regions: one per generator room
+    (room_rects, in grid coordinates) and one per connected corridor piece left over between
+    them. Wherever two regions touch, one portal joins them (a tile pair, one tile on each side).
+    For every (region, portal) a breadth-first search inside the region stores each tile's step
+    and distance toward the portal, which gives exact in-region edge costs and lets movers
+    follow bent corridors. Routes are found with A* over the portals (from the start region's
+    anchor tile to the goal region's anchor) and kept in an LRU keyed by (start region, goal
+    region), so repeated long trips (returning to spawn, long chases) cost one lookup.
+    The graph is immutable: build a new one when the dungeon is regenerated.
+    hits / misses count route cache use.
+    """
+    def __init__(self, tile_grid, room_rects, cache_size=ROOM_ROUTE_CACHE_SIZE):
+        self.tile_grid = tile_grid
+        self.width = tile_grid.width; self.height = tile_grid.height; self.tile_size = tile_grid.tile_size
+        self.cache_size = max(1, int(cache_size))
+        self.region_of = array('i', [-1]) * (self.width * self.height) # Tile index -> region (-1 = solid)
+        self.room_count = 0 # Regions [0, room_count) are rooms, the rest corridor pieces
+        self.anchors = [] # Region -> anchor tile (route costs are measured from / to it)
+        self.portals = [] # Portal -> (tile_a, region_a, tile_b, region_b)
+        self.region_portals = [] # Region -> [portal]
+        self.fields = {} # (region, portal) -> {tile: (next_tile, steps)} toward the portal's tile in region
+        self.routes = OrderedDict() # (start region, goal region) -> tuple of portals, or None if unreachable
+        self.hits = 0; self.misses = 0
+        self._build(room_rects)
+
+    def __len__(self):
+        return len(self.anchors)
+
+    def take_counters(self):
+        """Returns (route cache hits, route searches) since the last call and resets them."""
+        counters = (self.hits, self.misses)
+        self.hits = self.misses = 0
+        return counters
+
+    def clear(self):
+        """Drops every cached route."""
+        self.routes.clear()
+
+    # --- Building ---
+    def _build(self, room_rects):
+        width = self.width; height = self.height; solid = self.tile_grid.solid; region_of = self.region_of
+        region_tiles = []
+        for room in room_rects: # Rooms first, so corridor tiles carved through a room belong to it
+            tiles = []
+            for ty in range(max(0, room.top), min(height, room.bottom)):
+                for tile in range(ty * width + max(0, room.left), ty * width + min(width, room.right)):
+                    if not solid[tile] and region_of[tile] == -1: region_of[tile] = len(region_tiles); tiles.append(tile)
+            center = room.centery * width + room.centerx
+            self.anchors.append(center if 0 <= room.centerx < width and 0 <= room.centery < height and center in tiles else (tiles[0] if tiles else -1))
+            region_tiles.append(tiles)
+        self.room_count = len(region_tiles)
+        for start in range(width * height): # Corridor pieces: 4-connected flood fill of the remaining open tiles
+            if solid[start] or region_of[start] != -1: continue
+            region = len(region_tiles); region_of[start] = region; tiles = [start]; k = 0
+            while k < len(tiles):
+                tile = tiles[k]; k += 1; tx = tile % width
+                for neighbour, inside in ((tile - 1, tx > 0), (tile + 1, tx < width - 1), (tile - width, tile >= width), (tile + width, tile < (height - 1) * width)):
+                    if inside and not solid[neighbour] and region_of[neighbour] == -1: region_of[neighbour] = region; tiles.append(neighbour)
+            self.anchors.append(start); region_tiles.append(tiles)
+
+        # One portal per touching region pair, at the middle of their shared boundary
+        boundaries = {}
+        for tile in range(width * height):
+            region = region_of[tile]
+            if region < 0: continue
+            for neighbour, inside in ((tile + 1, tile % width < width - 1), (tile + width, tile < (height - 1) * width)):
+                if not inside: continue
+                other = region_of[neighbour]
+                if other < 0 or other == region: continue
+                if region < other: boundaries.setdefault((region, other), []).append((tile, neighbour))
+                else: boundaries.setdefault((other, region), []).append((neighbour, tile))
+        self.region_portals = [[] for _ in region_tiles]
+        for (region_a, region_b), pairs in boundaries.items():
+            tile_a, tile_b = pairs[len(pairs) // 2]
+            portal = len(self.portals); self.portals.append((tile_a, region_a, tile_b, region_b))
+            self.region_portals[region_a].append(portal); self.region_portals[region_b].append(portal)
+
+        for region, portals in enumerate(self.region_portals):
+            for portal in portals: self.fields[(region, portal)] = self._region_field(region, self.entry(portal, region))
+
+    def _region_field(self, region, goal):
+        """Breadth-first search inside one region from goal. Returns {tile: (next_tile, steps)}."""
+        width = self.width; height = self.height; region_of = self.region_of
+        field = {goal: (goal, 0)}; frontier = [goal]; steps = 0
+        while frontier:
+            steps += 1; reached = []
+            for tile in frontier:
+                tx = tile % width; ty = tile // width
+                for dx, dy in _STEPS:
+                    nx = tx + dx; ny = ty + dy
+                    if not (0 <= nx < width and 0 <= ny < height): continue
+                    neighbour = ny * width + nx
+                    if neighbour in field or region_of[neighbour] != region: continue
+                    if dx and dy and (region_of[ty * width + nx] != region or region_of[ny * width + tx] != region): continue # Would clip a corner
+                    field[neighbour] = (tile, steps); reached.append(neighbour)
+            frontier = reached
+        return field
+
+    # --- Queries ---
+    def entry(self, portal, region):
+        """The portal's tile on region's side."""
+        tile_a, region_a, tile_b, _ = self.portals[portal]
+        return tile_a if region == region_a else tile_b
+
+    def other_side(self, portal, region):
+        """(tile, region) across the portal from region."""
+        tile_a, region_a, tile_b, region_b = self.portals[portal]
+        return (tile_b, region_b) if region == region_a else (tile_a, region_a)
+
+    def region_at(self, x, y):
+        """Region of world point (x, y), or -1 on solid / off-grid tiles."""
+        tx = int(x // self.tile_size); ty = int(y // self.tile_size)
+        if 0 <= tx < self.width and 0 <= ty < self.height: return self.region_of[ty * self.width + tx]
+        return -1
+
+    def route(self, start_region, goal_region):
+        """Portals crossed going from start_region to goal_region (a tuple, empty if equal), or None if unreachable. Cached."""
+        key = (start_region, goal_region)
+        if key in self.routes:
+            self.hits += 1; self.routes.move_to_end(key); return self.routes[key]
+        self.misses += 1
+        route = self._search(start_region, goal_region)
+        self.routes[key] = route
+        if len(self.routes) > self.cache_size: self.routes.popitem(last=False)
+        return route
+
+    def _steps(self, region, portal, tile):
+        entry = self.fields[(region, portal)].get(tile)
+        return entry[1] if entry is not None else None
+
+    def _search(self, start_region, goal_region):
+        """A* over (portal, region entered) states, from start_region's anchor to goal_region's anchor."""
+        if start_region == goal_region: return ()
+        start = self.anchors[start_region]; goal = self.anchors[goal_region]
+        if start < 0 or goal < 0: return None
+        width = self.width; gx = goal % width; gy = goal // width
+        def estimate(tile): return max(abs(tile % width - gx), abs(tile // width - gy)) # Chebyshev: exact for open floor, never too high
+        best = {}; came_from = {}; heap = []; order = 0
+        for portal in self.region_portals[start_region]:
+            steps = self._steps(start_region, portal, start)
+            if steps is None: continue
+            tile, region = self.other_side(portal, start_region); cost = steps + 1
+            if cost < best.get((portal, region), float('inf')):
+                best[(portal, region)] = cost; came_from[(portal, region)] = None
+                heapq.heappush(heap, (cost + estimate(tile), order, cost, (portal, region))); order += 1
+        finished = None; finished_cost = float('inf')
+        while heap:
+            bound, _, cost, state = heapq.heappop(heap)
+            if bound >= finished_cost: break
+            if cost > best.get(state, float('inf')): continue
+            portal, region = state
+            if region == goal_region: # Walk to the goal anchor inside the goal region
+                steps = self._steps(region, portal, goal)
+                if steps is not None and cost + steps < finished_cost: finished = state; finished_cost = cost + steps
+                continue
+            here = self.entry(portal, region)
+            for exit_portal in self.region_portals[region]:
+                if exit_portal == portal: continue
+                steps = self._steps(region, exit_portal, here)
+                if steps is None: continue
+                tile, next_region = self.other_side(exit_portal, region); next_cost = cost + steps + 1
+                next_state = (exit_portal, next_region)
+                if next_cost < best.get(next_state, float('inf')):
+                    best[next_state] = next_cost; came_from[next_state] = state
+                    heapq.heappush(heap, (next_cost + estimate(tile), order, next_cost, next_state)); order += 1
+        if finished is None: return None
+        route = []
+        while finished is not None: route.append(finished[0]); finished = came_from[finished]
+        return tuple(reversed(route))
+
+    def next_waypoint(self, goal_x, goal_y, x, y):
+        """
+        World-space centre of the next tile toward the first portal on the route from (x, y) to (goal_x, goal_y),
+        or None when the mover should steer straight at the goal (same region, solid / off-grid tile, or unreachable).
+        """
+        start_region = self.region_at(x, y); goal_region = self.region_at(goal_x, goal_y)
+        if start_region < 0 or goal_region < 0 or start_region == goal_region: return None
+        route = self.route(start_region, goal_region)
+        if not route: return None
+        portal = route[0]
+        tile = int(y // self.tile_size) * self.width + int(x // self.tile_size)
+        step = self.fields[(start_region, portal)].get(tile)
+        if step is None: return None
+        next_tile = self.other_side(portal, start_region)[0] if step[1] == 0 else step[0] # On the portal tile: step across
+        ts = self.tile_size
+        return ((next_tile % self.width) * ts + ts / 2, (next_tile // self.width) * ts + ts / 2)
+
+# --- END OF FILE room_graph.py ---
@@ -0,0 +1,106 @@
+# --- START OF FILE segment_colliders.py ---
+import math
+from .world_constants import SEGMENT_CELL_SIZE, SEGMENT_ENTITY_PAD, SEGMENT_VECTOR_MIN
+from .utils import point_segment_distance_sq
+
+# NumPy is optional: when present, cells with many candidate segments run the narrow-phase vectorized
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- Segment (Capsule) Colliders ---
+class SegmentColliderSet:
+    """
+    Oriented wall colliders: each segment (a, b) with a shared radius is a capsule.
+
+    Used for the kingdom wall, which is a handful of long polygon edges rather than hundreds
+    of stamped squares. Segments are bucketed once into cells near them, so an entity only
+    looks at the segments listed for its own cell (a stored tuple, nothing allocated), and
+    resolve_circle() pushes a circle out of any capsule it overlaps.
+    """
+    def __init__(self, segments, radius, cell_size=SEGMENT_CELL_SIZE):
+        self.radius = float(radius)
+        self.cell_size = cell_size
+        self.segments = [((float(ax), float(ay)), (float(bx), float(by))) for (ax, ay), (bx, by) in segments]
+        # Column layout: start point, direction (b - a) and 1 / |b - a|^2 per segment
+        self.ax = [a[0] for a, _ in self.segments]; self.ay = [a[1] for a, _ in self.segments]
+        self.dx = [b[0] - a[0] for a, b in self.segments]; self.dy = [b[1] - a[1] for a, b in self.segments]
+        self.inv_len_sq = [1.0 / (dx * dx + dy * dy) if (dx or dy) else 0.0 for dx, dy in zip(self.dx, self.dy)]
+        self.buckets = {} # (cell_x, cell_y) -> tuple of segment ids
+        self.bucket_arrays = {} # Same buckets as NumPy index arrays, for cells big enough to vectorize
+        self._build_buckets()
+        if np is not None:
+            self.ax_np = np.array(self.ax); self.ay_np = np.array(self.ay)
+            self.dx_np = np.array(self.dx); self.dy_np = np.array(self.dy); self.inv_len_sq_np = np.array(self.inv_len_sq)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def _build_buckets(self):
+        """Files each segment under every cell whose area comes within radius + SEGMENT_ENTITY_PAD of it."""
+        size = self.cell_size; reach = self.radius + SEGMENT_ENTITY_PAD
+        reach_sq = (reach + size * 0.7072) ** 2 # Measured from cell centers, so add half a cell diagonal
+        buckets = {}
+        for i, ((ax, ay), (bx, by)) in enumerate(self.segments):
+            cx0 = int((min(ax, bx) - reach) // size); cx1 = int((max(ax, bx) + reach) // size)
+            cy0 = int((min(ay, by) - reach) // size); cy1 = int((max(ay, by) + reach) // size)
+            for cy in range(cy0, cy1 + 1):
+                for cx in range(cx0, cx1 + 1):
+                    if point_segment_distance_sq((cx + 0.5) * size, (cy + 0.5) * size, ax, ay, bx, by) <= reach_sq:
+                        buckets.setdefault((cx, cy), []).append(i)
+        self.buckets = {key: tuple(ids) for key, ids in buckets.items()}
+        if np is not None:
+            self.bucket_arrays = {key: np.array(ids) for key, ids in self.buckets.items() if len(ids) >= SEGMENT_VECTOR_MIN}
+
+    def resolve_circle(self, x, y, radius, iterations=2):
+        """
+        Pushes a circle at (x, y) out of every wall capsule it overlaps.
+        Each iteration resolves the deepest overlap, so a circle wedged in a corner
+        between two segments settles in a couple of passes. Returns (x, y, hit).
+        """
+        key = (int(x // self.cell_size), int(y // self.cell_size))
+        ids = self.buckets.get(key) if radius <= SEGMENT_ENTITY_PAD else range(len(self.segments))
+        if not ids: return x, y, False
+        min_dist = radius + self.radius; hit = False
+        vector_ids = self.bucket_arrays.get(key) if radius <= SEGMENT_ENTITY_PAD else None
+        for _ in range(iterations):
+            if vector_ids is not None: push = self._deepest_overlap_vectorized(x, y, min_dist, vector_ids)
+            else: push = self._deepest_overlap(x, y, min_dist, ids)
+            if push is None: break
+            x += push[0]; y += push[1]; hit = True
+        return x, y, hit
+
+    def _deepest_overlap(self, x, y, min_dist, ids):
+        """Returns the (dx, dy) push out of the most-penetrated capsule among ids, or None."""
+        ax = self.ax; ay = self.ay; dx = self.dx; dy = self.dy; inv_len_sq = self.inv_len_sq
+        best = None; best_depth = 0.0
+        for i in ids:
+            sx = dx[i]; sy = dy[i]; rx = x - ax[i]; ry = y - ay[i]
+            t = (rx * sx + ry * sy) * inv_len_sq[i]; t = 0.0 if t < 0.0 else (1.0 if t > 1.0 else t)
+            ox = rx - t * sx; oy = ry - t * sy # Closest point on the segment -> circle center
+            dist_sq = ox * ox + oy * oy
+            if dist_sq >= min_dist * min_dist: continue
+            dist = math.sqrt(dist_sq); depth = min_dist - dist
+            if depth <= best_depth: continue
+            if dist > 1e-9: best = (ox / dist * depth, oy / dist * depth)
+            else: # Center sits on the segment: push along its normal
+                seg_len = math.sqrt(sx * sx + sy * sy) or 1.0
+                best = (-sy / seg_len * depth, sx / seg_len * depth)
+            best_depth = depth
+        return best
+
+    def _deepest_overlap_vectorized(self, x, y, min_dist, ids):
+        """NumPy version of _deepest_overlap() over an index array of candidate segments."""
+        sx = self.dx_np[ids]; sy = self.dy_np[ids]; rx = x - self.ax_np[ids]; ry = y - self.ay_np[ids]
+        t = np.clip((rx * sx + ry * sy) * self.inv_len_sq_np[ids], 0.0, 1.0)
+        ox = rx - t * sx; oy = ry - t * sy
+        depth = min_dist - np.sqrt(ox * ox + oy * oy)
+        k = int(np.argmax(depth))
+        if depth[k] <= 0.0: return None
+        dist = min_dist - float(depth[k])
+        if dist > 1e-9: return (float(ox[k]) / dist * float(depth[k]), float(oy[k]) / dist * float(depth[k]))
+        seg_len = math.hypot(float(sx[k]), float(sy[k])) or 1.0
+        return (-float(sy[k]) / seg_len * float(depth[k]), float(sx[k]) / seg_len * float(depth[k]))
+
+# --- END OF FILE segment_colliders.py ---
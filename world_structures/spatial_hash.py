@@ -0,0 +1,92 @@
+# --- START OF FILE spatial_hash.py ---
+from .world_constants import SPATIAL_HASH_CELL_SIZE
+
+# --- Dynamic Spatial Hash ---
+class SpatialHash:
+    """
+    Uniform hash grid for moving entities (players, enemies, NPCs).
+
+    Entities are bucketed by the cell of their (x, y) position. move() is O(1) and only
+    touches buckets when the entity actually crosses a cell border, so managers can call it
+    after every update. Radius and rect queries only visit the cells they overlap, so
+    "who is near X" scales with local density instead of total population.
+    Buckets are insertion-ordered dicts, which keeps query results deterministic.
+    """
+    def __init__(self, cell_size=SPATIAL_HASH_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {} # (cell_x, cell_y) -> {entity: None}
+        self.entries = {} # entity -> [x, y, cell_key]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, entity):
+        return entity in self.entries
+
+    def _key(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, entity, x, y):
+        """Adds an entity at (x, y). Inserting an entity that is already present just moves it."""
+        if entity in self.entries:
+            self.move(entity, x, y); return
+        key = self._key(x, y)
+        self.cells.setdefault(key, {})[entity] = None
+        self.entries[entity] = [x, y, key]
+
+    def move(self, entity, x, y):
+        """Updates an entity's position, re-bucketing only if it changed cells. Unknown entities are inserted."""
+        entry = self.entries.get(entity)
+        if entry is None:
+            self.insert(entity, x, y); return
+        entry[0] = x; entry[1] = y
+        key = self._key(x, y)
+        if key != entry[2]:
+            old_bucket = self.cells[entry[2]]; del old_bucket[entity]
+            if not old_bucket: del self.cells[entry[2]] # Keep the table sparse
+            self.cells.setdefault(key, {})[entity] = None
+            entry[2] = key
+
+    def remove(self, entity):
+        """Removes an entity. Returns False if it was not in the hash."""
+        entry = self.entries.pop(entity, None)
+        if entry is None: return False
+        bucket = self.cells[entry[2]]; del bucket[entity]
+        if not bucket: del self.cells[entry[2]]
+        return True
+
+    def clear(self):
+        self.cells.clear(); self.entries.clear()
+
+    def query_rect(self, rect):
+        """Returns entities whose hashed position lies inside rect (left/top inclusive, right/bottom exclusive)."""
+        left, top, width, height = rect
+        right = left + width; bottom = top + height
+        if width <= 0 or height <= 0 or not self.entries: return []
+        cx0, cy0 = self._key(left, top); cx1, cy1 = self._key(right, bottom)
+        found_entities = []; cells = self.cells; entries = self.entries
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if not bucket: continue
+                for entity in bucket:
+                    ex, ey, _ = entries[entity]
+                    if left <= ex < right and top <= ey < bottom: found_entities.append(entity)
+        return found_entities
+
+    def query_radius(self, x, y, radius):
+        """Returns entities whose hashed position is within radius of (x, y) (inclusive)."""
+        if radius < 0 or not self.entries: return []
+        radius_sq = radius * radius
+        cx0, cy0 = self._key(x - radius, y - radius); cx1, cy1 = self._key(x + radius, y + radius)
+        found_entities = []; cells = self.cells; entries = self.entries
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if not bucket: continue
+                for entity in bucket:
+                    ex, ey, _ = entries[entity]
+                    if (ex - x) ** 2 + (ey - y) ** 2 <= radius_sq: found_entities.append(entity)
+        return found_entities
+
+# --- END OF FILE spatial_hash.py ---
@@ -0,0 +1,119 @@
+# --- START OF FILE tile_collider.py ---
+import pygame
+from .world_constants import DUNGEON_TILE_SIZE, TILE_WALL
+
+# --- Tile Grid Collider ---
+class TileCollisionGrid:
+    """
+    Collision map for tile-based levels (dungeons): one byte per tile, 1 = solid.
+
+    Movers resolve against the grid directly: a moved rect only reads the tiles it covers,
+    so there is no broad-phase query and nothing is allocated per tick. The grid is kept
+    twice (row-major and column-major) so both horizontal and vertical tile runs are
+    contiguous and can be scanned with bytearray.find(). Tiles outside the grid are open,
+    the same as with per-wall Rects; movers clamp to the world bounds themselves.
+    """
+    def __init__(self, tile_size=DUNGEON_TILE_SIZE):
+        self.tile_size = max(1, int(tile_size))
+        self.width = 0; self.height = 0 # In tiles
+        self.solid = bytearray() # Row-major: solid[ty * width + tx]
+        self.solid_cols = bytearray() # Column-major: solid_cols[tx * height + ty]
+        self.solid_count = 0
+        self.boundary = pygame.Rect(0, 0, 0, 0) # World-space extent of the grid
+        self.change_listeners = [] # Same hook as StaticCollisionIndex: callback(region_rect)
+
+    def __len__(self):
+        return self.solid_count
+
+    def build(self, tile_rows, solid_value=TILE_WALL):
+        """Fills the grid from a 2D list of tile types. Returns the number of solid tiles."""
+        height = len(tile_rows); width = max((len(row) for row in tile_rows), default=0)
+        solid = bytearray(width * height)
+        for ty, row in enumerate(tile_rows):
+            base = ty * width
+            for tx, tile_type in enumerate(row):
+                if tile_type == solid_value: solid[base + tx] = 1
+        solid_cols = bytearray(width * height)
+        for tx in range(width): solid_cols[tx * height:(tx + 1) * height] = solid[tx::width]
+        self.width = width; self.height = height
+        self.solid = solid; self.solid_cols = solid_cols
+        self.solid_count = solid.count(1)
+        self.boundary = pygame.Rect(0, 0, width * self.tile_size, height * self.tile_size)
+        return self.solid_count
+
+    def add_change_listener(self, callback):
+        """Registers callback(region_rect), called when set_solid() changes a tile."""
+        self.change_listeners.append(callback)
+
+    def remove_change_listener(self, callback):
+        if callback in self.change_listeners: self.change_listeners.remove(callback)
+
+    def set_solid(self, tx, ty, solid):
+        """Opens or closes one tile (doors, gates, destructible walls). Returns False if out of range or unchanged."""
+        if not (0 <= tx < self.width and 0 <= ty < self.height): return False
+        value = 1 if solid else 0
+        if self.solid[ty * self.width + tx] == value: return False
+        self.solid[ty * self.width + tx] = value; self.solid_cols[tx * self.height + ty] = value
+        self.solid_count += 1 if value else -1
+        region = pygame.Rect(tx * self.tile_size, ty * self.tile_size, self.tile_size, self.tile_size)
+        for callback in self.change_listeners: callback(region)
+        return True
+
+    def is_solid_at(self, x, y):
+        """True if world point (x, y) lies in a solid tile."""
+        tx = int(x // self.tile_size); ty = int(y // self.tile_size)
+        if 0 <= tx < self.width and 0 <= ty < self.height: return self.solid[ty * self.width + tx] == 1
+        return False
+
+    def rect_blocked(self, rect):
+        """True if rect overlaps any solid tile (same strict-overlap rule as colliderect)."""
+        ts = self.tile_size
+        c0 = max(0, rect.left // ts); c1 = min(self.width - 1, (rect.right - 1) // ts)
+        r0 = max(0, rect.top // ts); r1 = min(self.height - 1, (rect.bottom - 1) // ts)
+        if c0 > c1 or r0 > r1 or rect.width <= 0 or rect.height <= 0: return False
+        solid = self.solid; width = self.width
+        for base in range(r0 * width, r1 * width + 1, width):
+            if solid.find(1, base + c0, base + c1 + 1) >= 0: return True
+        return False
+
+    def resolve_x(self, rect, dx):
+        """
+        Pushes rect, already moved by dx on the x axis, out of the solid tiles it overlaps.
+        Snaps against the nearest blocking tile column in the direction of travel (rect is
+        edited in place). Returns True if a wall was hit.
+        """
+        ts = self.tile_size
+        c0 = max(0, rect.left // ts); c1 = min(self.width - 1, (rect.right - 1) // ts)
+        r0 = max(0, rect.top // ts); r1 = min(self.height - 1, (rect.bottom - 1) // ts)
+        if c0 > c1 or r0 > r1 or rect.width <= 0 or rect.height <= 0: return False
+        solid_cols = self.solid_cols; height = self.height
+        if dx < 0:
+            for tx in range(c1, c0 - 1, -1):
+                if solid_cols.find(1, tx * height + r0, tx * height + r1 + 1) >= 0:
+                    rect.left = (tx + 1) * ts; return True
+        else:
+            for tx in range(c0, c1 + 1):
+                if solid_cols.find(1, tx * height + r0, tx * height + r1 + 1) >= 0:
+                    if dx > 0: rect.right = tx * ts
+                    return True
+        return False
+
+    def resolve_y(self, rect, dy):
+        """Vertical counterpart of resolve_x(): snaps rect, already moved by dy, against the nearest blocking tile row."""
+        ts = self.tile_size
+        c0 = max(0, rect.left // ts); c1 = min(self.width - 1, (rect.right - 1) // ts)
+        r0 = max(0, rect.top // ts); r1 = min(self.height - 1, (rect.bottom - 1) // ts)
+        if c0 > c1 or r0 > r1 or rect.width <= 0 or rect.height <= 0: return False
+        solid = self.solid; width = self.width
+        if dy < 0:
+            for ty in range(r1, r0 - 1, -1):
+                if solid.find(1, ty * width + c0, ty * width + c1 + 1) >= 0:
+                    rect.top = (ty + 1) * ts; return True
+        else:
+            for ty in range(r0, r1 + 1):
+                if solid.find(1, ty * width + c0, ty * width + c1 + 1) >= 0:
+                    if dy > 0: rect.bottom = ty * ts
+                    return True
+        return False
+
+# --- END OF FILE tile_collider.py ---
@@ -0,0 +1,120 @@
+# --- START OF FILE timer_wheel.py ---
+import math
+
+from .world_constants import TIMER_WHEEL_TICK, TIMER_WHEEL_SLOT_BITS, TIMER_WHEEL_LEVELS
+
+# --- Hierarchical Timer Wheel ---
+class TimerWheel:
+    """
+    Countdowns that cost nothing until they fire (server side entity timers).
+
+    Time is counted in ticks of tick_seconds. Level 0 has one slot per tick for the next
+    2**slot_bits ticks; each higher level has slots 2**slot_bits times coarser, and a slot is
+    re-spread onto the level below when the wheel reaches it. Scheduling, cancelling and
+    firing are O(1), and a tick with nothing due only looks at one empty slot, so thousands of
+    armed timers add no per-tick work. A timer set for d seconds fires on the ceil(d / tick_seconds)-th
+    advanced tick, the same tick a countdown decremented by tick_seconds would first reach zero.
+
+    arm() / disarm() are the entity-facing layer: a named attribute on an owner (e.g. an Enemy's
+    'wander_timer') is set to 0.0 when its timer fires, so code testing `timer <= 0` works unchanged
+    without decrementing anything, and an optional on_expire(name) callback runs.
+    """
+    def __init__(self, tick_seconds=TIMER_WHEEL_TICK, slot_bits=TIMER_WHEEL_SLOT_BITS, levels=TIMER_WHEEL_LEVELS):
+        self.tick_seconds = tick_seconds
+        self.slot_bits = max(1, int(slot_bits)); self.levels = max(1, int(levels))
+        self.mask = (1 << self.slot_bits) - 1
+        self.max_ticks = (1 << (self.slot_bits * self.levels)) - 1 # Longer delays are clamped
+        self.wheels = [[[] for _ in range(self.mask + 1)] for _ in range(self.levels)]
+        self.now = 0 # Ticks advanced so far
+        self.carry = 0.0 # Seconds not yet making up a whole tick
+        self.live = 0 # Scheduled, not yet fired or cancelled
+        self.fired = 0 # Fired since the last take_counters()
+        self.armed = {} # owner -> {attribute name: timer}
+
+    def __len__(self):
+        return self.live
+
+    def take_counters(self):
+        """Returns (live timers, fired since the last call) and resets the fired count."""
+        counters = (self.live, self.fired)
+        self.fired = 0
+        return counters
+
+    # --- Raw Timers ---
+    def schedule(self, seconds, callback, *args):
+        """Calls callback(*args) once seconds have passed. Returns a handle for cancel()."""
+        ticks = min(self.max_ticks, max(1, math.ceil(seconds / self.tick_seconds - 1e-9)))
+        timer = [self.now + ticks, callback, args] # [deadline tick, callback (None = cancelled), args]
+        self._insert(timer); self.live += 1
+        return timer
+
+    def cancel(self, timer):
+        """Stops a pending timer (no-op if it already fired or was cancelled). The entry is dropped when its slot comes up."""
+        if timer[1] is not None: timer[1] = None; self.live -= 1
+
+    def remaining(self, timer):
+        """Seconds until a pending timer fires (0.0 if it fired or was cancelled)."""
+        if timer[1] is None: return 0.0
+        return max(0.0, (timer[0] - self.now) * self.tick_seconds - self.carry)
+
+    def _insert(self, timer):
+        delta = timer[0] - self.now; bits = self.slot_bits; level = 0
+        while level < self.levels - 1 and delta >> (bits * (level + 1)): level += 1 # Too far out for this level's slots
+        self.wheels[level][(timer[0] >> (bits * level)) & self.mask].append(timer)
+
+    def advance(self, dt):
+        """Moves time forward by dt seconds, firing every timer that comes due. Returns how many fired."""
+        self.carry += dt
+        ticks = int(self.carry / self.tick_seconds + 1e-9)
+        if ticks <= 0: return 0
+        self.carry = max(0.0, self.carry - ticks * self.tick_seconds)
+        fired = 0
+        for _ in range(ticks): fired += self._tick()
+        return fired
+
+    def _tick(self):
+        self.now += 1; now = self.now; bits = self.slot_bits; mask = self.mask
+        level = 1 # Re-spread each coarser slot the wheel just reached
+        while level < self.levels and (now & ((1 << (bits * level)) - 1)) == 0:
+            slot = (now >> (bits * level)) & mask
+            due = self.wheels[level][slot]; self.wheels[level][slot] = []
+            for timer in due:
+                if timer[1] is not None: self._insert(timer)
+            level += 1
+        slot = now & mask
+        due = self.wheels[0][slot]
+        if not due: return 0
+        self.wheels[0][slot] = []
+        fired = 0
+        for timer in due:
+            callback = timer[1]
+            if callback is None: continue
+            timer[1] = None; self.live -= 1; fired += 1
+            callback(*timer[2])
+        self.fired += fired
+        return fired
+
+    # --- Entity Attribute Timers ---
+    def arm(self, owner, name, seconds, on_expire=None):
+        """(Re)starts owner's countdown attribute name: it reads seconds until the timer fires, then 0.0."""
+        timers = self.armed.get(owner)
+        if timers is None: timers = self.armed[owner] = {}
+        previous = timers.get(name)
+        if previous is not None: self.cancel(previous)
+        setattr(owner, name, seconds)
+        if seconds > 0: timers[name] = self.schedule(seconds, self._expire, owner, name, on_expire)
+        else: timers.pop(name, None)
+
+    def disarm(self, owner):
+        """Cancels all of owner's attribute timers (call when the entity is removed)."""
+        for timer in self.armed.pop(owner, {}).values(): self.cancel(timer)
+
+    def _expire(self, owner, name, on_expire):
+        timers = self.armed.get(owner)
+        if timers is not None:
+            timers.pop(name, None)
+            if not timers: del self.armed[owner]
+        setattr(owner, name, 0.0)
+        if on_expire is not None: on_expire(name)
+
+# --- END OF FILE timer_wheel.py ---
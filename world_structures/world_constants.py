@@ -101,12 +101,37 @@ MAP_TOWER_COLOR = (60, 60, 60, 200)
 QT_NODE_CAPACITY = 4
 QT_MAX_DEPTH = 10
 
+# Collision Index Constants
+COLLISION_CELL_SIZE = 64 # World pixels per cell of the static collider grid
+COLLISION_BATCH_VECTOR_MIN = 32 # Batch queries at least this large use the NumPy path (if installed)
+SPATIAL_HASH_CELL_SIZE = 256 # Cell size of the moving-entity hash (about one enemy detection radius)
+SEGMENT_CELL_SIZE = 256 # Bucket size for wall segment colliders
+SEGMENT_ENTITY_PAD = 64 # Largest entity radius the segment buckets cover (bigger ones scan every segment)
+SEGMENT_VECTOR_MIN = 8 # Candidate segment counts at least this large use the NumPy narrow-phase (if installed)
+SWEEP_VECTOR_MIN = 24 # Candidate counts at least this large use the NumPy swept-AABB pass (if installed)
+SWEEP_QUERY_PAD = 2 # Extra pixels around a mover's per-tick reach in broad-phase query ranges
+BROADPHASE_CACHE_SLACK = 24 # Pixels a cached broad-phase range extends past the query, i.e. how far an entity may drift before re-querying
+
 # Dungeon Constants (Imported from dungeon_gen originally)
 # Need these for quadtree population and potentially drawing logic
 DUNGEON_TILE_SIZE = 32
-TILE_FLOOR = 0
-TILE_WALL = 1
+TILE_FLOOR = 1 # Same values as dungeon_gen.py, which builds the grids everything else reads
+TILE_WALL = 0
 DUNGEON_GRID_WIDTH = 150 # Example, match dungeon_gen
 DUNGEON_GRID_HEIGHT = 150 # Example, match dungeon_gen
 
+# Dungeon Flow Field Constants
+FLOW_FIELD_MAX_STEPS = 48 # Tile steps a player's flow field reaches (enemies beyond it steer straight at the player)
+FLOW_FIELD_CACHE_SIZE = 32 # Goal cells whose fields are kept (players revisiting a cell reuse its field)
+ROOM_ROUTE_CACHE_SIZE = 256 # (start region, goal region) routes kept by the dungeon room graph
+
+# Timer Wheel Constants (entity countdowns, server side)
+TIMER_WHEEL_TICK = 1 / 60 # Seconds per wheel tick (timers fire on the first tick at or after their deadline)
+TIMER_WHEEL_SLOT_BITS = 8 # 256 slots per level
+TIMER_WHEEL_LEVELS = 3 # Levels of slots; 3 x 8 bits covers about 77 hours of ticks
+
+# Line of Sight Constants (enemy perception, server side)
+LOS_CELL_SIZE = 16 # World pixels per occupancy cell in the overworld, half a tree (the dungeon uses its tile grid as is)
+LOS_CACHE_TICKS = 6 # Ticks a (viewer cell, target cell) visibility result is reused
+
 # --- END OF FILE constants.py ---
\ No newline at end of file